@@ -0,0 +1,58 @@
+"""
+Compares the latency of authenticated GET requests with the JWT user cache
+(`JWT_USER_CACHE_TIMEOUT`) enabled and disabled, for a light endpoint
+(`/api/prio/`, served from the lookup cache) and a polled board read
+(`/api/summary/`).
+
+    python -m benchmarks.auth_cache --repeat 2000
+"""
+import argparse
+
+from benchmarks.utils import count_queries, create_fixtures, create_tasks, measure, setup_django
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--repeat', type=int, default=2000)
+    parser.add_argument('--users', type=int, default=10000,
+                        help="Rows in auth_user, e.g. accumulated guest accounts.")
+    args = parser.parse_args()
+
+    setup_django()
+
+    from django.contrib.auth.models import User as AuthUser
+    from django.core.cache import cache
+    from django.test import override_settings
+    from rest_framework.test import APIClient
+    from rest_framework_simplejwt.tokens import AccessToken
+
+    _, category, prio, users = create_fixtures(user_count=3)
+    create_tasks(100, category, prio, users)
+    AuthUser.objects.bulk_create([AuthUser(username=f"guest_{i}", password="!") for i in range(args.users)],
+                                 batch_size=1000)
+    user = AuthUser.objects.create_user(username="polling", email="polling@example.com")
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(user)}")
+
+    for path in ("/api/prio/", "/api/summary/"):
+        for timeout in (0, 60):
+            with override_settings(JWT_USER_CACHE_TIMEOUT=timeout):
+                cache.clear()
+
+                def get():
+                    response = client.get(path)
+                    assert response.status_code == 200, response.status_code
+
+                get()
+                with count_queries() as ctx:
+                    get()
+                # Read before the next request resets the connection's query log.
+                query_count = len(ctx.captured_queries)
+                median, p99 = measure(get, repeat=args.repeat)
+                label = "cached" if timeout else "uncached"
+                print(f"{path:<14} {label:>8}: median {median:6.3f} ms, p99 {p99:6.3f} ms, "
+                      f"{query_count} queries/request")
+
+
+if __name__ == "__main__":
+    main()
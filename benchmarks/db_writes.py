@@ -0,0 +1,116 @@
+"""
+Compares concurrent task write throughput on a SQLite file database with
+Django's default connection handling and with the settings from
+`task_manager.database`:
+
+- default:    rollback journal, synchronous=FULL, deferred transactions,
+              a new connection per request
+- persistent: the same, with connections reused across requests
+              (CONN_MAX_AGE) and health checks
+- tuned:      persistent connections, WAL, synchronous=NORMAL, immediate
+              transactions and a busy timeout
+
+Each client thread sends `--requests` requests; a request opens (or reuses)
+its connection, creates a task with three subtasks in a transaction and
+ends like a request does (`close_old_connections`). Every configuration
+runs on a fresh database file.
+
+    python -m benchmarks.db_writes --clients 8 --requests 50
+"""
+import argparse
+import os
+import tempfile
+import threading
+import time
+
+import django
+
+from benchmarks.utils import percentile
+
+
+def configurations():
+    from task_manager.database import SQLITE_INIT_COMMAND
+
+    return {
+        'default': {'CONN_MAX_AGE': 0, 'CONN_HEALTH_CHECKS': False, 'OPTIONS': {}},
+        'persistent': {'CONN_MAX_AGE': 60, 'CONN_HEALTH_CHECKS': True, 'OPTIONS': {}},
+        'tuned': {'CONN_MAX_AGE': 60, 'CONN_HEALTH_CHECKS': True, 'OPTIONS': {
+            'init_command': SQLITE_INIT_COMMAND, 'timeout': 5, 'transaction_mode': 'IMMEDIATE',
+        }},
+    }
+
+
+def run(clients, requests, category, prio):
+    """
+    Runs `clients` threads that each write `requests` tasks. Returns the
+    elapsed seconds, the sorted request latencies in ms and the number of
+    failed requests.
+    """
+    from django.db import OperationalError, close_old_connections, connection, transaction
+
+    from task_management_app.models import Subtask, Task
+
+    latencies, failures = [], []
+
+    def client(index):
+        for i in range(requests):
+            start = time.perf_counter()
+            close_old_connections()
+            try:
+                with transaction.atomic():
+                    task = Task.objects.create(title=f"Task {index}-{i}", description="", due_date="2025-01-01",
+                                               category=category, prio=prio)
+                    Subtask.objects.bulk_create([Subtask(task=task, subtask=f"Subtask {n}") for n in range(3)])
+            except OperationalError:
+                failures.append(1)
+            close_old_connections()
+            latencies.append((time.perf_counter() - start) * 1000)
+        connection.close()
+
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(clients)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return time.perf_counter() - start, sorted(latencies), len(failures)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--clients', type=int, default=8)
+    parser.add_argument('--requests', type=int, default=50, help="Writes per client.")
+    args = parser.parse_args()
+
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'task_manager.settings')
+    django.setup()
+
+    from django.core.management import call_command
+    from django.db import connections
+
+    from task_management_app.models import Category, Prio
+
+    settings_dict = connections.settings['default']
+    if settings_dict['ENGINE'] != 'django.db.backends.sqlite3':
+        parser.exit(1, "This benchmark needs the SQLite backend (DB_ENGINE=sqlite).\n")
+
+    with tempfile.TemporaryDirectory() as directory:
+        for name, config in configurations().items():
+            # Thread connections are created from this dict, so they all
+            # pick up the configuration.
+            connections.close_all()
+            settings_dict.update(config, NAME=os.path.join(directory, f'{name}.sqlite3'))
+            call_command('migrate', verbosity=0)
+            category = Category.objects.create(name="Benchmark", color="#000000")
+            prio = Prio.objects.get(level="medium")
+            connections.close_all()
+
+            elapsed, latencies, failed = run(args.clients, args.requests, category, prio)
+            writes = len(latencies) - failed
+            print(f"{name:<10}: {writes / elapsed:7.1f} writes/s, p50 {percentile(latencies, 50):6.1f} ms, "
+                  f"p95 {percentile(latencies, 95):6.1f} ms, {failed} failed with 'database is locked'")
+        connections.close_all()
+
+
+if __name__ == "__main__":
+    main()
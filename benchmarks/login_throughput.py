@@ -0,0 +1,118 @@
+"""
+Measures login throughput per password hasher while `--clients` threads log
+in at the same time, and the latency of a light authenticated request
+(`/api/prio/`) sent alongside the logins.
+
+Each hasher is measured with hashing in the request threads
+(`PASSWORD_HASHING_WORKERS=0`) and in the bounded hashing pool. The
+"upgrade" rows log in users whose hashes were made with PBKDF2, so every
+login also rehashes with the preferred hasher.
+
+    python -m benchmarks.login_throughput --clients 16 --logins 5
+"""
+import argparse
+import os
+import threading
+import time
+
+from benchmarks.utils import percentile, setup_django
+
+PASSWORD = "benchmark-password"
+
+
+def run(clients, logins, emails, token):
+    """
+    Runs `clients` threads that each log in `logins` times, and one thread
+    that polls with light requests until they are done. Returns logins per
+    second, the sorted login and light request latencies in ms and the
+    number of failed logins.
+    """
+    from django.db import connection
+    from django.test import Client
+
+    login_latencies, light_latencies, statuses = [], [], []
+    done = threading.Event()
+
+    def login_client(index):
+        client = Client(raise_request_exception=False)
+        for i in range(logins):
+            email = emails[(index * logins + i) % len(emails)]
+            start = time.perf_counter()
+            response = client.post("/api/auth/login/", {"email": email, "password": PASSWORD},
+                                   content_type="application/json")
+            login_latencies.append((time.perf_counter() - start) * 1000)
+            statuses.append(response.status_code)
+        connection.close()
+
+    def light_client():
+        client = Client(HTTP_AUTHORIZATION=f"Bearer {token}")
+        while not done.is_set():
+            start = time.perf_counter()
+            client.get("/api/prio/")
+            light_latencies.append((time.perf_counter() - start) * 1000)
+            time.sleep(0.01)
+        connection.close()
+
+    threads = [threading.Thread(target=login_client, args=(i,)) for i in range(clients)]
+    light = threading.Thread(target=light_client)
+    light.start()
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    done.set()
+    light.join()
+    failed = len([code for code in statuses if code != 200])
+    return len(statuses) / elapsed, sorted(login_latencies), sorted(light_latencies), failed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--clients', type=int, default=16)
+    parser.add_argument('--logins', type=int, default=5, help="Logins per client.")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help="Hashing pool size.")
+    args = parser.parse_args()
+
+    setup_django()
+
+    from django.conf import settings
+    from django.contrib.auth.hashers import make_password
+    from django.contrib.auth.models import User
+    from django.test import override_settings
+    from rest_framework_simplejwt.tokens import AccessToken
+
+    hashers = ['scrypt', 'pbkdf2']
+    try:
+        import argon2  # noqa: F401
+        hashers.insert(0, 'argon2')
+    except ImportError:
+        print("argon2-cffi is not installed, skipping argon2")
+
+    token = AccessToken.for_user(User.objects.create_user(username="polling"))
+    user_count = args.clients * args.logins
+    for hasher in hashers:
+        preferred = settings.PASSWORD_HASHER_CLASSES[hasher]
+        order = [preferred] + [path for path in settings.PASSWORD_HASHERS if path != preferred]
+        with override_settings(PASSWORD_HASHERS=order):
+            for scenario in ('upgrade', 'steady') if hasher != 'pbkdf2' else ('steady',):
+                for workers in (0, args.workers):
+                    # Fresh users per run, so that every upgrade login rehashes.
+                    User.objects.filter(username__startswith="login").delete()
+                    encoded = make_password(PASSWORD, hasher='pbkdf2_sha256' if scenario == 'upgrade' else 'default')
+                    users = User.objects.bulk_create([
+                        User(username=f"login{i}", email=f"login{i}@example.com", password=encoded)
+                        for i in range(user_count)
+                    ])
+                    with override_settings(PASSWORD_HASHING_WORKERS=workers):
+                        rate, logins, light, failed = run(args.clients, args.logins, [user.email for user in users], token)
+                    label = f"{hasher} {scenario}"
+                    pool = f"pool of {workers}" if workers else "inline"
+                    print(f"{label:<16} {pool:>10}: {rate:7.1f} logins/s, login p50 {percentile(logins, 50):7.1f} ms "
+                          f"p95 {percentile(logins, 95):7.1f} ms, /api/prio/ p50 {percentile(light, 50):6.1f} ms "
+                          f"p95 {percentile(light, 95):6.1f} ms" + (f", {failed} failed" if failed else ""))
+
+
+if __name__ == "__main__":
+    main()
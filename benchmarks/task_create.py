@@ -0,0 +1,50 @@
+"""
+Compares creating a task with 20 assignees and 50 subtasks through the
+batched TaskSerializer.create against the previous per-row write path.
+"""
+from benchmarks.utils import count_queries, create_fixtures, measure, setup_django
+
+ASSIGNEES = 20
+SUBTASKS = 50
+
+
+def main():
+    setup_django()
+
+    from task_management_app.api.serializers import TaskSerializer
+    from task_management_app.models import Subtask, Task, User
+
+    _, category, prio, users = create_fixtures(user_count=ASSIGNEES)
+    user_ids = [user.id for user in users]
+    payload = {
+        "title": "Benchmark",
+        "due_date": "2025-05-01",
+        "category_id": category.id,
+        "prio_id": prio.id,
+        "assigned_user_id": user_ids,
+        "subtasks": [{"subtask": f"Subtask {i}"} for i in range(SUBTASKS)],
+    }
+
+    def batched():
+        serializer = TaskSerializer(data=payload)
+        serializer.is_valid(raise_exception=True)
+        serializer.save()
+
+    def per_row():
+        # Mirrors the former write path: one lookup per assignee id, one
+        # insert per subtask.
+        assigned = [User.objects.get(pk=pk) for pk in user_ids]
+        task = Task.objects.create(title="Benchmark", due_date="2025-05-01", category=category, prio=prio)
+        task.assigned_users.set(assigned)
+        for subtask_data in payload["subtasks"]:
+            Subtask.objects.create(task=task, **subtask_data)
+
+    for name, func in (("per-row", per_row), ("batched", batched)):
+        with count_queries() as queries:
+            func()
+        median, p99 = measure(func)
+        print(f"{name:>8}: {len(queries.captured_queries):3d} queries, median {median:7.2f} ms, p99 {p99:7.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
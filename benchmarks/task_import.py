@@ -0,0 +1,68 @@
+"""
+Measures the import rate of TaskImporter for NDJSON and CSV input with
+three assignees (by email) and three subtasks per task. The target is at
+least 50k tasks per minute on SQLite.
+
+    python -m benchmarks.task_import --tasks 50000
+"""
+import argparse
+import csv
+import io
+import json
+import time
+
+from benchmarks.utils import create_fixtures, setup_django
+
+
+def make_records(count, category, prio, users):
+    return [{
+        "title": f"Imported {i}",
+        "description": "Description",
+        "due_date": f"2025-{i % 12 + 1:02d}-01",
+        "status": "to_do",
+        "category": category.name,
+        "prio": prio.level,
+        "assigned_users": [user.email for user in users[:3]],
+        "subtasks": [{"subtask": f"Subtask {n}", "completed": False} for n in range(3)],
+    } for i in range(count)]
+
+
+def to_ndjson(records):
+    return io.StringIO("".join(json.dumps(record) + "\n" for record in records))
+
+
+def to_csv(records):
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=list(records[0]))
+    writer.writeheader()
+    for record in records:
+        writer.writerow({**record, "assigned_users": ";".join(record["assigned_users"]),
+                         "subtasks": json.dumps(record["subtasks"])})
+    buffer.seek(0)
+    return buffer
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--tasks', type=int, default=50000)
+    args = parser.parse_args()
+
+    setup_django()
+
+    from task_management_app.importer import PARSERS, TaskImporter
+
+    _, category, prio, users = create_fixtures(user_count=3)
+    records = make_records(args.tasks, category, prio, users)
+
+    for import_format, encode in (("ndjson", to_ndjson), ("csv", to_csv)):
+        file = encode(records)
+        start = time.perf_counter()
+        importer = TaskImporter().run(PARSERS[import_format](file))
+        elapsed = time.perf_counter() - start
+        assert importer.created == args.tasks and not importer.errors, importer.errors[:5]
+        print(f"{import_format:>6}: {args.tasks} tasks in {elapsed:6.2f} s "
+              f"({args.tasks / elapsed * 60:,.0f} tasks/min)")
+
+
+if __name__ == "__main__":
+    main()
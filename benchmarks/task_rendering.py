@@ -0,0 +1,50 @@
+"""
+Compares rendering the task list with TaskSerializer and DRF's JSONRenderer
+against the row-based path (`serialize_task_rows` and FastJSONRenderer)
+for 1k, 10k and 50k tasks with three assignees and three subtasks each.
+
+    python -m benchmarks.task_rendering --sizes 1000 10000 50000
+"""
+import argparse
+
+from benchmarks.utils import create_fixtures, create_tasks, measure, setup_django
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 50000])
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    setup_django()
+
+    from rest_framework.renderers import JSONRenderer
+
+    from task_management_app.api import renderers
+    from task_management_app.api.renderers import FastJSONRenderer
+    from task_management_app.api.rows import serialize_task_rows, task_rows
+    from task_management_app.api.serializers import TaskSerializer
+    from task_management_app.models import Task
+
+    _, category, prio, users = create_fixtures(user_count=3)
+    print(f"JSON encoder for the row path: {'orjson' if renderers.orjson else 'json'}")
+
+    created = 0
+    for size in sorted(args.sizes):
+        create_tasks(size - created, category, prio, users)
+        created = size
+
+        def serializer():
+            return JSONRenderer().render(TaskSerializer(Task.objects.with_relations(), many=True).data)
+
+        def rows():
+            return FastJSONRenderer().render(serialize_task_rows(list(task_rows(Task.objects.all()))))
+
+        assert serializer() == rows()
+        for name, func in (("serializer", serializer), ("rows", rows)):
+            median, p99 = measure(func, repeat=args.repeat)
+            print(f"{size:>6} tasks {name:>10}: median {median:9.1f} ms, p99 {p99:9.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Helpers shared by the benchmark scripts.
+
+Each benchmark runs against a throwaway test database created with Django's
+test utilities, so it never touches the development database. Run them from
+the repository root, e.g. `python -m benchmarks.task_create`.
+"""
+import os
+import statistics
+import time
+from contextlib import contextmanager
+from datetime import date, timedelta
+
+import django
+
+
+def setup_django():
+    """
+    Configures Django and creates a test database for the benchmark run.
+    """
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'task_manager.settings')
+    django.setup()
+
+    from django.db import connection
+    from django.test.utils import setup_test_environment
+
+    setup_test_environment()
+    connection.creation.create_test_db(verbosity=0, autoclobber=True)
+
+
+def create_fixtures(user_count=20):
+    """
+    Creates a category, an authenticated API client and board users.
+    """
+    from django.contrib.auth.models import User as AuthUser
+    from rest_framework.test import APIClient
+
+    from task_management_app.models import Category, Prio, User
+
+    category = Category.objects.create(name="Benchmark", color="#000000")
+    prio = Prio.objects.get(level="medium")
+    users = User.objects.bulk_create([
+        User(username=f"bench{i}", email=f"bench{i}@example.com", contactNumber="", color="#000000")
+        for i in range(user_count)
+    ])
+    client = APIClient()
+    client.force_authenticate(AuthUser.objects.create_user(username="benchmark"))
+    return client, category, prio, users
+
+
+def create_tasks(count, category, prio, users, assignees=3, subtasks=3):
+    """
+    Bulk-creates `count` tasks, each with `assignees` of the given users and
+    `subtasks` subtasks.
+    """
+    from task_management_app.models import Subtask, Task
+
+    tasks = Task.objects.bulk_create([
+        Task(title=f"Task {i}", description="Description", due_date=date(2025, 1, 1) + timedelta(days=i % 365),
+             category=category, prio=prio)
+        for i in range(count)
+    ], batch_size=1000)
+    Through = Task.assigned_users.through
+    Through.objects.bulk_create([Through(task_id=task.id, user_id=user.id) for task in tasks for user in users[:assignees]],
+                                batch_size=1000)
+    Subtask.objects.bulk_create([Subtask(task=task, subtask=f"Subtask {i}") for task in tasks for i in range(subtasks)],
+                                batch_size=1000)
+    return tasks
+
+
+@contextmanager
+def count_queries():
+    """
+    Captures the queries executed inside the block; the yielded context's
+    `captured_queries` holds them once the block has finished.
+    """
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    with CaptureQueriesContext(connection) as ctx:
+        yield ctx
+
+
+def measure(func, repeat=20):
+    """
+    Runs `func` `repeat` times and returns the median and p99 duration in ms.
+    """
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        durations.append((time.perf_counter() - start) * 1000)
+    durations.sort()
+    return statistics.median(durations), percentile(durations, 99)
+
+
+def percentile(sorted_values, pct):
+    index = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
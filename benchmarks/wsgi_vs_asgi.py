@@ -0,0 +1,139 @@
+"""
+Compares the task read endpoints served by the sync views through the WSGI
+handler with the async views served through `task_manager.asgi`, at 200
+concurrent clients by default.
+
+Both applications are called in-process, without a network server:
+WSGI clients are threads competing for a fixed pool of worker threads (as
+with a threaded WSGI server), ASGI clients are coroutines on one event
+loop. The numbers therefore compare the handlers, not complete servers.
+
+    python -m benchmarks.wsgi_vs_asgi --clients 200 --requests 10 --threads 8
+"""
+import argparse
+import asyncio
+import io
+import sys
+import threading
+import time
+
+from benchmarks.utils import create_fixtures, create_tasks, percentile, setup_django
+
+PATHS = ['/api/task/', '/api/task/?page_size=50', '/api/summary/']
+
+
+def run_wsgi(application, path, token, clients, requests, threads):
+    """
+    Runs `clients` threads that each send `requests` requests, while at most
+    `threads` requests are handled at the same time.
+    """
+    workers = threading.Semaphore(threads)
+    path_info, _, query_string = path.partition('?')
+    latencies, statuses = [], []
+
+    def client():
+        for _ in range(requests):
+            environ = {
+                'REQUEST_METHOD': 'GET', 'PATH_INFO': path_info, 'QUERY_STRING': query_string,
+                'SERVER_NAME': 'testserver', 'SERVER_PORT': '80', 'SERVER_PROTOCOL': 'HTTP/1.1',
+                'HTTP_HOST': 'testserver', 'HTTP_AUTHORIZATION': f'Bearer {token}',
+                'wsgi.url_scheme': 'http', 'wsgi.input': io.BytesIO(), 'wsgi.errors': sys.stderr,
+            }
+            start = time.perf_counter()
+            with workers:
+                response = application(environ, lambda status, headers: statuses.append(status))
+                b''.join(response)
+                response.close()
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    client_threads = [threading.Thread(target=client) for _ in range(clients)]
+    start = time.perf_counter()
+    for thread in client_threads:
+        thread.start()
+    for thread in client_threads:
+        thread.join()
+    return time.perf_counter() - start, latencies, [int(status.split()[0]) for status in statuses]
+
+
+def run_asgi(application, path, token, clients, requests):
+    """
+    Runs `clients` coroutines that each send `requests` requests.
+    """
+    path_info, _, query_string = path.partition('?')
+    latencies, statuses = [], []
+
+    async def request():
+        received = False
+
+        async def receive():
+            nonlocal received
+            if not received:
+                received = True
+                return {'type': 'http.request', 'body': b'', 'more_body': False}
+            await asyncio.Future()  # the client never disconnects
+
+        async def send(message):
+            if message['type'] == 'http.response.start':
+                statuses.append(message['status'])
+
+        scope = {
+            'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': 'GET', 'scheme': 'http',
+            'path': path_info, 'raw_path': path_info.encode(), 'query_string': query_string.encode(),
+            'headers': [(b'host', b'testserver'), (b'authorization', f'Bearer {token}'.encode())],
+            'server': ('testserver', 80), 'client': ('127.0.0.1', 0),
+        }
+        await application(scope, receive, send)
+
+    async def client():
+        for _ in range(requests):
+            start = time.perf_counter()
+            await request()
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    async def main():
+        start = time.perf_counter()
+        await asyncio.gather(*(client() for _ in range(clients)))
+        return time.perf_counter() - start
+
+    return asyncio.run(main()), latencies, statuses
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--clients', type=int, default=200)
+    parser.add_argument('--requests', type=int, default=10, help='requests per client')
+    parser.add_argument('--threads', type=int, default=8, help='WSGI worker threads')
+    parser.add_argument('--tasks', type=int, default=200)
+    args = parser.parse_args()
+
+    setup_django()
+
+    from django.contrib.auth.models import User as AuthUser
+    from django.core.wsgi import get_wsgi_application
+    from rest_framework_simplejwt.tokens import AccessToken
+
+    from task_manager.asgi import application as asgi_application
+
+    _, category, prio, users = create_fixtures(user_count=3)
+    create_tasks(args.tasks, category, prio, users)
+    token = str(AccessToken.for_user(AuthUser.objects.get(username="benchmark")))
+    wsgi_application = get_wsgi_application()
+
+    print(f"{args.clients} clients x {args.requests} requests, {args.tasks} tasks, "
+          f"{args.threads} WSGI worker threads")
+    for path in PATHS:
+        runs = (
+            ('WSGI', lambda: run_wsgi(wsgi_application, path, token, args.clients, args.requests, args.threads)),
+            ('ASGI', lambda: run_asgi(asgi_application, path, token, args.clients, args.requests)),
+        )
+        for name, run in runs:
+            elapsed, latencies, statuses = run()
+            latencies.sort()
+            errors = sum(1 for status in statuses if status != 200)
+            print(f"{path:<26} {name}: {len(latencies) / elapsed:8.1f} req/s, "
+                  f"p50 {percentile(latencies, 50):8.1f} ms, p99 {percentile(latencies, 99):8.1f} ms, "
+                  f"{errors} errors")
+
+
+if __name__ == "__main__":
+    main()
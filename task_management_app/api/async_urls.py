@@ -0,0 +1,15 @@
+from django.urls import path
+from .urls import urlpatterns as sync_urlpatterns
+from .views import TasksView, TaskSingleView, SummaryView
+
+# URL patterns for the ASGI application: the task read endpoints are served
+# by async views, everything else by the same views as under WSGI.
+async_urlpatterns = [
+    path('task/', TasksView.as_async_view(), name="task-list"),
+    path('task/<int:pk>/', TaskSingleView.as_async_view(), name="task-detail"),
+    path('summary/', SummaryView.as_async_view(), name="summary"),
+]
+
+async_names = {pattern.name for pattern in async_urlpatterns}
+
+urlpatterns = async_urlpatterns + [pattern for pattern in sync_urlpatterns if pattern.name not in async_names]
@@ -0,0 +1,75 @@
+from asgiref.sync import sync_to_async
+from django.http import Http404
+from django.views.decorators.csrf import csrf_exempt
+
+
+class AsyncReadViewMixin:
+    """
+    Mixin for DRF views whose reads can be served by an async handler.
+
+    `as_async_view()` returns an async view for the ASGI URLconf. GET and
+    HEAD requests are dispatched to the view's `aget` method, which loads
+    its data with the async ORM, so the event loop keeps serving other
+    requests while the database works. Other methods are handed to the
+    regular sync view in a worker thread and behave exactly as under WSGI.
+    """
+
+    @classmethod
+    def as_async_view(cls, **initkwargs):
+        sync_view = sync_to_async(cls.as_view(**initkwargs))
+
+        async def view(request, *args, **kwargs):
+            if request.method not in ('GET', 'HEAD'):
+                return await sync_view(request, *args, **kwargs)
+            self = cls(**initkwargs)
+            self.setup(request, *args, **kwargs)
+            return await self.async_dispatch(request, *args, **kwargs)
+
+        view.view_class = cls
+        view.view_initkwargs = initkwargs
+        return csrf_exempt(view)
+
+    async def async_dispatch(self, request, *args, **kwargs):
+        """
+        Async counterpart of `APIView.dispatch` for reads.
+
+        Authentication, permission checks and ETag revalidation run the
+        view's usual `initial()` in one worker thread hop; the handler
+        itself runs on the event loop.
+        """
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            await sync_to_async(self.initial)(request, *args, **kwargs)
+            response = await self.aget(request, *args, **kwargs)
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        return self.response
+
+    async def aget(self, request, *args, **kwargs):
+        raise NotImplementedError
+
+    async def aget_object(self):
+        """
+        Async counterpart of `GenericAPIView.get_object`.
+        """
+        queryset = self.filter_queryset(self.get_queryset())
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        try:
+            obj = await queryset.aget(**{self.lookup_field: self.kwargs[lookup_url_kwarg]})
+        except queryset.model.DoesNotExist:
+            raise Http404(f'No {queryset.model._meta.object_name} matches the given query.')
+        self.check_object_permissions(self.request, obj)
+        return obj
+
+    async def aserialize(self, instance, **kwargs):
+        """
+        Serializes `instance` in a worker thread. Serializing may touch the
+        database (e.g. when the lookup caches reload), which is not allowed
+        on the event loop.
+        """
+        return await sync_to_async(lambda: self.get_serializer(instance, **kwargs).data)()
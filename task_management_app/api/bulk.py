@@ -0,0 +1,162 @@
+from django.db import transaction
+from django.utils import timezone
+
+from ..models import User, Category, Prio, Subtask, Task
+from ..signals import receivers_suppressed, tasks_changed_in_bulk
+
+BULK_BATCH_SIZE = 500
+
+TASK_FIELDS = ['title', 'description', 'due_date', 'status', 'category_id', 'prio_id']
+
+
+class InvalidReferences(Exception):
+    """
+    Raised by `apply_operations` when operations reference rows that do not
+    exist. `errors` maps operation indexes to their errors.
+    """
+
+    def __init__(self, errors):
+        super().__init__(errors)
+        self.errors = errors
+
+
+def check_references(operations):
+    """
+    Checks that every task, category, prio and user referenced by the
+    operations exists, using one query per table.
+
+    The referenced tasks are locked (`select_for_update`), so within the
+    caller's transaction none of them can be deleted before the operations
+    are applied.
+
+    Returns a dict mapping operation indexes to their errors.
+    """
+    task_ids, category_ids, prio_ids, user_ids = set(), set(), set(), set()
+    for operation in operations:
+        if 'id' in operation:
+            task_ids.add(operation['id'])
+        data = operation.get('data', {})
+        if 'category_id' in data:
+            category_ids.add(data['category_id'])
+        if 'prio_id' in data:
+            prio_ids.add(data['prio_id'])
+        user_ids.update(data.get('assigned_user_id', []))
+
+    existing_tasks = set(Task.objects.select_for_update().filter(id__in=task_ids).values_list('id', flat=True))
+    existing_categories = set(Category.objects.filter(id__in=category_ids).values_list('id', flat=True))
+    existing_prios = set(Prio.objects.filter(id__in=prio_ids).values_list('id', flat=True))
+    existing_users = set(User.objects.filter(id__in=user_ids).values_list('id', flat=True))
+
+    errors = {}
+    seen_task_ids = set()
+    for index, operation in enumerate(operations):
+        item_errors = {}
+        data = operation.get('data', {})
+        if 'id' in operation:
+            if operation['id'] not in existing_tasks:
+                item_errors['id'] = f"Invalid pk \"{operation['id']}\" - object does not exist."
+            elif operation['id'] in seen_task_ids:
+                item_errors['id'] = 'Task is referenced by more than one operation.'
+            seen_task_ids.add(operation['id'])
+        if 'category_id' in data and data['category_id'] not in existing_categories:
+            item_errors['category_id'] = f"Invalid pk \"{data['category_id']}\" - object does not exist."
+        if 'prio_id' in data and data['prio_id'] not in existing_prios:
+            item_errors['prio_id'] = f"Invalid pk \"{data['prio_id']}\" - object does not exist."
+        missing_users = [pk for pk in data.get('assigned_user_id', []) if pk not in existing_users]
+        if missing_users:
+            item_errors['assigned_user_id'] = [f'Invalid pk "{pk}" - object does not exist.' for pk in missing_users]
+        if item_errors:
+            errors[index] = item_errors
+    return errors
+
+
+@transaction.atomic
+def apply_operations(operations):
+    """
+    Applies validated bulk operations in a single transaction.
+
+    The references are checked first, in the same transaction, and
+    `InvalidReferences` is raised if any is missing. Tasks are written with `bulk_create` / `bulk_update`, and assigned users
+    and subtasks with batched inserts into their tables. Per-row signal
+    side effects are suppressed and applied once for the whole batch.
+    Returns one result per operation, in request order.
+    """
+    errors = check_references(operations)
+    if errors:
+        raise InvalidReferences(errors)
+
+    results = [{'op': operation['op'], 'id': operation.get('id'), 'status': 'ok'} for operation in operations]
+    creates = [(index, op) for index, op in enumerate(operations) if op['op'] == 'create']
+    updates = [(index, op) for index, op in enumerate(operations) if op['op'] == 'update']
+    delete_ids = [op['id'] for op in operations if op['op'] == 'delete']
+
+    with receivers_suppressed():
+        if delete_ids:
+            Task.objects.filter(id__in=delete_ids).delete()
+
+        new_tasks = [Task(**{name: value for name, value in op['data'].items() if name in TASK_FIELDS})
+                     for _, op in creates]
+        Task.objects.bulk_create(new_tasks, batch_size=BULK_BATCH_SIZE)
+        for (index, _), task in zip(creates, new_tasks):
+            results[index]['id'] = task.id
+
+        tasks_by_id = Task.objects.in_bulk([op['id'] for _, op in updates])
+        updated_tasks, updated_fields = [], {'updated_at'}
+        now = timezone.now()
+        for _, op in updates:
+            task = tasks_by_id[op['id']]
+            for name, value in op['data'].items():
+                if name in TASK_FIELDS:
+                    setattr(task, name, value)
+                    updated_fields.add(name)
+            # bulk_update() does not apply auto_now, and subtask or assignee
+            # changes must mark the task as changed for delta sync too.
+            task.updated_at = now
+            updated_tasks.append(task)
+        if updated_tasks:
+            Task.objects.bulk_update(updated_tasks, sorted(updated_fields), batch_size=BULK_BATCH_SIZE)
+
+        written = [(task, op['data']) for (_, op), task in zip(creates, new_tasks)]
+        written += [(tasks_by_id[op['id']], op['data']) for _, op in updates]
+        replace_assigned_users([(task, data['assigned_user_id']) for task, data in written
+                                if 'assigned_user_id' in data])
+        deleted_subtasks = replace_subtasks([(task, data['subtasks']) for task, data in written
+                                             if 'subtasks' in data])
+
+    tasks_changed_in_bulk([task.id for task, _ in written], delete_ids, deleted_subtasks)
+    return results
+
+
+def replace_assigned_users(assignments):
+    """
+    Replaces the assigned users of several tasks with one delete and one
+    batched insert into the through table.
+    """
+    if not assignments:
+        return
+    Through = Task.assigned_users.through
+    Through.objects.filter(task_id__in=[task.id for task, _ in assignments]).delete()
+    Through.objects.bulk_create(
+        [Through(task_id=task.id, user_id=user_id) for task, user_ids in assignments for user_id in set(user_ids)],
+        batch_size=BULK_BATCH_SIZE,
+    )
+
+
+def replace_subtasks(subtask_lists):
+    """
+    Replaces the subtasks of several tasks with one delete and one batched
+    insert, and refreshes the tasks' subtask counters with one update.
+    Returns the deleted subtasks (with their ids and task ids only), which
+    need tombstones.
+    """
+    if not subtask_lists:
+        return []
+    task_ids = [task.id for task, _ in subtask_lists]
+    deleted = list(Subtask.objects.select_for_update().filter(task_id__in=task_ids).only('id', 'task_id'))
+    Subtask.objects.filter(id__in=[subtask.id for subtask in deleted]).delete()
+    Subtask.objects.bulk_create(
+        [Subtask(task=task, **subtask_data) for task, subtasks in subtask_lists for subtask_data in subtasks],
+        batch_size=BULK_BATCH_SIZE,
+    )
+    Task.objects.filter(id__in=task_ids).refresh_subtask_counts()
+    return deleted
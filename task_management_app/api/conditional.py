@@ -0,0 +1,57 @@
+from django.utils.http import parse_etags, quote_etag
+from rest_framework import status
+from rest_framework.response import Response
+
+
+class NotModified(Exception):
+    """
+    Raised to short-circuit a view when the client's copy is current.
+    """
+
+
+class ConditionalGetMixin:
+    """
+    Mixin for API views that answers GET requests with `304 Not Modified`
+    when the client's `If-None-Match` header matches the current ETag.
+
+    Views implement `get_etag(request, *args, **kwargs)`, which must be
+    cheap: it runs after authentication and permission checks but before
+    the handler, so a 304 never evaluates the queryset or serializes
+    anything. Returning None disables conditional handling.
+    """
+
+    def get_etag(self, request, *args, **kwargs):
+        return None
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+
+        self.etag = None
+        if request.method in ('GET', 'HEAD'):
+            etag = self.get_etag(request, *args, **kwargs)
+            if etag is not None:
+                self.etag = quote_etag(etag)
+                if etag_matches(request, self.etag):
+                    raise NotModified()
+
+    def handle_exception(self, exc):
+        if isinstance(exc, NotModified):
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers={'ETag': self.etag})
+        return super().handle_exception(exc)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        if getattr(self, 'etag', None) and response.status_code == status.HTTP_200_OK:
+            response['ETag'] = self.etag
+        return response
+
+
+def etag_matches(request, etag):
+    """
+    Returns True if the request's `If-None-Match` header matches `etag`.
+    """
+    header = request.META.get('HTTP_IF_NONE_MATCH')
+    if not header:
+        return False
+    etags = parse_etags(header)
+    return '*' in etags or etag in etags
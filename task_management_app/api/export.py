@@ -0,0 +1,68 @@
+import csv
+import io
+import json
+from itertools import islice
+
+from .renderers import FastJSONRenderer
+from .rows import serialize_task_rows, task_rows
+
+EXPORT_CHUNK_SIZE = 2000
+
+CSV_COLUMNS = ['id', 'title', 'description', 'due_date', 'status', 'category', 'prio', 'assigned_users', 'subtasks']
+
+
+def iter_task_chunks(queryset, chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    Yields the tasks of `queryset` as lists of serialized tasks of at most
+    `chunk_size` items.
+
+    Task rows are read with a chunked `.iterator()`, and the assignees and
+    subtasks of each chunk are loaded with one query each, so memory use
+    depends on the chunk size and not on the number of tasks.
+    """
+    rows = task_rows(queryset).iterator(chunk_size=chunk_size)
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            return
+        yield serialize_task_rows(chunk)
+
+
+def export_ndjson(queryset):
+    """
+    Yields the tasks as newline-delimited JSON, one task per line in the
+    representation of the task API.
+    """
+    renderer = FastJSONRenderer()
+    for tasks in iter_task_chunks(queryset):
+        yield b''.join(renderer.render(task) + b'\n' for task in tasks)
+
+
+def export_csv(queryset):
+    """
+    Yields the tasks as CSV with a header row. Category and prio are given
+    by name and level, assignees as `;`-separated email addresses and
+    subtasks as a JSON list.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(CSV_COLUMNS)
+    for tasks in iter_task_chunks(queryset):
+        for task in tasks:
+            writer.writerow([
+                task['id'],
+                task['title'],
+                task['description'],
+                task['due_date'],
+                task['status'],
+                task['category']['name'] if task['category'] else '',
+                task['prio']['level'] if task['prio'] else '',
+                ';'.join(user['email'] for user in task['assigned_users']),
+                json.dumps([{'subtask': subtask['subtask'], 'completed': subtask['completed']}
+                            for subtask in task['subtasks']], ensure_ascii=False, separators=(',', ':')),
+            ])
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode()
@@ -0,0 +1,77 @@
+from django.utils.dateparse import parse_date
+from rest_framework.exceptions import ValidationError
+from rest_framework.filters import BaseFilterBackend
+
+from ..models import Task
+
+
+class TaskFilterBackend(BaseFilterBackend):
+    """
+    Filters the task list by query parameters.
+
+    Supported parameters (lists are comma-separated):
+    - `status`: one or more task states, e.g. `to_do,in_progress`
+    - `prio`: one or more priority ids
+    - `category`: one or more category ids
+    - `assignee`: one or more user ids the task is assigned to
+    - `due_after` / `due_before`: inclusive due date range (YYYY-MM-DD)
+
+    Every filter is backed by an index on the task table or on the
+    assigned users through table.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        params = request.query_params
+
+        statuses = self.get_list(params, 'status')
+        if statuses:
+            queryset = queryset.filter(status__in=statuses)
+
+        prio_ids = self.get_id_list(params, 'prio')
+        if prio_ids:
+            queryset = queryset.filter(prio_id__in=prio_ids)
+
+        category_ids = self.get_id_list(params, 'category')
+        if category_ids:
+            queryset = queryset.filter(category_id__in=category_ids)
+
+        assignee_ids = self.get_id_list(params, 'assignee')
+        if assignee_ids:
+            # Filtering through the join table avoids duplicate rows for tasks
+            # assigned to several of the requested users.
+            assigned = Task.assigned_users.through.objects.filter(user_id__in=assignee_ids)
+            queryset = queryset.filter(id__in=assigned.values('task_id'))
+
+        due_after = self.get_date(params, 'due_after')
+        if due_after:
+            queryset = queryset.filter(due_date__gte=due_after)
+
+        due_before = self.get_date(params, 'due_before')
+        if due_before:
+            queryset = queryset.filter(due_date__lte=due_before)
+
+        return queryset
+
+    def get_list(self, params, name):
+        value = params.get(name)
+        if not value:
+            return []
+        return [item.strip() for item in value.split(',') if item.strip()]
+
+    def get_id_list(self, params, name):
+        try:
+            return [int(item) for item in self.get_list(params, name)]
+        except ValueError:
+            raise ValidationError({name: 'Expected a comma-separated list of ids.'})
+
+    def get_date(self, params, name):
+        value = params.get(name)
+        if not value:
+            return None
+        try:
+            parsed = parse_date(value)
+        except ValueError:
+            parsed = None
+        if parsed is None:
+            raise ValidationError({name: 'Expected a date in the format YYYY-MM-DD.'})
+        return parsed
@@ -0,0 +1,150 @@
+import base64
+from datetime import date
+
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class TaskPaginationBase(BasePagination):
+    """
+    Base class of the task paginations. Pages are returned as
+    `{"next": <url or null>, "results": [...]}`; no total count is
+    computed.
+    """
+    page_size_query_param = 'page_size'
+    page_size = 50
+    max_page_size = 500
+
+    def get_page_size(self, request):
+        """
+        Returns the requested page size, falling back to the default for
+        missing or invalid values and capping it at `max_page_size`.
+        """
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        if page_size <= 0:
+            return self.page_size
+        return min(page_size, self.max_page_size)
+
+    def get_next_link(self):
+        raise NotImplementedError
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+
+class TaskCursorPagination(TaskPaginationBase):
+    """
+    Keyset pagination for tasks ordered by `(due_date, id)`.
+
+    The cursor encodes the `due_date` and `id` of the last task on the
+    previous page, so every page is fetched with an indexed range condition
+    instead of an OFFSET scan. Pagination is opt-in: requests without a
+    `cursor` or `page_size` parameter receive the full, unpaginated list.
+
+    The list views fetch the page themselves (`get_page_queryset`, then
+    `set_page` with the loaded rows), so they can load it as rows, with the
+    sync or the async ORM.
+    """
+    cursor_query_param = 'cursor'
+    invalid_cursor_message = 'Invalid cursor'
+
+    def get_page_queryset(self, queryset, request):
+        """
+        Returns the unevaluated queryset for the requested page (with one
+        extra row to detect a next page), or None if the request is not
+        paginated.
+        """
+        params = request.query_params
+        if self.cursor_query_param not in params and self.page_size_query_param not in params:
+            return None
+
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        queryset = queryset.order_by('due_date', 'id')
+
+        cursor = params.get(self.cursor_query_param)
+        if cursor:
+            due_date, pk = self.decode_cursor(cursor)
+            # The leading range condition keeps the scan on the (due_date, id) index.
+            queryset = queryset.filter(due_date__gte=due_date).filter(
+                Q(due_date__gt=due_date) | Q(id__gt=pk)
+            )
+
+        return queryset[:self.page_size + 1]
+
+    def set_page(self, results):
+        self.has_next = len(results) > self.page_size
+        self.page = results[:self.page_size]
+        return self.page
+
+    def encode_cursor(self, task):
+        # Works with Task instances and with named `task_rows()` rows.
+        raw = f'{task.due_date.isoformat()}:{task.id}'
+        return base64.urlsafe_b64encode(raw.encode('ascii')).decode('ascii')
+
+    def decode_cursor(self, cursor):
+        try:
+            raw = base64.urlsafe_b64decode(cursor.encode('ascii')).decode('ascii')
+            due_date, pk = raw.split(':')
+            return date.fromisoformat(due_date), int(pk)
+        except (TypeError, ValueError, UnicodeError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        url = self.request.build_absolute_uri()
+        url = replace_query_param(url, self.page_size_query_param, self.page_size)
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(self.page[-1]))
+
+
+class TaskSearchPagination(TaskPaginationBase):
+    """
+    Page number pagination for ranked search results, which have no stable
+    key to build a cursor from. `search(limit, offset)` is called with one
+    extra row to detect whether there is a next page.
+    """
+    page_query_param = 'page'
+    page_size = 20
+    max_page_size = 100
+    invalid_page_message = 'Invalid page.'
+
+    def paginate_search(self, search, request):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        try:
+            self.page_number = int(request.query_params.get(self.page_query_param, 1))
+        except ValueError:
+            raise NotFound(self.invalid_page_message)
+        if self.page_number < 1:
+            raise NotFound(self.invalid_page_message)
+
+        results = search(limit=self.page_size + 1, offset=(self.page_number - 1) * self.page_size)
+        self.has_next = len(results) > self.page_size
+        return results[:self.page_size]
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        url = self.request.build_absolute_uri()
+        url = replace_query_param(url, self.page_size_query_param, self.page_size)
+        return replace_query_param(url, self.page_query_param, self.page_number + 1)
@@ -0,0 +1,98 @@
+from ..lookups import category_cache, prio_cache
+from ..models import Subtask, Task
+
+TASK_COLUMNS = ['id', 'title', 'description', 'due_date', 'prio_id', 'category_id', 'status', 'subtask_total',
+                'subtask_done']
+
+USER_COLUMNS = ['id', 'username', 'email', 'contactNumber', 'color']
+
+
+def task_rows(queryset, fields=None):
+    """
+    Returns the task columns of `queryset` as named rows instead of model
+    instances. `id` and `due_date` are always loaded, since pagination
+    cursors are built from them.
+    """
+    columns = [name for name in TASK_COLUMNS if name != 'description' or fields is None or name in fields]
+    return queryset.prefetch_related(None).values_list(*columns, named=True)
+
+
+def serialize_task_rows(rows, fields=None):
+    """
+    Renders task rows in the representation of `TaskSerializer`, without
+    going through serializer fields.
+
+    Assigned users and subtasks are loaded with one query each, ordered by
+    id like the prefetches of `Task.objects.with_relations()`; category and
+    prio come from the lookup table caches. Keys appear in the serializer's
+    field order, restricted to `fields` if given. The output is covered by a
+    contract test against `TaskSerializer`.
+    """
+    def wanted(name):
+        return fields is None or name in fields
+
+    task_ids = [row.id for row in rows]
+    assigned_users = load_assigned_users(task_ids) if wanted('assigned_users') else {}
+    subtasks = load_subtasks(task_ids) if wanted('subtasks') else {}
+    prios = LookupRows(prio_cache) if wanted('prio') else None
+    categories = LookupRows(category_cache) if wanted('category') else None
+
+    getters = {
+        'id': lambda row: row.id,
+        'title': lambda row: row.title,
+        'description': lambda row: row.description,
+        'assigned_users': lambda row: assigned_users.get(row.id, []),
+        'due_date': lambda row: row.due_date.isoformat(),
+        'prio': lambda row: prios.get(row.prio_id),
+        'category': lambda row: categories.get(row.category_id),
+        'status': lambda row: row.status,
+        'subtasks': lambda row: subtasks.get(row.id, []),
+        'subtask_total': lambda row: row.subtask_total,
+        'subtask_done': lambda row: row.subtask_done,
+    }
+    getters = [(name, getter) for name, getter in getters.items() if wanted(name)]
+    return [{name: getter(row) for name, getter in getters} for row in rows]
+
+
+def load_assigned_users(task_ids):
+    """
+    Returns the serialized assigned users of the given tasks keyed by task
+    id. Users assigned to several tasks share one dict.
+    """
+    Through = Task.assigned_users.through
+    users, assigned_users = {}, {}
+    columns = ['task_id'] + [f'user__{name}' for name in USER_COLUMNS]
+    for task_id, *values in Through.objects.filter(task_id__in=task_ids).order_by('user_id').values_list(*columns):
+        user = users.get(values[0])
+        if user is None:
+            user = users[values[0]] = dict(zip(USER_COLUMNS, values))
+        assigned_users.setdefault(task_id, []).append(user)
+    return assigned_users
+
+
+def load_subtasks(task_ids):
+    """
+    Returns the serialized subtasks of the given tasks keyed by task id.
+    """
+    subtasks = {}
+    rows = Subtask.objects.filter(task_id__in=task_ids).order_by('id').values_list('id', 'subtask', 'task_id',
+                                                                                  'completed')
+    for pk, subtask, task_id, completed in rows:
+        subtasks.setdefault(task_id, []).append({'id': pk, 'subtask': subtask, 'task': task_id, 'completed': completed})
+    return subtasks
+
+
+class LookupRows:
+    """
+    Snapshot of a lookup table cache that reloads once when a row is
+    missing, like `TaskSerializer.get_lookup_row`.
+    """
+
+    def __init__(self, lookup_cache):
+        self.lookup_cache = lookup_cache
+        self.rows = lookup_cache.get_rows()
+
+    def get(self, pk):
+        if pk not in self.rows:
+            self.rows = self.lookup_cache.reload()
+        return self.rows.get(pk)
@@ -1,5 +1,56 @@
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db import transaction
+from django.utils import timezone
 from rest_framework import serializers
+from rest_framework.relations import MANY_RELATION_KWARGS
+from ..lookups import category_cache, prio_cache
 from ..models import User, Category, Prio, Subtask, Task
+from ..signals import broadcast_assignments, receivers_suppressed, subtasks_deleted_in_bulk, subtasks_written_in_bulk
+
+
+class BulkManyRelatedField(serializers.ManyRelatedField):
+    """
+    Many-related field that resolves all primary keys with a single `IN`
+    query instead of one query per item.
+    """
+
+    def to_internal_value(self, data):
+        if isinstance(data, str) or not hasattr(data, '__iter__'):
+            self.fail('not_a_list', input_type=type(data).__name__)
+        if not self.allow_empty and len(data) == 0:
+            self.fail('empty')
+
+        child = self.child_relation
+        queryset = child.get_queryset()
+        pks = []
+        for item in data:
+            if isinstance(item, bool):
+                child.fail('incorrect_type', data_type=type(item).__name__)
+            try:
+                pks.append(queryset.model._meta.pk.to_python(item))
+            except (TypeError, DjangoValidationError):
+                child.fail('incorrect_type', data_type=type(item).__name__)
+
+        objects = queryset.in_bulk(pks)
+        for pk in pks:
+            if pk not in objects:
+                child.fail('does_not_exist', pk_value=pk)
+        return [objects[pk] for pk in dict.fromkeys(pks)]
+
+
+class BulkPrimaryKeyRelatedField(serializers.PrimaryKeyRelatedField):
+    """
+    Primary key related field whose `many=True` form validates all ids with
+    one query (see `BulkManyRelatedField`).
+    """
+
+    @classmethod
+    def many_init(cls, *args, **kwargs):
+        list_kwargs = {'child_relation': cls(*args, **kwargs)}
+        for key in kwargs:
+            if key in MANY_RELATION_KWARGS:
+                list_kwargs[key] = kwargs[key]
+        return BulkManyRelatedField(**list_kwargs)
 
 
 class UserSerializer(serializers.ModelSerializer):
@@ -44,11 +95,22 @@ class SubtaskSerializer(serializers.ModelSerializer):
 
     Responsible for serializing Subtask instances, which represent tasks 
     that are part of a larger task. Includes fields like `subtask` and 
-    `completed`.
+    `completed`. The parent `task` is read-only; it is set by the view.
     """
     class Meta:
         model = Subtask
-        fields = "__all__"
+        fields = ['id', 'subtask', 'task', 'completed']
+        read_only_fields = ['task']
+
+
+class TaskSubtaskSerializer(SubtaskSerializer):
+    """
+    Serializer for subtasks nested in a task.
+
+    The `id` is writable so that updates can match incoming subtasks with
+    existing ones; the parent task is always taken from the enclosing task.
+    """
+    id = serializers.IntegerField(required=False)
 
 
 class TaskSerializer(serializers.ModelSerializer):
@@ -61,33 +123,66 @@ class TaskSerializer(serializers.ModelSerializer):
 
     Custom methods `create()` and `update()` are implemented to handle 
     complex relationships such as assigned users and subtasks.
+
+    An optional `fields` argument restricts the serialized output to the
+    given field names (sparse fieldsets). `category` and `prio` are rendered
+    from the in-process lookup table cache instead of nested serializers.
     """
     assigned_users = UserSerializer(many=True, read_only=True)
-    assigned_user_id = serializers.PrimaryKeyRelatedField(
+    assigned_user_id = BulkPrimaryKeyRelatedField(
         queryset=User.objects.all(),
         many=True,
         write_only=True,
         required=False,
         source='assigned_users'
     )
-    category = CategorySerializer(read_only=True)
+    category = serializers.SerializerMethodField()
     category_id = serializers.PrimaryKeyRelatedField(
         queryset=Category.objects.all(),
         write_only=True,
         source='category'
     )
-    prio = PrioSerializer(read_only=True)
+    prio = serializers.SerializerMethodField()
     prio_id = serializers.PrimaryKeyRelatedField(
         queryset=Prio.objects.all(),
         write_only=True,
         source='prio'
     )
-    subtasks = SubtaskSerializer(many=True, required=False)
+    subtasks = TaskSubtaskSerializer(many=True, required=False)
 
     class Meta:
         model = Task
-        fields = ['id', 'title', 'description', 'assigned_users', 'assigned_user_id', 'due_date', 'prio', 'prio_id', 'category', 'category_id', 'status', 'subtasks']
+        fields = ['id', 'title', 'description', 'assigned_users', 'assigned_user_id', 'due_date', 'prio', 'prio_id', 'category', 'category_id', 'status', 'subtasks', 'subtask_total', 'subtask_done']
+        read_only_fields = ['subtask_total', 'subtask_done']
+
+    def __init__(self, *args, fields=None, **kwargs):
+        super().__init__(*args, **kwargs)
+
+        if fields is not None:
+            for field_name in set(self.fields) - set(fields):
+                self.fields.pop(field_name)
+
+    def get_category(self, obj):
+        return self.get_lookup_row(category_cache, obj.category_id)
+
+    def get_prio(self, obj):
+        return self.get_lookup_row(prio_cache, obj.prio_id)
 
+    def get_lookup_row(self, lookup_cache, pk):
+        """
+        Returns the cached representation of a lookup table row. The table
+        snapshot is taken once per serializer, so rendering a list checks the
+        cache version only once.
+        """
+        snapshots = self.__dict__.setdefault('_lookup_snapshots', {})
+        rows = snapshots.get(lookup_cache.version_key)
+        if rows is None:
+            rows = snapshots[lookup_cache.version_key] = lookup_cache.get_rows()
+        if pk not in rows:
+            rows = snapshots[lookup_cache.version_key] = lookup_cache.reload()
+        return rows.get(pk)
+
+    @transaction.atomic
     def create(self, validated_data):
         """
         Custom create method to handle the creation of a Task along with
@@ -95,23 +190,60 @@ class TaskSerializer(serializers.ModelSerializer):
 
         Extracts and handles the `assigned_users` and `subtasks` data 
         separately from the main task data to ensure proper relationships.
+        Assignments and subtasks are each written with a single batched insert;
+        the subtask counters are set with the task insert.
         """
         subtasks_data = validated_data.pop('subtasks', [])
         assigned_users = validated_data.pop('assigned_users', [])
-        task = Task.objects.create(**validated_data)
-        task.assigned_users.set(assigned_users)
+        task = Task.objects.create(
+            **validated_data,
+            subtask_total=len(subtasks_data),
+            subtask_done=sum(1 for subtask_data in subtasks_data if subtask_data.get('completed')),
+        )
+
+        if assigned_users:
+            Through = Task.assigned_users.through
+            Through.objects.bulk_create([Through(task_id=task.id, user_id=user.id) for user in assigned_users])
+            # bulk_create() sends no m2m_changed.
+            broadcast_assignments(task.id, [user.id for user in assigned_users])
 
+        subtasks = []
         for subtask_data in subtasks_data:
-            Subtask.objects.create(task=task, **subtask_data)
+            subtask_data.pop('id', None)
+            subtasks.append(Subtask(task=task, **subtask_data))
+        if subtasks:
+            Subtask.objects.bulk_create(subtasks)
+            subtasks_written_in_bulk(created=subtasks)
         return task
-    
+
+    def validate_subtasks(self, value):
+        """
+        Ensures that subtask ids sent with an update belong to the task being
+        updated and are not repeated.
+        """
+        if self.instance is None:
+            return value
+
+        ids = [subtask_data['id'] for subtask_data in value if 'id' in subtask_data]
+        if len(ids) != len(set(ids)):
+            raise serializers.ValidationError('Subtask ids must be unique.')
+        existing_ids = {subtask.id for subtask in self.instance.subtasks.all()}
+        unknown_ids = [pk for pk in ids if pk not in existing_ids]
+        if unknown_ids:
+            raise serializers.ValidationError(
+                f"Subtask(s) {', '.join(map(str, unknown_ids))} do not belong to this task."
+            )
+        return value
+
+    @transaction.atomic
     def update(self, instance, validated_data):
         """
         Custom update method to handle updates to a Task instance, 
         including the modification of its associated users and subtasks.
 
         Ensures that the related `assigned_users` and `subtasks` are 
-        properly updated when the task is modified.
+        properly updated when the task is modified. Subtasks are reconciled
+        by id so that unchanged subtasks keep their ids.
         """
         instance.title = validated_data.get('title', instance.title)
         instance.description = validated_data.get('description', instance.description)
@@ -124,10 +256,119 @@ class TaskSerializer(serializers.ModelSerializer):
             instance.assigned_users.set(validated_data['assigned_users'])
 
         if 'subtasks' in validated_data:
-            instance.subtasks.all().delete()
-            for subtask_data in validated_data['subtasks']:
-                Subtask.objects.create(task=instance, **subtask_data)
+            self.reconcile_subtasks(instance, validated_data['subtasks'])
 
         instance.save()
         return instance
+
+    def reconcile_subtasks(self, instance, subtasks_data):
+        """
+        Applies the difference between the task's current subtasks and the
+        incoming list with at most one delete, one update and one insert.
+
+        Incoming subtasks with an `id` update the matching subtask, those
+        without one are created, and existing subtasks missing from the list
+        are deleted. The task's subtask counters are then refreshed with one
+        more update.
+        """
+        existing = {subtask.id: subtask for subtask in instance.subtasks.all()}
+        to_create, to_update, kept = [], [], []
+
+        for subtask_data in subtasks_data:
+            subtask_data = dict(subtask_data)
+            pk = subtask_data.pop('id', None)
+            if pk is None:
+                to_create.append(Subtask(task=instance, **subtask_data))
+                continue
+
+            subtask = existing.pop(pk)
+            kept.append(subtask)
+            if any(getattr(subtask, name) != value for name, value in subtask_data.items()):
+                for name, value in subtask_data.items():
+                    setattr(subtask, name, value)
+                to_update.append(subtask)
+
+        if existing:
+            with receivers_suppressed():
+                Subtask.objects.filter(id__in=existing).delete()
+            subtasks_deleted_in_bulk(existing.values())
+        if to_update:
+            now = timezone.now()
+            for subtask in to_update:
+                subtask.updated_at = now
+            Subtask.objects.bulk_update(to_update, ['subtask', 'completed', 'updated_at'])
+        if to_create:
+            Subtask.objects.bulk_create(to_create)
+        if to_update or to_create:
+            subtasks_written_in_bulk(created=to_create, updated=to_update)
+        if existing or to_update or to_create:
+            Task.objects.filter(pk=instance.pk).refresh_subtask_counts()
+            subtasks = kept + to_create
+            instance.subtask_total = len(subtasks)
+            instance.subtask_done = sum(1 for subtask in subtasks if subtask.completed)
     
+
+
+class BulkSubtaskSerializer(serializers.Serializer):
+    """
+    Serializer for subtasks nested in a bulk task operation.
+    """
+    subtask = serializers.CharField(max_length=255)
+    completed = serializers.BooleanField(default=False)
+
+
+class TaskBulkDataSerializer(serializers.Serializer):
+    """
+    Serializer for the task fields of a bulk operation.
+
+    Related objects are referenced by id only; their existence is checked for
+    the whole batch at once instead of with one query per field.
+    """
+    title = serializers.CharField(max_length=255)
+    description = serializers.CharField(allow_blank=True, required=False)
+    due_date = serializers.DateField()
+    status = serializers.CharField(max_length=255, required=False)
+    category_id = serializers.IntegerField()
+    prio_id = serializers.IntegerField()
+    assigned_user_id = serializers.ListField(child=serializers.IntegerField(), required=False)
+    subtasks = BulkSubtaskSerializer(many=True, required=False)
+
+
+class TaskBulkOperationSerializer(serializers.Serializer):
+    """
+    Serializer for a single operation of the bulk task endpoint.
+
+    `create` operations need `data` and take no `id`, `update` operations
+    need `id` and `data` (applied partially) and `delete` operations need
+    `id`.
+    """
+    op = serializers.ChoiceField(choices=['create', 'update', 'delete'])
+    id = serializers.IntegerField(required=False)
+    data = serializers.DictField(required=False)
+
+    def validate(self, attrs):
+        op = attrs['op']
+        if op in ('update', 'delete') and 'id' not in attrs:
+            raise serializers.ValidationError({'id': 'This field is required.'})
+        if op == 'create' and 'id' in attrs:
+            raise serializers.ValidationError({'id': 'Must not be set on create operations; ids are assigned.'})
+        if op in ('create', 'update'):
+            if 'data' not in attrs:
+                raise serializers.ValidationError({'data': 'This field is required.'})
+            try:
+                attrs['data'] = self.get_data_serializer(partial=op == 'update').run_validation(attrs['data'])
+            except serializers.ValidationError as exc:
+                raise serializers.ValidationError({'data': exc.detail})
+        return attrs
+
+    def get_data_serializer(self, partial):
+        """
+        Returns a data serializer that is reused for every operation of the
+        batch, since building serializer fields dominates validation time
+        for large batches.
+        """
+        if not hasattr(self, '_data_serializers'):
+            self._data_serializers = {}
+        if partial not in self._data_serializers:
+            self._data_serializers[partial] = TaskBulkDataSerializer(partial=partial)
+        return self._data_serializers[partial]
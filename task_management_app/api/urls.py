@@ -1,12 +1,17 @@
 from django.contrib import admin
 from django.urls import path
-from .views import UsersView, UserSingleView, TasksView, TaskSingleView, SubtasksView, \
-    SubtaskSingleView, SummaryView, PriosView, CategoriesView
+from .views import UsersView, UserSingleView, TasksView, TaskBulkView, TaskChangesView, TaskExportView, \
+    TaskImportView, TaskSearchView, TaskSingleView, SubtasksView, SubtaskSingleView, SummaryView, PriosView, CategoriesView
 
 urlpatterns = [
     path('user/', UsersView.as_view(), name="user-list"),
     path('user/<int:pk>/', UserSingleView.as_view(), name="user-detail"),
     path('task/', TasksView.as_view(), name="task-list"),
+    path('task/bulk/', TaskBulkView.as_view(), name="task-bulk"),
+    path('task/changes/', TaskChangesView.as_view(), name="task-changes"),
+    path('task/export/', TaskExportView.as_view(), name="task-export"),
+    path('task/import/', TaskImportView.as_view(), name="task-import"),
+    path('task/search/', TaskSearchView.as_view(), name="task-search"),
     path('task/<int:pk>/', TaskSingleView.as_view(), name="task-detail"),
     path('task/<int:pk>/subtask/', SubtasksView.as_view(), name="subtask-list"),
     path('task/<int:task_id>/subtask/<int:pk>/', SubtaskSingleView.as_view(), name='subtask-detail'),
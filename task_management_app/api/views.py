@@ -1,10 +1,30 @@
+import hashlib
+from datetime import datetime, timezone as dt_timezone
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import StreamingHttpResponse
+from django.shortcuts import get_object_or_404
+from django.utils import timezone
 from rest_framework.views import APIView
 from rest_framework.response import Response
-from rest_framework import generics
-from ..models import User, Task, Subtask, Prio, Category
+from rest_framework import generics, status
+from rest_framework.exceptions import ValidationError
+from ..models import User, Task, Subtask, Prio, Category, Tombstone
+from ..importer import IMPORT_FORMATS, PARSERS, TaskImporter
+from ..lookups import category_cache, prio_cache
+from ..search import get_search_backend
+from ..summary import aget_summary, get_summary
+from ..versioning import get_board_version
 from .serializers import UserSerializer, TaskSerializer, SubtaskSerializer, \
-    PrioSerializer, CategorySerializer
-from django.db.models import Count, Min, Q
+    PrioSerializer, CategorySerializer, TaskBulkOperationSerializer
+from .async_views import AsyncReadViewMixin
+from .bulk import InvalidReferences, apply_operations
+from .export import export_csv, export_ndjson
+from .conditional import ConditionalGetMixin
+from .filters import TaskFilterBackend
+from .pagination import TaskCursorPagination, TaskSearchPagination
+from .rows import serialize_task_rows, task_rows
 
 
 class UsersView(generics.ListCreateAPIView):
@@ -25,44 +45,324 @@ class UserSingleView(generics.RetrieveUpdateDestroyAPIView):
     serializer_class = UserSerializer
 
 
-class PriosView(generics.ListCreateAPIView):
+class LookupTableListMixin(ConditionalGetMixin):
+    """
+    Mixin for lookup table list views that serves the list from the
+    in-process lookup cache and supports ETag revalidation based on a hash
+    of the table content.
+    """
+    lookup_cache = None
+
+    def get_etag(self, request, *args, **kwargs):
+        return self.lookup_cache.get_etag()
+
+    def list(self, request, *args, **kwargs):
+        return Response(self.lookup_cache.all())
+
+
+class PriosView(LookupTableListMixin, generics.ListCreateAPIView):
     """
     View for listing all priorities and creating a new priority.
 
     """
     queryset = Prio.objects.all()
     serializer_class = PrioSerializer
+    lookup_cache = prio_cache
 
 
-class CategoriesView(generics.ListCreateAPIView):
+class CategoriesView(LookupTableListMixin, generics.ListCreateAPIView):
     """
     View for listing all categories and creating a new category.
 
     """
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
+    lookup_cache = category_cache
+
+
+class BoardVersionETagMixin(ConditionalGetMixin):
+    """
+    Mixin for views whose responses only change when the board version
+    changes. The ETag combines the board version with the request path and
+    query string, so revalidation costs a single query.
+    """
+
+    def get_etag(self, request, *args, **kwargs):
+        path_hash = hashlib.md5(request.get_full_path().encode(), usedforsecurity=False).hexdigest()[:16]
+        return f'{get_board_version()}-{path_hash}'
+
+
+# Fields of the board card representation (`?view=card`): the subtask list
+# is replaced by the `subtask_total` / `subtask_done` counters.
+CARD_FIELDS = ['id', 'title', 'description', 'assigned_users', 'due_date', 'prio', 'category', 'status',
+               'subtask_total', 'subtask_done']
 
 
-class TasksView(generics.ListCreateAPIView):
+class SparseFieldsMixin:
+    """
+    Mixin for task views that supports the `?fields=` query parameter on
+    reads. Only the requested fields are serialized and only the relations
+    they need are loaded. `?view=` selects one of the predefined field
+    lists in `field_presets` instead.
+    """
+    fields_query_param = 'fields'
+    view_query_param = 'view'
+    field_presets = {'card': CARD_FIELDS}
+
+    def get_requested_fields(self):
+        """
+        Returns the list of field names requested via `?fields=`, or None if
+        the full representation should be returned.
+        """
+        if not hasattr(self, '_requested_fields'):
+            self._requested_fields = self.parse_requested_fields()
+        return self._requested_fields
+
+    def parse_requested_fields(self):
+        if self.request.method != 'GET':
+            return None
+        value = self.request.query_params.get(self.fields_query_param)
+        preset = self.request.query_params.get(self.view_query_param)
+        if preset:
+            if value:
+                raise ValidationError({'view': f'Cannot be combined with `{self.fields_query_param}`.'})
+            if preset not in self.field_presets:
+                raise ValidationError({'view': f"Unknown view: {preset}"})
+            return self.field_presets[preset]
+        if not value:
+            return None
+
+        fields = [name.strip() for name in value.split(',') if name.strip()]
+        readable = [name for name, field in TaskSerializer().fields.items() if not field.write_only]
+        unknown = [name for name in fields if name not in readable]
+        if unknown:
+            raise ValidationError({'fields': f"Unknown field(s): {', '.join(unknown)}"})
+        return fields
+
+    def get_queryset(self):
+        return Task.objects.with_relations(fields=self.get_requested_fields())
+
+    def get_serializer(self, *args, **kwargs):
+        kwargs.setdefault('fields', self.get_requested_fields())
+        return super().get_serializer(*args, **kwargs)
+
+
+class TasksView(AsyncReadViewMixin, BoardVersionETagMixin, SparseFieldsMixin, generics.ListCreateAPIView):
     """
     View for listing all tasks and creating a new task.
 
+    The list is paginated by `(due_date, id)` when a `cursor` or `page_size`
+    parameter is given, supports sparse fieldsets via `?fields=` and can be
+    filtered by status, prio, category, assignee and due date range.
+    Responses carry an ETag derived from the board version. Under ASGI the
+    list is served by `aget`.
+
+    The list is rendered from `.values()` rows by `serialize_task_rows`
+    instead of `TaskSerializer`, which only handles writes here.
     """
-    queryset = Task.objects.all()
     serializer_class = TaskSerializer
+    pagination_class = TaskCursorPagination
+    filter_backends = [TaskFilterBackend]
+
+    def list(self, request, *args, **kwargs):
+        fields = self.get_requested_fields()
+        queryset = self.filter_queryset(self.get_queryset())
+        page_queryset = self.paginator.get_page_queryset(queryset, request)
+        if page_queryset is not None:
+            rows = self.paginator.set_page(list(task_rows(page_queryset, fields)))
+            return self.get_paginated_response(serialize_task_rows(rows, fields))
+        return Response(serialize_task_rows(list(task_rows(queryset, fields)), fields))
+
+    async def aget(self, request, *args, **kwargs):
+        """
+        Async counterpart of `list`. The task rows are loaded with the async
+        ORM; rendering them (which loads assignees and subtasks) runs in a
+        worker thread.
+        """
+        fields = self.get_requested_fields()
+        queryset = self.filter_queryset(self.get_queryset())
+        page_queryset = self.paginator.get_page_queryset(queryset, request)
+        if page_queryset is not None:
+            rows = self.paginator.set_page([row async for row in task_rows(page_queryset, fields)])
+            return self.get_paginated_response(await sync_to_async(serialize_task_rows)(rows, fields))
+        rows = [row async for row in task_rows(queryset, fields)]
+        return Response(await sync_to_async(serialize_task_rows)(rows, fields))
+
+
+class TaskBulkView(APIView):
+    """
+    View for applying a list of task create, update and delete operations
+    in a single transaction.
+
+    Each operation is an object like `{"op": "create", "data": {...}}`,
+    `{"op": "update", "id": 1, "data": {...}}` or `{"op": "delete", "id": 1}`.
+    Either every operation is applied or, if any of them is invalid, none
+    are; the response contains one result per operation.
+    """
+    max_operations = 10000
+    throttle_scope = 'bulk_write'
+
+    def post(self, request):
+        """
+        Validates all operations, then applies them with batched writes.
+        """
+        operations = request.data
+        if not isinstance(operations, list):
+            return Response({'error': 'Expected a list of operations.'}, status=status.HTTP_400_BAD_REQUEST)
+        if len(operations) > self.max_operations:
+            return Response({'error': f'At most {self.max_operations} operations are allowed per request.'},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        serializer = TaskBulkOperationSerializer(data=operations, many=True)
+        if serializer.is_valid():
+            try:
+                results = apply_operations(serializer.validated_data)
+            except InvalidReferences as exc:
+                errors = exc.errors
+            else:
+                return Response({'results': results}, status=status.HTTP_200_OK)
+        else:
+            errors = {index: item_errors for index, item_errors in enumerate(serializer.errors) if item_errors}
+
+        results = []
+        for index, operation in enumerate(operations):
+            operation = operation if isinstance(operation, dict) else {}
+            result = {'op': operation.get('op'), 'id': operation.get('id')}
+            if index in errors:
+                result.update(status='error', errors=errors[index])
+            else:
+                result['status'] = 'skipped'
+            results.append(result)
+        return Response({'results': results}, status=status.HTTP_400_BAD_REQUEST)
+
+
+class FileFormatMixin:
+    """
+    Mixin for views whose `?format=` parameter selects a file format
+    (one of `file_formats`) instead of a response renderer.
+    """
+    file_formats = []
+    default_file_format = 'ndjson'
+
+    def perform_content_negotiation(self, request, force=False):
+        # Never fail negotiation on an unknown renderer format; responses
+        # other than the file itself are rendered as JSON.
+        return super().perform_content_negotiation(request, force=True)
+
+    def get_file_format(self, request):
+        file_format = request.query_params.get('format', self.default_file_format)
+        if file_format not in self.file_formats:
+            raise ValidationError({'format': f"Choose one of: {', '.join(self.file_formats)}."})
+        return file_format
+
+
+class TaskExportView(FileFormatMixin, generics.GenericAPIView):
+    """
+    View for exporting all tasks with their subtasks and assignees.
+
+    `GET /api/task/export/?format=ndjson|csv` streams the export while it is
+    generated, reading tasks in fixed-size chunks, so memory use stays flat
+    however many tasks there are. The task list filters can be applied.
+    """
+    queryset = Task.objects.order_by('id')
+    filter_backends = [TaskFilterBackend]
+    exporters = {
+        'ndjson': (export_ndjson, 'application/x-ndjson'),
+        'csv': (export_csv, 'text/csv'),
+    }
+    file_formats = list(exporters)
+
+    def get(self, request):
+        """
+        Streams the filtered tasks in the requested format.
+        """
+        export_format = self.get_file_format(request)
+        exporter, content_type = self.exporters[export_format]
+        response = StreamingHttpResponse(exporter(self.filter_queryset(self.get_queryset())),
+                                         content_type=content_type)
+        response['Content-Disposition'] = f'attachment; filename="tasks.{export_format}"'
+        return response
+
+
+class TaskImportView(FileFormatMixin, APIView):
+    """
+    View for importing tasks from an NDJSON or CSV upload.
+
+    `POST /api/task/import/?format=ndjson|csv` takes the file as request
+    body, in the layout produced by the export. The body is parsed while it
+    is read and written in batches; rows that fail validation are reported
+    with their line number and skipped, the others are imported.
+    """
+    file_formats = IMPORT_FORMATS
+    max_reported_errors = 1000
+    throttle_scope = 'bulk_write'
+
+    def post(self, request):
+        """
+        Imports the uploaded tasks and reports the number created and the
+        rejected rows.
+        """
+        import_format = self.get_file_format(request)
+        importer = TaskImporter().run(PARSERS[import_format](request.stream or []))
+
+        response_status = status.HTTP_400_BAD_REQUEST if importer.errors and not importer.created \
+            else status.HTTP_200_OK
+        return Response({
+            'created': importer.created,
+            'error_count': len(importer.errors),
+            'errors': importer.errors[:self.max_reported_errors],
+        }, status=response_status)
 
 
-class TaskSingleView(generics.RetrieveUpdateDestroyAPIView):
+class TaskSearchView(APIView):
+    """
+    View for full-text search over task titles, descriptions and subtasks.
+
+    `GET /api/task/search/?q=<words>` returns the tasks containing every
+    word (as a prefix), best matches first, paginated with `page` and
+    `page_size`. Matches in the title rank above matches in the description
+    and subtasks.
+    """
+    pagination_class = TaskSearchPagination
+
+    def get(self, request):
+        """
+        Returns one page of ranked search results.
+        """
+        query = request.query_params.get('q', '').strip()
+        if not query:
+            raise ValidationError({'q': 'This field is required.'})
+
+        backend = get_search_backend()
+        paginator = self.pagination_class()
+        task_ids = paginator.paginate_search(
+            lambda limit, offset: backend.search(query, limit, offset), request
+        )
+        rows = {row.id: row for row in task_rows(Task.objects.filter(id__in=task_ids))}
+        ranked = [rows[pk] for pk in task_ids if pk in rows]
+        return paginator.get_paginated_response(serialize_task_rows(ranked))
+
+
+class TaskSingleView(AsyncReadViewMixin, BoardVersionETagMixin, SparseFieldsMixin,
+                     generics.RetrieveUpdateDestroyAPIView):
     """
     View for retrieving, updating, and deleting a single task.
 
     This view handles operations on a single task, including retrieving
     task details, updating task information, and deleting a task record.
-    It uses the TaskSerializer for serializing task data.
+    It uses the TaskSerializer for serializing task data. Responses carry an
+    ETag derived from the board version. Under ASGI retrieval is served by
+    `aget`.
     """
-    queryset = Task.objects.all()
     serializer_class = TaskSerializer
 
+    async def aget(self, request, *args, **kwargs):
+        """
+        Async counterpart of `retrieve`.
+        """
+        task = await self.aget_object()
+        return Response(await self.aserialize(task))
+
 
 class SubtasksView(generics.ListCreateAPIView):
     """
@@ -73,6 +373,15 @@ class SubtasksView(generics.ListCreateAPIView):
     """
     serializer_class = SubtaskSerializer
 
+    def get_task(self):
+        """
+        Returns the task identified by the `pk` in the URL, loaded with a
+        single query, or raises a 404 if it does not exist.
+        """
+        if not hasattr(self, '_task'):
+            self._task = get_object_or_404(Task.objects.only('id'), pk=self.kwargs.get('pk'))
+        return self._task
+
     def get_queryset(self):
         """
         Returns the subtasks related to a specific task.
@@ -80,23 +389,15 @@ class SubtasksView(generics.ListCreateAPIView):
         The `pk` of the task is retrieved from the URL and used to filter
         the related subtasks.
         """
-        pk = self.kwargs.get('pk')
-        task = Task.objects.get(pk=pk)
-        return task.subtasks.all()
+        return Subtask.objects.filter(task=self.get_task())
 
     def perform_create(self, serializer):
         """
         Creates a new subtask and links it to the correct task.
 
-        The subtask is added to the ManyToMany relation between the task
-        and subtasks if it isn't already associated with the task.
+        The task foreign key is assigned directly while saving the subtask.
         """
-        pk = self.kwargs.get('pk')
-        task = Task.objects.get(pk=pk)
-        subtask = serializer.save()
-
-        if subtask not in task.subtasks.all():
-            task.subtasks.add(subtask)
+        serializer.save(task=self.get_task())
 
 
 class SubtaskSingleView(generics.RetrieveUpdateDestroyAPIView):
@@ -105,7 +406,8 @@ class SubtaskSingleView(generics.RetrieveUpdateDestroyAPIView):
 
     This view handles operations on a single subtask, including retrieving
     subtask details, updating subtask information, and deleting a subtask.
-    The subtask is always linked to a specific task.
+    The subtask is always linked to a specific task; its `task` field is
+    read-only, so updates cannot move it to another task.
     """
     serializer_class = SubtaskSerializer
 
@@ -118,38 +420,10 @@ class SubtaskSingleView(generics.RetrieveUpdateDestroyAPIView):
         belonging to that task are included.
         """
         task_id = self.kwargs.get('task_id')
-        return Subtask.objects.filter(task__id=task_id)
+        return Subtask.objects.filter(task_id=task_id)
 
-    def perform_update(self, serializer):
-        """
-        Ensures that the subtask always remains linked to the correct task.
 
-        This method ensures that the subtask is saved and remains part of
-        the specified task. If the subtask is not already associated with the
-        task, it is added back to the task's subtasks.
-        """
-        subtask = serializer.save(partial=True)  # save subtask
-        task_id = self.kwargs.get('task_id')
-        task = Task.objects.get(id=task_id)
-
-        if subtask not in task.subtasks.all():
-            task.subtasks.add(subtask)  # If it is no longer linked, add it back
-
-    def perform_destroy(self, instance):
-        """
-        Removes the subtask from the task's ManyToMany relationship before deleting it.
-
-        This method removes the subtask from the task's relationship before
-        permanently deleting it from the database.
-        """
-        task_id = self.kwargs.get('task_id')
-        task = Task.objects.get(id=task_id)
-
-        task.subtasks.remove(instance)  # remove subtask of task relation
-        instance.delete()  # deletes subtask permanently
-
-
-class SummaryView(APIView):
+class SummaryView(AsyncReadViewMixin, BoardVersionETagMixin, APIView):
     """
     View for retrieving a summary of task statistics.
 
@@ -158,6 +432,8 @@ class SummaryView(APIView):
     - The total number of tasks
     - The most urgent task's due date
     - Tasks filtered by priority level
+
+    Responses carry an ETag derived from the board version.
     """
 
     def get(self, request):
@@ -167,15 +443,68 @@ class SummaryView(APIView):
         This method calculates counts of tasks based on their `status` and
         `prio` level and returns aggregated data, including counts for
         `to_do`, `done`, `in_progress`, `await_feedback`, and `urgent` tasks.
+        The counters are cached and invalidated whenever a task changes.
         """
-        summary_data = Task.objects.aggregate(
-            todo_count=Count("id", filter=Q(status="to_do")),
-            done_count=Count("id", filter=Q(status="done")),
-            total_tasks=Count("id"),
-            urgent_count=Count("id", filter=Q(prio__level="urgent")),
-            most_urgent_due_date=Min("due_date", filter=Q(prio__level="urgent")),
-            in_progress_count=Count("id", filter=Q(status="in_progress")),
-            awaiting_feedback_count=Count("id", filter=Q(status="await_feedback"))
-        )
+        summary_data = get_summary()
 
         return Response(summary_data)
+
+    async def aget(self, request, *args, **kwargs):
+        """
+        Async counterpart of `get`, served under ASGI.
+        """
+        return Response(await aget_summary())
+
+
+class TaskChangesView(APIView):
+    """
+    View for delta synchronisation of the task board.
+
+    `GET /api/task/changes/?since=<token>` returns the tasks that were
+    created or modified (including changes to their subtasks and assignees)
+    and the ids of tasks and subtasks deleted since the token, together with
+    a new token for the next call. Without `since`, all tasks are returned.
+    Changed tasks are found through the `updated_at` and `deleted_at`
+    indexes, so the cost scales with the number of changes.
+    """
+
+    def get(self, request):
+        """
+        Returns the changes since the given token and a new token.
+        """
+        now = timezone.now()
+        since = self.parse_token(request.query_params.get('since'))
+        if since is not None and since < now - settings.SYNC_TOMBSTONE_RETENTION:
+            return Response({'error': 'Sync token expired, a full resync is required.'}, status=status.HTTP_410_GONE)
+
+        tasks = Task.objects.with_relations()
+        deleted_tasks, deleted_subtasks = [], []
+        if since is not None:
+            tombstones = Tombstone.objects.filter(deleted_at__gt=since).values_list('model', 'object_id', 'task_id')
+            changed_ids = set(Task.objects.filter(updated_at__gt=since).values_list('id', flat=True))
+            changed_ids.update(Subtask.objects.filter(updated_at__gt=since).values_list('task_id', flat=True))
+            for model, object_id, task_id in tombstones:
+                if model == Tombstone.TASK:
+                    deleted_tasks.append(object_id)
+                else:
+                    deleted_subtasks.append(object_id)
+                    changed_ids.add(task_id)
+            tasks = tasks.filter(id__in=changed_ids)
+
+        return Response({
+            'token': self.make_token(now - settings.SYNC_TOKEN_OVERLAP),
+            'tasks': TaskSerializer(tasks, many=True).data,
+            'deleted_tasks': deleted_tasks,
+            'deleted_subtasks': deleted_subtasks,
+        })
+
+    def parse_token(self, token):
+        if not token:
+            return None
+        try:
+            return datetime.fromtimestamp(int(token) / 1_000_000, tz=dt_timezone.utc)
+        except (ValueError, OverflowError, OSError):
+            raise ValidationError({'since': 'Invalid sync token.'})
+
+    def make_token(self, moment):
+        return str(int(moment.timestamp() * 1_000_000))
@@ -0,0 +1,97 @@
+import asyncio
+import time
+from urllib.parse import parse_qs
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken, TokenError
+from rest_framework_simplejwt.tokens import AccessToken
+from user_auth_app.authentication import CachedJWTAuthentication
+
+from .push import BOARD_GROUP, encode_message, get_channel_layer
+
+UNAUTHORIZED_CLOSE_CODE = 4401
+
+
+def authenticate_websocket(scope):
+    """
+    Validates the JWT access token passed as `?token=` (browsers cannot set
+    headers on websocket requests) and returns it, or None.
+    """
+    query = parse_qs(scope.get('query_string', b'').decode())
+    token = query.get('token', [None])[0]
+    if not token:
+        return None
+    try:
+        return AccessToken(token)
+    except TokenError:
+        return None
+
+
+def is_authorized(token):
+    """
+    Returns whether the user of `token` still exists, is active and has not
+    changed their password since the token was issued.
+    """
+    if token['exp'] <= time.time():
+        return False
+    try:
+        CachedJWTAuthentication().get_user(token)
+    except (AuthenticationFailed, InvalidToken):
+        return False
+    return True
+
+
+async def board_consumer(scope, receive, send):
+    """
+    ASGI websocket application that pushes board changes to the client.
+
+    After a successful handshake the client receives one JSON text frame
+    per change: compact diffs of tasks, subtasks and categories, summary
+    counters, and `{"type": "board", "op": "resync"}` when it should catch
+    up through `/api/task/changes/` instead.
+
+    The connection is closed with `UNAUTHORIZED_CLOSE_CODE` when the access
+    token expires, and when a check every `PUSH_AUTH_CHECK_INTERVAL` seconds
+    finds the user deleted, deactivated or with a changed password. The
+    client reconnects with a fresh token.
+    """
+    event = await receive()
+    if event['type'] != 'websocket.connect':
+        return
+    token = authenticate_websocket(scope)
+    if token is None or not await sync_to_async(is_authorized)(token):
+        await send({'type': 'websocket.close', 'code': UNAUTHORIZED_CLOSE_CODE})
+        return
+    # Subscribe before accepting so no change after the handshake is missed.
+    subscription = get_channel_layer().subscribe(BOARD_GROUP)
+    await send({'type': 'websocket.accept'})
+
+    def wait_for_check():
+        delay = min(settings.PUSH_AUTH_CHECK_INTERVAL, token['exp'] - time.time())
+        return asyncio.ensure_future(asyncio.sleep(max(delay, 0)))
+
+    receive_task = asyncio.ensure_future(receive())
+    message_task = asyncio.ensure_future(subscription.get())
+    check_task = wait_for_check()
+    try:
+        while True:
+            done, _ = await asyncio.wait({receive_task, message_task, check_task},
+                                         return_when=asyncio.FIRST_COMPLETED)
+            if receive_task in done:
+                if receive_task.result()['type'] == 'websocket.disconnect':
+                    break
+                receive_task = asyncio.ensure_future(receive())
+            if check_task in done:
+                if not await sync_to_async(is_authorized)(token):
+                    await send({'type': 'websocket.close', 'code': UNAUTHORIZED_CLOSE_CODE})
+                    break
+                check_task = wait_for_check()
+            if message_task in done:
+                await send({'type': 'websocket.send', 'text': encode_message(message_task.result())})
+                message_task = asyncio.ensure_future(subscription.get())
+    finally:
+        receive_task.cancel()
+        message_task.cancel()
+        check_task.cancel()
+        subscription.close()
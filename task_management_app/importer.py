@@ -0,0 +1,258 @@
+import csv
+import json
+
+from django.db import DatabaseError, transaction
+from django.utils.dateparse import parse_date
+
+from .models import User, Category, Prio, Subtask, Task
+from .signals import receivers_suppressed, tasks_changed_in_bulk
+
+IMPORT_BATCH_SIZE = 1000
+
+IMPORT_FORMATS = ['ndjson', 'csv']
+
+TITLE_MAX_LENGTH = Task._meta.get_field('title').max_length
+STATUS_MAX_LENGTH = Task._meta.get_field('status').max_length
+SUBTASK_MAX_LENGTH = Subtask._meta.get_field('subtask').max_length
+
+
+class RowError(Exception):
+    """
+    Raised for a row that cannot be imported, with DRF-style field errors.
+    """
+
+    def __init__(self, errors):
+        super().__init__(errors)
+        self.errors = errors
+
+
+def parse_ndjson(lines):
+    """
+    Yields `(line_number, record)` for each non-blank line of an NDJSON
+    stream. Lines that are not JSON objects yield a `RowError` as record.
+    """
+    for line_number, line in enumerate(lines, start=1):
+        if isinstance(line, bytes):
+            line = line.decode('utf-8')
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as exc:
+            yield line_number, RowError({'non_field_errors': [f'Invalid JSON: {exc}']})
+            continue
+        if not isinstance(record, dict):
+            yield line_number, RowError({'non_field_errors': ['Expected a JSON object.']})
+            continue
+        yield line_number, record
+
+
+def parse_csv(lines):
+    """
+    Yields `(line_number, record)` for each row of a CSV stream with a header
+    row, in the column layout of the CSV export. Assignees are `;`-separated
+    and subtasks a JSON list.
+    """
+    reader = csv.DictReader(line.decode('utf-8') if isinstance(line, bytes) else line for line in lines)
+    for row in reader:
+        record = {name: value for name, value in row.items() if name and value not in (None, '')}
+        if 'assigned_users' in record:
+            record['assigned_users'] = [email.strip() for email in record['assigned_users'].split(';')
+                                        if email.strip()]
+        if 'subtasks' in record:
+            try:
+                record['subtasks'] = json.loads(record['subtasks'])
+            except ValueError:
+                yield reader.line_num, RowError({'subtasks': ['Expected a JSON list.']})
+                continue
+        yield reader.line_num, record
+
+
+PARSERS = {'ndjson': parse_ndjson, 'csv': parse_csv}
+
+
+class ReferenceMap:
+    """
+    In-memory index of a related table by id and by a case-insensitive
+    natural key, loaded with a single query before the import starts.
+    """
+
+    def __init__(self, model, key):
+        self.key = key
+        self.by_id = {}
+        self.by_key = {}
+        for pk, value in model.objects.order_by('id').values_list('id', key):
+            self.by_id[pk] = pk
+            normalized = value.lower()
+            # Ambiguous keys resolve to None and are reported per row.
+            self.by_key[normalized] = None if normalized in self.by_key else pk
+
+    def resolve(self, value):
+        """
+        Returns the id referenced by an id, a natural key or an object with
+        either, or raises ValueError. Objects are matched by their natural
+        key first, so exports from another installation can be imported.
+        """
+        if isinstance(value, dict):
+            value = value.get(self.key, value.get('id'))
+        if isinstance(value, int) and not isinstance(value, bool):
+            if value in self.by_id:
+                return value
+            raise ValueError(f'Invalid pk "{value}" - object does not exist.')
+        if isinstance(value, str):
+            pk = self.by_key.get(value.strip().lower(), 0)
+            if pk is None:
+                raise ValueError(f'"{value}" matches more than one object.')
+            if pk:
+                return pk
+            raise ValueError(f'Object with {self.key}={value} does not exist.')
+        raise ValueError(f'Incorrect type. Expected pk value or {self.key}.')
+
+
+class TaskImporter:
+    """
+    Imports tasks with their assignees and subtasks from parsed records.
+
+    Categories, prios and users are resolved against maps loaded once up
+    front (by id, or by category name, prio level and user email). Valid
+    rows are written in batches of `batch_size`, each in its own savepoint
+    with batched inserts; invalid rows are collected in `errors` together
+    with their line number, and do not stop the import.
+    """
+
+    def __init__(self, batch_size=IMPORT_BATCH_SIZE):
+        self.batch_size = batch_size
+        self.categories = ReferenceMap(Category, 'name')
+        self.prios = ReferenceMap(Prio, 'level')
+        self.users = ReferenceMap(User, 'email')
+        self.created = 0
+        self.errors = []
+
+    def run(self, records):
+        """
+        Imports `(line_number, record)` pairs and returns `self`.
+        """
+        batch, line_number = [], 0
+        records = iter(records)
+        while True:
+            try:
+                line_number, record = next(records)
+            except StopIteration:
+                break
+            except (UnicodeDecodeError, csv.Error) as exc:
+                # The rest of the file cannot be read; keep what was parsed.
+                self.errors.append({'line': line_number + 1,
+                                    'errors': {'non_field_errors': [f'Could not read the file: {exc}']}})
+                break
+            try:
+                if isinstance(record, RowError):
+                    raise record
+                batch.append((line_number, self.clean(record)))
+            except RowError as exc:
+                self.errors.append({'line': line_number, 'errors': exc.errors})
+            if len(batch) >= self.batch_size:
+                self.write(batch)
+                batch = []
+        if batch:
+            self.write(batch)
+        return self
+
+    def clean(self, record):
+        """
+        Validates a record and returns the task, assignee ids and subtasks
+        to insert, or raises `RowError`.
+        """
+        errors = {}
+
+        title = record.get('title')
+        if not isinstance(title, str) or not title.strip():
+            errors['title'] = ['This field is required.']
+        elif len(title) > TITLE_MAX_LENGTH:
+            errors['title'] = [f'Ensure this field has no more than {TITLE_MAX_LENGTH} characters.']
+
+        description = record.get('description', '')
+        if not isinstance(description, str):
+            errors['description'] = ['Not a valid string.']
+
+        due_date = None
+        try:
+            due_date = parse_date(record['due_date']) if isinstance(record.get('due_date'), str) else None
+        except ValueError:
+            pass
+        if due_date is None:
+            errors['due_date'] = ['A valid date in the format YYYY-MM-DD is required.']
+
+        status = record.get('status', 'to_do')
+        if not isinstance(status, str) or not status or len(status) > STATUS_MAX_LENGTH:
+            errors['status'] = ['Not a valid status.']
+
+        category_id = self.resolve(self.categories, record, 'category', errors)
+        prio_id = self.resolve(self.prios, record, 'prio', errors)
+
+        user_ids = []
+        assignees = record.get('assigned_user_id', record.get('assigned_users', []))
+        if not isinstance(assignees, list):
+            errors['assigned_users'] = ['Expected a list.']
+        else:
+            for assignee in assignees:
+                try:
+                    user_ids.append(self.users.resolve(assignee))
+                except ValueError as exc:
+                    errors.setdefault('assigned_users', []).append(str(exc))
+
+        subtasks = []
+        subtasks_data = record.get('subtasks', [])
+        if not isinstance(subtasks_data, list):
+            errors['subtasks'] = ['Expected a list.']
+        else:
+            for subtask_data in subtasks_data:
+                subtask = subtask_data.get('subtask') if isinstance(subtask_data, dict) else None
+                completed = subtask_data.get('completed', False) if isinstance(subtask_data, dict) else None
+                if not isinstance(subtask, str) or not subtask or len(subtask) > SUBTASK_MAX_LENGTH \
+                        or not isinstance(completed, bool):
+                    errors['subtasks'] = ['Each subtask needs a `subtask` text and a boolean `completed`.']
+                    break
+                subtasks.append((subtask, completed))
+
+        if errors:
+            raise RowError(errors)
+        task = Task(title=title, description=description, due_date=due_date, status=status,
+                    category_id=category_id, prio_id=prio_id, subtask_total=len(subtasks),
+                    subtask_done=sum(1 for _, completed in subtasks if completed))
+        return task, list(dict.fromkeys(user_ids)), subtasks
+
+    def resolve(self, reference_map, record, name, errors):
+        value = record.get(f'{name}_id', record.get(name))
+        if value is None:
+            errors[name] = ['This field is required.']
+            return None
+        try:
+            return reference_map.resolve(value)
+        except ValueError as exc:
+            errors[name] = [str(exc)]
+            return None
+
+    def write(self, batch):
+        """
+        Inserts a batch of cleaned rows in a savepoint. If the database
+        rejects the batch, it is rolled back and its rows are reported.
+        """
+        Through = Task.assigned_users.through
+        try:
+            with transaction.atomic():
+                with receivers_suppressed():
+                    tasks = Task.objects.bulk_create([task for _, (task, _, _) in batch])
+                    Through.objects.bulk_create([
+                        Through(task_id=task.id, user_id=user_id)
+                        for task, user_ids, _ in (row for _, row in batch) for user_id in user_ids
+                    ])
+                    Subtask.objects.bulk_create([
+                        Subtask(task_id=task.id, subtask=subtask, completed=completed)
+                        for task, _, subtasks in (row for _, row in batch) for subtask, completed in subtasks
+                    ])
+                tasks_changed_in_bulk([task.id for task in tasks])
+        except DatabaseError as exc:
+            self.errors.extend({'line': line_number, 'errors': {'non_field_errors': [f'Batch rejected: {exc}']}}
+                               for line_number, _ in batch)
+            return
+        self.created += len(batch)
@@ -0,0 +1,93 @@
+import hashlib
+import json
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+
+from .models import Category, Prio
+
+
+class LookupTableCache:
+    """
+    In-process read-through cache for a small lookup table.
+
+    The rows are kept in process memory together with a version stamp. The
+    authoritative version lives in the Django cache and is replaced on every
+    write to the table, so each process reloads its copy the next time it
+    notices the version changed. The stamp expires after
+    `LOOKUP_CACHE_TIMEOUT` seconds, so with a per-process cache (e.g. the
+    local-memory cache) other processes pick up a write within that time.
+    Cached rows are shared and must not be mutated by callers.
+
+    The ETag of the table is a hash of its rows rather than the version
+    stamp, so it is the same in every process and survives stamp expiry
+    until the rows change.
+    """
+
+    def __init__(self, model, fields):
+        self.model = model
+        self.fields = fields
+        self.version_key = f'lookup_version:{model._meta.label_lower}'
+        self._snapshot = (None, {}, None)
+
+    def get_version(self):
+        """
+        Returns the current version stamp, creating one if the cache has none.
+        """
+        version = cache.get(self.version_key)
+        if version is None:
+            cache.add(self.version_key, uuid.uuid4().hex, settings.LOOKUP_CACHE_TIMEOUT)
+            version = cache.get(self.version_key)
+        return version
+
+    def invalidate(self):
+        """
+        Replaces the version stamp so every process reloads the table.
+
+        The stamp is replaced again when the writer's transaction commits,
+        since a concurrent read may have reloaded the old rows meanwhile.
+        """
+        cache.set(self.version_key, uuid.uuid4().hex, settings.LOOKUP_CACHE_TIMEOUT)
+        transaction.on_commit(
+            lambda: cache.set(self.version_key, uuid.uuid4().hex, settings.LOOKUP_CACHE_TIMEOUT)
+        )
+
+    def get_snapshot(self):
+        """
+        Returns the version stamp, the rows and the ETag of this process's
+        copy of the table, reloading it if the version stamp has changed.
+        """
+        version = self.get_version()
+        if self._snapshot[0] != version:
+            rows = {row['id']: row for row in self.model.objects.order_by('id').values(*self.fields)}
+            content = json.dumps(list(rows.values()), cls=DjangoJSONEncoder, sort_keys=True)
+            etag = hashlib.md5(content.encode(), usedforsecurity=False).hexdigest()
+            self._snapshot = (version, rows, etag)
+        return self._snapshot
+
+    def get_rows(self):
+        """
+        Returns a dict of serialized rows keyed by primary key.
+        """
+        return self.get_snapshot()[1]
+
+    def get_etag(self):
+        return self.get_snapshot()[2]
+
+    def reload(self):
+        """
+        Reloads this process's copy of the table, e.g. when a row created
+        moments ago by another process is missing from it.
+        """
+        self._snapshot = (None, {}, None)
+        return self.get_rows()
+
+    def all(self):
+        return list(self.get_rows().values())
+
+
+prio_cache = LookupTableCache(Prio, ['id', 'level', 'icon_path'])
+category_cache = LookupTableCache(Category, ['id', 'name', 'color'])
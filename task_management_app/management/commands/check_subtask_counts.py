@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand
+
+from ...models import Task
+
+
+class Command(BaseCommand):
+    """
+    Compares the denormalized subtask counters of every task with the
+    subtask table and repairs the tasks that drifted, e.g. after subtasks
+    were written with `QuerySet.update()` or raw SQL.
+    """
+    help = "Checks the per-task subtask counters against the subtask table and repairs drift."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help="Only report drift, do not repair it.")
+
+    def handle(self, *args, **options):
+        drifted = list(Task.objects.with_subtask_drift().values_list(
+            'id', 'subtask_total', 'subtask_done', 'live_total', 'live_done'
+        ))
+        if not drifted:
+            self.stdout.write(self.style.SUCCESS("Subtask counters match the subtask table."))
+            return
+
+        for pk, total, done, live_total, live_done in drifted:
+            self.stdout.write(self.style.WARNING(
+                f"Task {pk}: stored {done}/{total}, live {live_done}/{live_total}"
+            ))
+        if options['dry_run']:
+            self.stdout.write(f"Found {len(drifted)} task(s) with drifted counters.")
+            return
+
+        # Recomputed in the UPDATE itself, so concurrent subtask writes are not overwritten.
+        repaired = Task.objects.filter(id__in=[row[0] for row in drifted]).refresh_subtask_counts()
+        self.stdout.write(self.style.SUCCESS(f"Repaired the subtask counters of {repaired} task(s)."))
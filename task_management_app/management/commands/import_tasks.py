@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from ...importer import IMPORT_BATCH_SIZE, IMPORT_FORMATS, PARSERS, TaskImporter
+
+
+class Command(BaseCommand):
+    """
+    Imports tasks from an NDJSON or CSV file in the layout produced by the
+    task export. Rows that fail validation are reported and skipped.
+    """
+    help = "Imports tasks from an NDJSON or CSV file."
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="File to import.")
+        parser.add_argument('--format', choices=IMPORT_FORMATS,
+                            help="File format (default: derived from the file extension, else ndjson).")
+        parser.add_argument('--batch-size', type=int, default=IMPORT_BATCH_SIZE,
+                            help="Number of tasks written per savepoint.")
+
+    def handle(self, *args, **options):
+        import_format = options['format'] or ('csv' if options['path'].lower().endswith('.csv') else 'ndjson')
+        try:
+            with open(options['path'], encoding='utf-8', newline='') as file:
+                importer = TaskImporter(batch_size=options['batch_size']).run(PARSERS[import_format](file))
+        except OSError as exc:
+            raise CommandError(exc)
+
+        for error in importer.errors:
+            self.stderr.write(f"Line {error['line']}: {error['errors']}")
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {importer.created} task(s), rejected {len(importer.errors)} row(s)."
+        ))
@@ -0,0 +1,18 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from ...models import Tombstone
+
+
+class Command(BaseCommand):
+    """
+    Deletes tombstones older than the delta sync retention period. Clients
+    with older sync tokens receive 410 and perform a full resync instead.
+    """
+    help = "Deletes tombstones older than SYNC_TOMBSTONE_RETENTION."
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - settings.SYNC_TOMBSTONE_RETENTION
+        deleted, _ = Tombstone.objects.filter(deleted_at__lt=cutoff).delete()
+        self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} tombstone(s)."))
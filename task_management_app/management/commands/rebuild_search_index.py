@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from ...search import get_search_backend
+
+
+class Command(BaseCommand):
+    """
+    Rebuilds the task search index from the task and subtask tables, e.g.
+    after writes that bypassed the signal receivers such as
+    `QuerySet.update()` or raw SQL.
+    """
+    help = "Rebuilds the full-text task search index."
+
+    def handle(self, *args, **options):
+        count = get_search_backend().rebuild()
+        self.stdout.write(self.style.SUCCESS(f"Indexed {count} task(s)."))
@@ -0,0 +1,44 @@
+from django.core.cache import DEFAULT_CACHE_ALIAS, cache, caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.management.base import BaseCommand, CommandError
+
+from ...summary import DEFAULT_BOARD, get_summary_cache_key, rebuild_summary
+
+
+class Command(BaseCommand):
+    """
+    Rebuilds the cached summary counters from the task table and reports
+    any drift between the cached values and the live aggregate.
+
+    The command runs in its own process, so it needs a cache backend shared
+    with the server (e.g. Redis or Memcached); with a per-process cache it
+    would check and rebuild a cache the server never reads.
+    """
+    help = "Rebuilds the cached task summary and checks it against the live aggregate."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--board', default=DEFAULT_BOARD, help="Board whose summary should be rebuilt.")
+
+    def handle(self, *args, **options):
+        backend = caches[DEFAULT_CACHE_ALIAS]
+        if isinstance(backend, (LocMemCache, DummyCache)):
+            raise CommandError(
+                f"The default cache ({type(backend).__name__}) is not shared with the server processes. "
+                "Configure a shared cache backend (e.g. Redis or Memcached) to rebuild the summary."
+            )
+        board = options['board']
+        cached = cache.get(get_summary_cache_key(board))
+        live = rebuild_summary(board)
+
+        if cached is None:
+            self.stdout.write(f"No cached summary for board '{board}'.")
+        else:
+            drift = {key: (cached.get(key), value) for key, value in live.items() if cached.get(key) != value}
+            if drift:
+                for key, (cached_value, live_value) in drift.items():
+                    self.stdout.write(self.style.WARNING(f"{key}: cached {cached_value}, live {live_value}"))
+            else:
+                self.stdout.write("Cached summary matches the live aggregate.")
+
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt summary for board '{board}'."))
@@ -0,0 +1,17 @@
+# Generated by Django 5.1.6 on 2026-10-18 17:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('task_management_app', '0011_update_priorities'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['due_date', 'id'], name='task_due_date_id_idx'),
+        ),
+    ]
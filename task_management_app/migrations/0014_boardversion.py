@@ -0,0 +1,27 @@
+# Generated by Django 5.1.6 on 2026-10-18 17:54
+
+from django.db import migrations, models
+
+
+def create_default_board_version(apps, schema_editor):
+    BoardVersion = apps.get_model("task_management_app", "BoardVersion")
+    BoardVersion.objects.get_or_create(board="default")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('task_management_app', '0013_task_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BoardVersion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('board', models.CharField(max_length=50, unique=True)),
+                ('version', models.PositiveBigIntegerField(default=0)),
+            ],
+        ),
+        migrations.RunPython(create_default_board_version, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,54 @@
+# Generated by Django 5.1.6 on 2026-10-18 20:41
+
+from django.db import migrations
+
+SQLITE_FORWARD = [
+    "CREATE VIRTUAL TABLE task_management_app_tasksearch USING fts5("
+    "title, description, subtasks, tokenize = 'unicode61 remove_diacritics 2')",
+    "INSERT INTO task_management_app_tasksearch (rowid, title, description, subtasks) "
+    "SELECT t.id, t.title, t.description, "
+    "COALESCE((SELECT group_concat(s.subtask, ' ') FROM task_management_app_subtask s WHERE s.task_id = t.id), '') "
+    "FROM task_management_app_task t",
+]
+
+POSTGRES_FORWARD = [
+    "CREATE TABLE task_management_app_tasksearch ("
+    "task_id bigint PRIMARY KEY REFERENCES task_management_app_task (id) ON DELETE CASCADE "
+    "DEFERRABLE INITIALLY DEFERRED, "
+    "document tsvector NOT NULL)",
+    "CREATE INDEX task_search_document_gin ON task_management_app_tasksearch USING GIN (document)",
+    "INSERT INTO task_management_app_tasksearch (task_id, document) "
+    "SELECT t.id, setweight(to_tsvector('simple', t.title), 'A') || "
+    "setweight(to_tsvector('simple', t.description), 'B') || "
+    "setweight(to_tsvector('simple', COALESCE((SELECT string_agg(s.subtask, ' ') "
+    "FROM task_management_app_subtask s WHERE s.task_id = t.id), '')), 'C') "
+    "FROM task_management_app_task t",
+]
+
+FORWARD = {'sqlite': SQLITE_FORWARD, 'postgresql': POSTGRES_FORWARD}
+
+
+def create_search_index(apps, schema_editor):
+    for statement in FORWARD.get(schema_editor.connection.vendor, []):
+        schema_editor.execute(statement)
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor in FORWARD:
+        schema_editor.execute("DROP TABLE task_management_app_tasksearch")
+
+
+class Migration(migrations.Migration):
+    """
+    Creates the text index used by the task search endpoint: an FTS5 table
+    on SQLite, a tsvector table with a GIN index on PostgreSQL. Other
+    databases use an unindexed fallback search and get no table.
+    """
+
+    dependencies = [
+        ('task_management_app', '0015_delta_sync'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.1.6 on 2026-10-18 19:02
+
+from django.db import migrations, models
+from django.db.models.functions import Coalesce
+
+
+def fill_subtask_counters(apps, schema_editor):
+    """
+    Computes the counters of existing tasks from their subtasks.
+    """
+    Task = apps.get_model('task_management_app', 'Task')
+    Subtask = apps.get_model('task_management_app', 'Subtask')
+    subtasks = Subtask.objects.filter(task_id=models.OuterRef('pk')).order_by().values('task_id')
+    Task.objects.update(
+        subtask_total=Coalesce(models.Subquery(subtasks.annotate(count=models.Count('id')).values('count')), 0),
+        subtask_done=Coalesce(models.Subquery(subtasks.filter(completed=True)
+                                              .annotate(count=models.Count('id')).values('count')), 0),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('task_management_app', '0016_task_search_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='task',
+            name='subtask_done',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='subtask_total',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(fill_subtask_counters, migrations.RunPython.noop),
+    ]
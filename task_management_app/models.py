@@ -1,7 +1,11 @@
 from django.db import models
+from django.db.models.functions import Coalesce
+from django.utils import timezone
 
 # Create your models here.
 
+DEFAULT_BOARD = 'default'
+
 
 class User(models.Model):
     """
@@ -41,7 +45,96 @@ class Prio(models.Model):
         return self.level
 
 
-class Task(models.Model):
+class ChangeTrackingMixin:
+    """
+    Model mixin that remembers the `DIFF_FIELDS` values loaded from the
+    database, so that signal receivers can tell which of them a save
+    changed.
+    """
+    DIFF_FIELDS = []
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_values = dict(zip(field_names, values))
+        return instance
+
+    def get_changed_fields(self):
+        """
+        Returns the diff fields whose values differ from those loaded from
+        the database (all of them for new objects), and marks the current
+        values as loaded.
+        """
+        loaded = getattr(self, '_loaded_values', {})
+        current = {name: getattr(self, name) for name in self.DIFF_FIELDS
+                   if name in loaded or name not in self.get_deferred_fields()}
+        changed = {name: value for name, value in current.items() if name not in loaded or loaded[name] != value}
+        self._loaded_values = {**loaded, **current}
+        return changed
+
+
+def subtask_count_expressions():
+    """
+    Returns subquery expressions for the number of subtasks and completed
+    subtasks of the task in the outer query, keyed by counter field.
+    """
+    subtasks = Subtask.objects.filter(task_id=models.OuterRef('pk')).order_by().values('task_id')
+    count = models.Count('id')
+    return {
+        'subtask_total': Coalesce(models.Subquery(subtasks.annotate(count=count).values('count')), 0),
+        'subtask_done': Coalesce(models.Subquery(subtasks.filter(completed=True).annotate(count=count)
+                                                 .values('count')), 0),
+    }
+
+
+class TaskQuerySet(models.QuerySet):
+    """
+    QuerySet for tasks with helpers for loading related data efficiently.
+
+    """
+
+    def refresh_subtask_counts(self):
+        """
+        Recomputes `subtask_total` and `subtask_done` of the selected tasks
+        from the subtask table with a single UPDATE.
+        """
+        return self.update(**subtask_count_expressions())
+
+    def with_subtask_drift(self):
+        """
+        Returns the tasks whose subtask counters differ from the subtask
+        table, annotated with the live counts as `live_total` and
+        `live_done`.
+        """
+        return self.annotate(
+            live_total=subtask_count_expressions()['subtask_total'],
+            live_done=subtask_count_expressions()['subtask_done'],
+        ).exclude(subtask_total=models.F('live_total'), subtask_done=models.F('live_done'))
+
+    def with_relations(self, fields=None):
+        """
+        Prefetches assigned users and subtasks (each ordered by id), so
+        serializing a list of tasks needs a constant number of queries
+        regardless of its length. Category and prio are rendered from the
+        lookup table cache and need no join.
+
+        If `fields` is given, only the relations named in it are loaded and
+        the `description` column is deferred unless requested.
+        """
+        def wanted(name):
+            return fields is None or name in fields
+
+        prefetches = {
+            'assigned_users': models.Prefetch('assigned_users', queryset=User.objects.order_by('id')),
+            'subtasks': models.Prefetch('subtasks', queryset=Subtask.objects.order_by('id')),
+        }
+        queryset = self.prefetch_related(*[prefetch for name, prefetch in prefetches.items() if wanted(name)])
+        if not wanted('description'):
+            queryset = queryset.defer('description')
+        return queryset
+
+
+class Task(ChangeTrackingMixin, models.Model):
     """
     Represents a task to be completed with various attributes and assigned users.
 
@@ -53,6 +146,9 @@ class Task(models.Model):
     assigned_users (ManyToManyField): A list of users assigned to the task.
     category (ForeignKey): The category the task belongs to.
     prio (ForeignKey): The priority level of the task.
+    updated_at (datetime): When the task was last written, used for delta sync.
+    subtask_total (int): Number of subtasks, kept in sync with the subtask table.
+    subtask_done (int): Number of completed subtasks.
 
     """
     title = models.CharField(max_length=255)
@@ -62,12 +158,47 @@ class Task(models.Model):
     assigned_users = models.ManyToManyField(User, related_name='tasks', blank=True)
     category = models.ForeignKey(Category, on_delete=models.CASCADE)
     prio = models.ForeignKey(Prio, on_delete=models.CASCADE)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+    subtask_total = models.PositiveIntegerField(default=0)
+    subtask_done = models.PositiveIntegerField(default=0)
+
+    objects = TaskQuerySet.as_manager()
+
+    # Scalar fields included in pushed change diffs.
+    DIFF_FIELDS = ['title', 'description', 'due_date', 'status', 'category_id', 'prio_id']
+
+    # Denormalized subtask counters, written on insert and by
+    # `TaskQuerySet.refresh_subtask_counts()`.
+    COUNTER_FIELDS = ['subtask_total', 'subtask_done']
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['due_date', 'id'], name='task_due_date_id_idx'),
+            models.Index(fields=['status', 'due_date'], name='task_status_due_date_idx'),
+            models.Index(fields=['prio', 'due_date'], name='task_prio_due_date_idx'),
+            models.Index(fields=['category', 'due_date'], name='task_category_due_date_idx'),
+        ]
 
     def __str__(self):
         return self.title
 
-
-class Subtask(models.Model):
+    def save(self, *args, **kwargs):
+        """
+        Leaves the subtask counters out of updates unless they are listed in
+        `update_fields`, so that saving a task that was loaded before its
+        subtasks changed cannot overwrite them with stale values.
+        """
+        if not args and not self._state.adding and kwargs.get('update_fields') is None \
+                and not kwargs.get('force_insert'):
+            deferred = self.get_deferred_fields()
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.attname not in deferred and field.name not in self.COUNTER_FIELDS
+            ]
+        super().save(*args, **kwargs)
+
+
+class Subtask(ChangeTrackingMixin, models.Model):
     """
     Represents a subtask that belongs to a parent task.
 
@@ -75,6 +206,45 @@ class Subtask(models.Model):
     subtask = models.CharField(max_length=255)
     task = models.ForeignKey(Task, related_name="subtasks", on_delete=models.CASCADE, null=True, blank=True)
     completed = models.BooleanField(default=False)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+
+    # Fields whose changes affect the search index and the task's counters.
+    DIFF_FIELDS = ['subtask', 'completed']
 
     def __str__(self):
         return self.subtask
+
+
+class Tombstone(models.Model):
+    """
+    Records the deletion of a task or subtask so that delta sync clients
+    can learn about it.
+
+    """
+    TASK = 'task'
+    SUBTASK = 'subtask'
+    MODEL_CHOICES = [(TASK, 'Task'), (SUBTASK, 'Subtask')]
+
+    model = models.CharField(max_length=10, choices=MODEL_CHOICES)
+    object_id = models.BigIntegerField()
+    task_id = models.BigIntegerField(null=True, blank=True)
+    deleted_at = models.DateTimeField(default=timezone.now, db_index=True)
+
+    def __str__(self):
+        return f"{self.model} {self.object_id}"
+
+
+class BoardVersion(models.Model):
+    """
+    Monotonic change counter of a board.
+
+    The counter is bumped on every write to the board's tasks, subtasks and
+    assignments, and lets clients revalidate cached responses with a single
+    lightweight query.
+
+    """
+    board = models.CharField(max_length=50, unique=True)
+    version = models.PositiveBigIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.board}: {self.version}"
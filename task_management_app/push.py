@@ -0,0 +1,259 @@
+import asyncio
+import json
+import threading
+from collections import defaultdict, deque
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.utils.module_loading import import_string
+
+BOARD_GROUP = 'board'
+
+
+class BaseChannelLayer:
+    """
+    Interface of the channel layers used to push board changes to
+    subscribed websocket clients.
+
+    `publish` is called from synchronous code (signal receivers, views) and
+    must be thread-safe; `subscribe` is used by the websocket consumer.
+    The backend is selected with the `PUSH_CHANNEL_LAYER` setting.
+    """
+
+    def publish(self, group, message):
+        raise NotImplementedError
+
+    def subscribe(self, group):
+        """
+        Returns a subscription with an async `get()` method and `close()`.
+        """
+        raise NotImplementedError
+
+    def has_subscribers(self, group):
+        """
+        Returns False if nobody can receive messages for `group`, so that
+        publishers can skip building them. Remote backends cannot know and
+        return True.
+        """
+        return True
+
+
+class Subscription:
+    """
+    Subscription of one client to a group of an `InMemoryChannelLayer`.
+
+    Messages are buffered in a bounded queue. If the client falls behind,
+    the backlog is dropped and replaced by a single `resync` message, which
+    tells the client to catch up through the delta sync endpoint.
+    """
+
+    def __init__(self, layer, group, max_size):
+        self.layer = layer
+        self.group = group
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(maxsize=max_size)
+
+    def deliver(self, message):
+        try:
+            self.queue.put_nowait(message)
+        except asyncio.QueueFull:
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait({'type': 'board', 'op': 'resync'})
+
+    async def get(self):
+        return await self.queue.get()
+
+    def close(self):
+        self.layer.unsubscribe(self)
+
+
+class InMemoryChannelLayer(BaseChannelLayer):
+    """
+    Channel layer for a single node. Subscribers live in this process, so
+    only writes handled by the same process reach them.
+    """
+
+    def __init__(self, max_queue_size=100):
+        self.max_queue_size = max_queue_size
+        self._subscriptions = defaultdict(set)
+        self._lock = threading.Lock()
+
+    def publish(self, group, message):
+        with self._lock:
+            subscriptions = list(self._subscriptions.get(group, ()))
+        for subscription in subscriptions:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription.deliver, message)
+            except RuntimeError:
+                # The subscriber's event loop is closed; drop it.
+                self.unsubscribe(subscription)
+
+    def subscribe(self, group):
+        subscription = Subscription(self, group, self.max_queue_size)
+        with self._lock:
+            self._subscriptions[group].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._subscriptions[subscription.group].discard(subscription)
+
+    def has_subscribers(self, group):
+        return bool(self._subscriptions.get(group))
+
+
+class CacheSubscription:
+    """
+    Subscription of one client to a group of a `CacheChannelLayer`.
+
+    Polls the group's sequence number and reads the messages published
+    since the last poll. A client that falls more than `max_queue_size`
+    messages behind, or whose next message has expired from the cache,
+    receives a single `resync` message instead of the backlog.
+    """
+
+    def __init__(self, layer, group):
+        self.layer = layer
+        self.group = group
+        self.last = layer.cache.get(layer.sequence_key(group), 0)
+        self.pending = deque()
+        # Sequence number of a message that was missing at the last poll.
+        # A publisher stores the message just after taking its number, so
+        # it is only given up when it is still missing at the next poll.
+        self.missing = None
+
+    async def get(self):
+        while not self.pending:
+            await self.poll()
+            if not self.pending:
+                await asyncio.sleep(self.layer.poll_interval)
+        return self.pending.popleft()
+
+    async def poll(self):
+        layer, group = self.layer, self.group
+        sequence = await layer.cache.aget(layer.sequence_key(group), 0)
+        if sequence == self.last:
+            return
+        if not self.last < sequence <= self.last + layer.max_queue_size:
+            # Too far behind, or the sequence was lost with the cache.
+            self.resync(sequence)
+            return
+        keys = [layer.message_key(group, number) for number in range(self.last + 1, sequence + 1)]
+        messages = await layer.cache.aget_many(keys)
+        for number, key in enumerate(keys, self.last + 1):
+            if key not in messages:
+                if self.missing == number:
+                    self.resync(sequence)
+                else:
+                    self.missing = number
+                return
+            self.pending.append(messages[key])
+            self.last = number
+
+    def resync(self, sequence):
+        self.pending.clear()
+        self.pending.append({'type': 'board', 'op': 'resync'})
+        self.last = sequence
+        self.missing = None
+
+    def close(self):
+        pass
+
+
+class CacheChannelLayer(BaseChannelLayer):
+    """
+    Channel layer for deployments with several processes or nodes. Messages
+    go through the Django cache `cache_alias`, which must be shared by all
+    of them (e.g. Redis or Memcached).
+
+    Each group is a log in the cache: publishing takes the next number of
+    the group's sequence counter and stores the message under it for
+    `message_timeout` seconds. Subscribers poll the counter every
+    `poll_interval` seconds, so messages arrive with that much delay.
+    """
+
+    def __init__(self, cache_alias='default', poll_interval=0.5, message_timeout=60, max_queue_size=100):
+        self.cache = caches[cache_alias]
+        self.poll_interval = poll_interval
+        self.message_timeout = message_timeout
+        self.max_queue_size = max_queue_size
+
+    @staticmethod
+    def sequence_key(group):
+        return f'push:{group}:sequence'
+
+    @staticmethod
+    def message_key(group, number):
+        return f'push:{group}:{number}'
+
+    def publish(self, group, message):
+        key = self.sequence_key(group)
+        self.cache.add(key, 0, None)
+        try:
+            number = self.cache.incr(key)
+        except ValueError:
+            # The counter was evicted between add() and incr().
+            self.cache.add(key, 0, None)
+            number = self.cache.incr(key)
+        self.cache.set(self.message_key(group, number), message, self.message_timeout)
+
+    def subscribe(self, group):
+        return CacheSubscription(self, group)
+
+
+_layer = None
+_layer_lock = threading.Lock()
+_last_summary = {}
+
+
+def get_channel_layer():
+    """
+    Returns the process-wide channel layer configured by `PUSH_CHANNEL_LAYER`
+    and `PUSH_CHANNEL_LAYER_OPTIONS`.
+    """
+    global _layer
+    if _layer is None:
+        with _layer_lock:
+            if _layer is None:
+                layer_class = import_string(settings.PUSH_CHANNEL_LAYER)
+                _layer = layer_class(**settings.PUSH_CHANNEL_LAYER_OPTIONS)
+    return _layer
+
+
+def encode_message(message):
+    return json.dumps(message, cls=DjangoJSONEncoder, separators=(',', ':'))
+
+
+def broadcast(message, group=BOARD_GROUP):
+    """
+    Publishes a board change once the current transaction commits, so
+    rolled back changes are never pushed.
+    """
+    layer = get_channel_layer()
+    if layer.has_subscribers(group):
+        transaction.on_commit(lambda: layer.publish(group, message))
+
+
+def broadcast_summary(group=BOARD_GROUP):
+    """
+    Publishes the summary counters after the current transaction commits.
+    The counters come from the summary cache, so several writes in one
+    transaction compute them once, and unchanged counters are not re-sent.
+    """
+    layer = get_channel_layer()
+    if not layer.has_subscribers(group):
+        return
+
+    def publish():
+        from .summary import get_summary
+
+        summary_data = get_summary()
+        if _last_summary.get(group) != summary_data:
+            _last_summary[group] = summary_data
+            layer.publish(group, {'type': 'summary', 'data': summary_data})
+
+    transaction.on_commit(publish)
+
@@ -0,0 +1,195 @@
+import re
+
+from django.db import connection
+from django.db.models import Q
+
+from .models import Subtask, Task
+
+SEARCH_TABLE = 'task_management_app_tasksearch'
+
+# Ids per statement when (re)indexing, to stay below bind parameter limits.
+REINDEX_BATCH_SIZE = 500
+
+WORD_RE = re.compile(r'\w+')
+
+
+def search_terms(query):
+    """
+    Splits a user query into words. Operators and punctuation are dropped,
+    so the terms can be embedded in FTS5 and tsquery expressions safely.
+    """
+    return WORD_RE.findall(query.lower())
+
+
+def batched(ids):
+    ids = list(ids)
+    for start in range(0, len(ids), REINDEX_BATCH_SIZE):
+        yield ids[start:start + REINDEX_BATCH_SIZE]
+
+
+class SearchBackend:
+    """
+    Text index over task titles, descriptions and subtask texts.
+
+    The index holds one document per task. It is updated incrementally
+    from the task and subtask signal receivers (and `tasks_changed_in_bulk`
+    for bulk writes) in the writing transaction, and can be rebuilt with
+    `manage.py rebuild_search_index`.
+    """
+
+    def reindex(self, task_ids):
+        """
+        Rewrites the documents of the given tasks from the current rows.
+        """
+
+    def remove(self, task_ids):
+        """
+        Removes the documents of deleted tasks.
+        """
+
+    def rebuild(self):
+        """
+        Rebuilds the whole index and returns the number of indexed tasks.
+        """
+        return 0
+
+    def search(self, query, limit, offset=0):
+        """
+        Returns the ids of the tasks matching every word of `query` (as
+        prefixes), best matches first.
+        """
+        raise NotImplementedError
+
+
+class SQLiteSearchBackend(SearchBackend):
+    """
+    SQLite FTS5 index, ranked with bm25. Title matches weigh most, then
+    description, then subtasks.
+    """
+    weights = (10.0, 4.0, 1.0)
+
+    def reindex(self, task_ids):
+        with connection.cursor() as cursor:
+            for ids in batched(task_ids):
+                placeholders = ', '.join(['%s'] * len(ids))
+                cursor.execute(f'DELETE FROM {SEARCH_TABLE} WHERE rowid IN ({placeholders})', ids)
+                cursor.execute(
+                    f'INSERT INTO {SEARCH_TABLE} (rowid, title, description, subtasks) '
+                    f'SELECT t.id, t.title, t.description, '
+                    f'COALESCE((SELECT group_concat(s.subtask, \' \') FROM {Subtask._meta.db_table} s '
+                    f'WHERE s.task_id = t.id), \'\') '
+                    f'FROM {Task._meta.db_table} t WHERE t.id IN ({placeholders})',
+                    ids,
+                )
+
+    def remove(self, task_ids):
+        with connection.cursor() as cursor:
+            for ids in batched(task_ids):
+                placeholders = ', '.join(['%s'] * len(ids))
+                cursor.execute(f'DELETE FROM {SEARCH_TABLE} WHERE rowid IN ({placeholders})', ids)
+
+    def rebuild(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {SEARCH_TABLE}')
+        task_ids = list(Task.objects.values_list('id', flat=True))
+        self.reindex(task_ids)
+        return len(task_ids)
+
+    def search(self, query, limit, offset=0):
+        terms = search_terms(query)
+        if not terms:
+            return []
+        match = ' '.join(f'"{term}"*' for term in terms)
+        weights = ', '.join(str(weight) for weight in self.weights)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'SELECT rowid FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH %s '
+                f'ORDER BY bm25({SEARCH_TABLE}, {weights}), rowid LIMIT %s OFFSET %s',
+                [match, limit, offset],
+            )
+            return [row[0] for row in cursor.fetchall()]
+
+
+class PostgresSearchBackend(SearchBackend):
+    """
+    PostgreSQL index of weighted `tsvector` documents with a GIN index,
+    ranked with `ts_rank_cd`. The `simple` configuration is used because
+    boards mix languages.
+    """
+    config = 'simple'
+
+    def document_sql(self):
+        return (
+            f"setweight(to_tsvector('{self.config}', t.title), 'A') || "
+            f"setweight(to_tsvector('{self.config}', t.description), 'B') || "
+            f"setweight(to_tsvector('{self.config}', COALESCE((SELECT string_agg(s.subtask, ' ') "
+            f"FROM {Subtask._meta.db_table} s WHERE s.task_id = t.id), '')), 'C')"
+        )
+
+    def reindex(self, task_ids):
+        with connection.cursor() as cursor:
+            for ids in batched(task_ids):
+                cursor.execute(
+                    f'INSERT INTO {SEARCH_TABLE} (task_id, document) '
+                    f'SELECT t.id, {self.document_sql()} FROM {Task._meta.db_table} t WHERE t.id = ANY(%s) '
+                    f'ON CONFLICT (task_id) DO UPDATE SET document = EXCLUDED.document',
+                    [ids],
+                )
+
+    def remove(self, task_ids):
+        with connection.cursor() as cursor:
+            for ids in batched(task_ids):
+                cursor.execute(f'DELETE FROM {SEARCH_TABLE} WHERE task_id = ANY(%s)', [ids])
+
+    def rebuild(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {SEARCH_TABLE}')
+            cursor.execute(
+                f'INSERT INTO {SEARCH_TABLE} (task_id, document) '
+                f'SELECT t.id, {self.document_sql()} FROM {Task._meta.db_table} t'
+            )
+            return cursor.rowcount
+
+    def search(self, query, limit, offset=0):
+        terms = search_terms(query)
+        if not terms:
+            return []
+        tsquery = ' & '.join(f'{term}:*' for term in terms)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"SELECT task_id FROM {SEARCH_TABLE}, to_tsquery('{self.config}', %s) query "
+                f"WHERE document @@ query ORDER BY ts_rank_cd(document, query) DESC, task_id LIMIT %s OFFSET %s",
+                [tsquery, limit, offset],
+            )
+            return [row[0] for row in cursor.fetchall()]
+
+
+class FallbackSearchBackend(SearchBackend):
+    """
+    Unindexed substring search for other databases. Results are ordered by
+    id, not ranked.
+    """
+
+    def search(self, query, limit, offset=0):
+        terms = search_terms(query)
+        if not terms:
+            return []
+        queryset = Task.objects.all()
+        for term in terms:
+            queryset = queryset.filter(
+                Q(title__icontains=term) | Q(description__icontains=term) | Q(subtasks__subtask__icontains=term)
+            )
+        return list(queryset.distinct().order_by('id').values_list('id', flat=True)[offset:offset + limit])
+
+
+BACKENDS = {
+    'sqlite': SQLiteSearchBackend,
+    'postgresql': PostgresSearchBackend,
+}
+
+
+def get_search_backend():
+    """
+    Returns the search backend for the default database.
+    """
+    return BACKENDS.get(connection.vendor, FallbackSearchBackend)()
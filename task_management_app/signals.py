@@ -0,0 +1,289 @@
+import threading
+from contextlib import contextmanager
+
+from django.db.models import QuerySet
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .lookups import category_cache, prio_cache
+from .models import Category, Prio, Subtask, Task, Tombstone, User
+from .push import BOARD_GROUP, broadcast, broadcast_summary, get_channel_layer
+from .search import get_search_backend
+from .summary import invalidate_summary
+from .versioning import bump_board_version
+
+_state = threading.local()
+
+
+def deleted_with_task(origin):
+    """
+    Returns True if a delete signal was caused by deleting a task, e.g. for
+    subtasks removed by the cascade.
+    """
+    return isinstance(origin, Task) or (isinstance(origin, QuerySet) and origin.model is Task)
+
+
+@contextmanager
+def receivers_suppressed():
+    """
+    Disables the receivers below in the current thread, for bulk writes that
+    apply their side effects once via `tasks_changed_in_bulk` instead of
+    once per row.
+    """
+    previous = getattr(_state, 'suppressed', False)
+    _state.suppressed = True
+    try:
+        yield
+    finally:
+        _state.suppressed = previous
+
+
+def is_suppressed():
+    return getattr(_state, 'suppressed', False)
+
+
+def tasks_changed_in_bulk(changed_ids, deleted_ids=(), deleted_subtasks=()):
+    """
+    Applies the side effects of the receivers below for writes that bypass
+    model signals, such as `bulk_create`, `bulk_update` and `update()`, or
+    that ran with receivers suppressed. Callers pass the ids of the tasks
+    that were created or changed and of those that were deleted, and the
+    subtasks deleted from the remaining tasks.
+    """
+    tombstones = [Tombstone(model=Tombstone.TASK, object_id=pk) for pk in deleted_ids]
+    tombstones += [Tombstone(model=Tombstone.SUBTASK, object_id=subtask.pk, task_id=subtask.task_id)
+                   for subtask in deleted_subtasks]
+    if tombstones:
+        Tombstone.objects.bulk_create(tombstones)
+    if deleted_ids:
+        get_search_backend().remove(deleted_ids)
+    get_search_backend().reindex(changed_ids)
+    invalidate_summary()
+    bump_board_version()
+    broadcast({'type': 'board', 'op': 'resync'})
+    broadcast_summary()
+
+
+def subtasks_deleted_in_bulk(subtasks):
+    """
+    Applies the side effects of the subtask receivers once for subtasks that
+    were deleted with receivers suppressed. The subtask counters are left to
+    the caller, see `TaskQuerySet.refresh_subtask_counts()`.
+    """
+    Tombstone.objects.bulk_create([
+        Tombstone(model=Tombstone.SUBTASK, object_id=subtask.pk, task_id=subtask.task_id) for subtask in subtasks
+    ])
+    bump_board_version()
+    get_search_backend().reindex({subtask.task_id for subtask in subtasks})
+    for subtask in subtasks:
+        broadcast({'type': 'subtask', 'op': 'delete', 'id': subtask.pk, 'task': subtask.task_id})
+
+
+def subtasks_written_in_bulk(created=(), updated=()):
+    """
+    Applies the side effects of the subtask receivers once for subtasks that
+    were created or updated with `bulk_create` / `bulk_update`, which send
+    no signals: reindexes their tasks and pushes the subtasks. The subtask
+    counters and the board version are left to the caller, which saves the
+    task in the same transaction.
+    """
+    get_search_backend().reindex({subtask.task_id for subtask in [*created, *updated]})
+    for subtask in created:
+        broadcast_subtask(subtask, created=True)
+    for subtask in updated:
+        broadcast_subtask(subtask, created=False)
+
+
+def broadcast_subtask(subtask, created):
+    broadcast({
+        'type': 'subtask',
+        'op': 'create' if created else 'update',
+        'id': subtask.pk,
+        'task': subtask.task_id,
+        'fields': {'subtask': subtask.subtask, 'completed': subtask.completed},
+    })
+
+
+@receiver(post_save, sender=Task)
+@receiver(post_delete, sender=Task)
+def task_changed(sender, instance, **kwargs):
+    """
+    Invalidates the cached summary and bumps the board version whenever a
+    task is created, updated or deleted.
+    """
+    if is_suppressed():
+        return
+    invalidate_summary()
+    bump_board_version()
+    broadcast_summary()
+
+
+@receiver(post_save, sender=Task)
+def task_saved(sender, instance, created, **kwargs):
+    """
+    Pushes the changed fields of a saved task to subscribed clients and
+    reindexes the task if its text changed.
+    """
+    if is_suppressed():
+        return
+    changed = instance.get_changed_fields()
+    if created or 'title' in changed or 'description' in changed:
+        get_search_backend().reindex([instance.pk])
+    if created or changed:
+        broadcast({'type': 'task', 'op': 'create' if created else 'update', 'id': instance.pk, 'fields': changed})
+
+
+@receiver(post_delete, sender=Task)
+def task_deleted(sender, instance, **kwargs):
+    """
+    Records a tombstone for a deleted task and pushes the deletion.
+    """
+    if not is_suppressed():
+        Tombstone.objects.create(model=Tombstone.TASK, object_id=instance.pk)
+        get_search_backend().remove([instance.pk])
+        broadcast({'type': 'task', 'op': 'delete', 'id': instance.pk})
+
+
+@receiver(post_save, sender=Subtask)
+@receiver(post_delete, sender=Subtask)
+def subtask_changed(sender, instance, origin=None, **kwargs):
+    """
+    Bumps the board version when a subtask changes. Subtasks deleted along
+    with their task are covered by the task's own signal.
+    """
+    if not is_suppressed() and not deleted_with_task(origin):
+        bump_board_version()
+
+
+@receiver(post_save, sender=Subtask)
+def subtask_saved(sender, instance, created, **kwargs):
+    """
+    Pushes a saved subtask to subscribed clients, reindexes its task if the
+    subtask text changed and refreshes the task's subtask counters if the
+    subtask was created or (un)completed.
+    """
+    if not is_suppressed():
+        changed = instance.get_changed_fields()
+        if 'subtask' in changed:
+            get_search_backend().reindex([instance.task_id])
+        if 'completed' in changed:
+            Task.objects.filter(pk=instance.task_id).refresh_subtask_counts()
+        broadcast_subtask(instance, created)
+
+
+@receiver(post_delete, sender=Subtask)
+def subtask_deleted(sender, instance, origin=None, **kwargs):
+    """
+    Records a tombstone for a deleted subtask, refreshes its task's index
+    entry and subtask counters and pushes the deletion. Subtasks deleted
+    along with their task are covered by the task's tombstone and message.
+    """
+    if not is_suppressed() and not deleted_with_task(origin):
+        Tombstone.objects.create(model=Tombstone.SUBTASK, object_id=instance.pk, task_id=instance.task_id)
+        get_search_backend().reindex([instance.task_id])
+        Task.objects.filter(pk=instance.task_id).refresh_subtask_counts()
+        broadcast({'type': 'subtask', 'op': 'delete', 'id': instance.pk, 'task': instance.task_id})
+
+
+@receiver(m2m_changed, sender=Task.assigned_users.through)
+def assignments_changed(sender, instance, action, pk_set=None, **kwargs):
+    """
+    Bumps the board version and touches the affected tasks' `updated_at`
+    when users are assigned to or removed from a task.
+    """
+    if is_suppressed() or action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    bump_board_version()
+    task_ids = [instance.pk] if isinstance(instance, Task) else list(pk_set or ())
+    if task_ids:
+        Task.objects.filter(pk__in=task_ids).update(updated_at=timezone.now())
+    for task_id in task_ids:
+        broadcast_assignments(task_id)
+
+
+def broadcast_assignments(task_id, user_ids=None):
+    """
+    Pushes the assignee ids of a task, if anybody is listening. The current
+    ids are loaded unless the caller passes them.
+    """
+    if get_channel_layer().has_subscribers(BOARD_GROUP):
+        if user_ids is None:
+            user_ids = list(
+                Task.assigned_users.through.objects.filter(task_id=task_id).values_list('user_id', flat=True)
+            )
+        broadcast({'type': 'task', 'op': 'update', 'id': task_id, 'fields': {'assigned_users': user_ids}})
+
+
+@receiver(post_save, sender=User)
+def contact_saved(sender, instance, created, **kwargs):
+    """
+    Bumps the board version, touches the `updated_at` of the tasks the
+    contact is assigned to (tasks render their assignees) and pushes the
+    contact when a contact is created or edited.
+    """
+    if is_suppressed():
+        return
+    bump_board_version()
+    if not created:
+        Task.objects.filter(assigned_users=instance).update(updated_at=timezone.now())
+    broadcast({'type': 'user', 'op': 'create' if created else 'update', 'id': instance.pk,
+               'fields': {'username': instance.username, 'email': instance.email,
+                          'contactNumber': instance.contactNumber, 'color': instance.color}})
+
+
+@receiver(pre_delete, sender=User)
+def contact_deleting(sender, instance, **kwargs):
+    """
+    Remembers the tasks of a contact about to be deleted: the deletion
+    removes its assignments without sending `m2m_changed`.
+    """
+    if not is_suppressed():
+        instance._assigned_task_ids = list(
+            Task.assigned_users.through.objects.filter(user_id=instance.pk).values_list('task_id', flat=True)
+        )
+
+
+@receiver(post_delete, sender=User)
+def contact_deleted(sender, instance, **kwargs):
+    """
+    Bumps the board version, touches the `updated_at` of the tasks the
+    contact was assigned to and pushes the deletion.
+    """
+    if is_suppressed():
+        return
+    bump_board_version()
+    task_ids = getattr(instance, '_assigned_task_ids', ())
+    if task_ids:
+        Task.objects.filter(pk__in=task_ids).update(updated_at=timezone.now())
+    broadcast({'type': 'user', 'op': 'delete', 'id': instance.pk})
+
+
+@receiver(post_save, sender=Prio)
+@receiver(post_delete, sender=Prio)
+def prio_changed(sender, instance, **kwargs):
+    """
+    Invalidates the cached priorities and the cached summary and bumps the
+    board version when a priority changes, since the urgent counters depend
+    on the priority level and tasks render their priority.
+    """
+    prio_cache.invalidate()
+    invalidate_summary()
+    bump_board_version()
+    broadcast_summary()
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def category_changed(sender, instance, **kwargs):
+    """
+    Invalidates the cached categories and bumps the board version when a
+    category changes, since tasks render their category.
+    """
+    category_cache.invalidate()
+    bump_board_version()
+    if kwargs.get('signal') is post_delete:
+        broadcast({'type': 'category', 'op': 'delete', 'id': instance.pk})
+    else:
+        broadcast({'type': 'category', 'op': 'update', 'id': instance.pk,
+                   'fields': {'name': instance.name, 'color': instance.color}})
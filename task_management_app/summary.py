@@ -0,0 +1,72 @@
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, Min, Q
+
+from .models import DEFAULT_BOARD, Task
+
+
+def get_summary_cache_key(board=DEFAULT_BOARD):
+    return f'task_summary:{board}'
+
+
+def compute_summary():
+    """
+    Runs the aggregate over the task table that backs the summary
+    dashboard.
+    """
+    return Task.objects.aggregate(
+        todo_count=Count("id", filter=Q(status="to_do")),
+        done_count=Count("id", filter=Q(status="done")),
+        total_tasks=Count("id"),
+        urgent_count=Count("id", filter=Q(prio__level="urgent")),
+        most_urgent_due_date=Min("due_date", filter=Q(prio__level="urgent")),
+        in_progress_count=Count("id", filter=Q(status="in_progress")),
+        awaiting_feedback_count=Count("id", filter=Q(status="await_feedback"))
+    )
+
+
+def get_summary(board=DEFAULT_BOARD):
+    """
+    Returns the summary counters for a board, computing and caching them on
+    a cache miss.
+    """
+    key = get_summary_cache_key(board)
+    summary_data = cache.get(key)
+    if summary_data is None:
+        summary_data = rebuild_summary(board)
+    return summary_data
+
+
+async def aget_summary(board=DEFAULT_BOARD):
+    """
+    Async variant of `get_summary`.
+    """
+    summary_data = await cache.aget(get_summary_cache_key(board))
+    if summary_data is None:
+        summary_data = await sync_to_async(rebuild_summary)(board)
+    return summary_data
+
+
+def rebuild_summary(board=DEFAULT_BOARD):
+    """
+    Recomputes the summary counters from the task table and stores them in
+    the cache.
+    """
+    summary_data = compute_summary()
+    cache.set(get_summary_cache_key(board), summary_data, settings.SUMMARY_CACHE_TIMEOUT)
+    return summary_data
+
+
+def invalidate_summary(board=DEFAULT_BOARD):
+    """
+    Drops the cached summary counters so they are recomputed on next read.
+
+    The counters are dropped again when the writer's transaction commits: a
+    read running concurrently with the transaction still sees the old rows
+    and may have cached counters computed from them.
+    """
+    key = get_summary_cache_key(board)
+    cache.delete(key)
+    transaction.on_commit(lambda: cache.delete(key))
@@ -1,3 +1,1513 @@
-from django.test import TestCase
+import asyncio
+import csv
+import json
+import os
+import tempfile
+import tracemalloc
+import threading
+import time
+from datetime import date, timedelta
+from io import StringIO
+from unittest import mock, skipUnless
 
-# Create your tests here.
+from asgiref.sync import async_to_sync, sync_to_async
+from django.conf import settings
+from django.contrib.auth.models import User as AuthUser
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.db import IntegrityError, connection
+from django.test import AsyncClient, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.test import APIClient, APIRequestFactory
+from rest_framework_simplejwt.tokens import AccessToken
+
+from . import push
+from .api import bulk, renderers
+from .api.filters import TaskFilterBackend
+from .api.renderers import FastJSONRenderer
+from .api.rows import serialize_task_rows, task_rows
+from .api.serializers import TaskSerializer
+from .consumers import UNAUTHORIZED_CLOSE_CODE, board_consumer
+from .importer import TaskImporter, parse_ndjson
+from .lookups import LookupTableCache, category_cache, prio_cache
+from .models import User, Category, Prio, Subtask, Task, Tombstone
+from .summary import get_summary_cache_key
+
+
+class TaskApiTestCase(TestCase):
+    """
+    Base test case providing an authenticated API client and helpers for
+    creating tasks with related users and subtasks.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.auth_user = AuthUser.objects.create_user(username="tester", password="secret")
+        cls.category = Category.objects.create(name="Technical", color="#1FD7C1")
+        cls.prio = Prio.objects.get(level="medium")
+        cls.urgent = Prio.objects.get(level="urgent")
+        cls.users = [
+            User.objects.create(username=f"user{i}", email=f"user{i}@example.com",
+                                contactNumber="0123", color="#FF7A00")
+            for i in range(3)
+        ]
+
+    def setUp(self):
+        cache.clear()
+        # Warm the lookup table caches so query counts only cover the request.
+        prio_cache.get_rows()
+        category_cache.get_rows()
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.auth_user)
+
+    def create_task(self, title="Task", status="to_do", prio=None, due_date=date(2025, 5, 1), subtasks=2):
+        task = Task.objects.create(
+            title=title,
+            description="Description",
+            due_date=due_date,
+            status=status,
+            category=self.category,
+            prio=prio or self.prio,
+        )
+        task.assigned_users.set(self.users)
+        for i in range(subtasks):
+            Subtask.objects.create(task=task, subtask=f"{title} subtask {i}", completed=bool(i % 2))
+        return task
+
+
+class TaskListQueryCountTests(TaskApiTestCase):
+    """
+    Guards the task list endpoint against N+1 queries on nested relations.
+    """
+
+    def count_list_queries(self):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse("task-list"))
+        self.assertEqual(response.status_code, 200)
+        return len(ctx.captured_queries), response
+
+    def test_query_count_does_not_grow_with_number_of_tasks(self):
+        self.create_task(title="First")
+        few_queries, response = self.count_list_queries()
+        self.assertEqual(len(response.data), 1)
+
+        for i in range(20):
+            self.create_task(title=f"Task {i}")
+        many_queries, response = self.count_list_queries()
+        self.assertEqual(len(response.data), 21)
+
+        self.assertEqual(few_queries, many_queries)
+
+    def test_list_includes_nested_relations(self):
+        task = self.create_task()
+        _, response = self.count_list_queries()
+
+        item = response.data[0]
+        self.assertEqual(item["id"], task.id)
+        self.assertEqual(item["category"]["name"], "Technical")
+        self.assertEqual(item["prio"]["level"], "medium")
+        self.assertEqual(len(item["assigned_users"]), 3)
+        self.assertEqual(len(item["subtasks"]), 2)
+
+
+class TaskPaginationTests(TaskApiTestCase):
+    """
+    Tests for keyset pagination and sparse fieldsets on the task list.
+    """
+
+    def test_list_is_unpaginated_without_cursor_parameters(self):
+        self.create_task()
+        response = self.client.get(reverse("task-list"))
+        self.assertIsInstance(response.data, list)
+
+    def test_pages_follow_due_date_and_id_order(self):
+        expected = []
+        for day in (3, 1, 2, 1, 3):
+            expected.append(self.create_task(title=f"Day {day}", due_date=date(2025, 5, day), subtasks=0))
+        expected.sort(key=lambda task: (task.due_date, task.id))
+
+        seen = []
+        url = reverse("task-list") + "?page_size=2"
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            self.assertLessEqual(len(response.data["results"]), 2)
+            seen.extend(item["id"] for item in response.data["results"])
+            url = response.data["next"]
+
+        self.assertEqual(seen, [task.id for task in expected])
+
+    def test_invalid_cursor_returns_404(self):
+        response = self.client.get(reverse("task-list"), {"cursor": "not-a-cursor"})
+        self.assertEqual(response.status_code, 404)
+
+    def test_fields_parameter_limits_output_and_prefetches(self):
+        self.create_task()
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse("task-list"), {"fields": "id,title,status"})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(set(response.data[0]), {"id", "title", "status"})
+        # board version for the ETag, then the tasks without any prefetches
+        self.assertEqual(len(ctx.captured_queries), 2)
+
+    def test_unknown_field_is_rejected(self):
+        response = self.client.get(reverse("task-list"), {"fields": "id,category_id"})
+        self.assertEqual(response.status_code, 400)
+
+
+class TaskFilterTests(TaskApiTestCase):
+    """
+    Tests for server-side task filtering and the indexes backing it.
+    """
+
+    FILTER_COMBINATIONS = [
+        {"status": "to_do"},
+        {"status": "to_do,done", "due_after": "2025-05-01"},
+        {"prio": "1"},
+        {"prio": "1", "due_before": "2025-06-01"},
+        {"category": "1"},
+        {"category": "1", "due_after": "2025-05-01", "due_before": "2025-06-01"},
+        {"assignee": "1"},
+        {"due_after": "2025-05-01"},
+        {"due_after": "2025-05-01", "due_before": "2025-06-01"},
+        {"status": "in_progress", "prio": "1", "assignee": "1,2"},
+    ]
+
+    def filtered_queryset(self, params):
+        request = Request(APIRequestFactory().get("/api/task/", params))
+        return TaskFilterBackend().filter_queryset(request, Task.objects.all(), None)
+
+    def test_filters_select_matching_tasks(self):
+        match = self.create_task(title="Match", status="in_progress", prio=self.urgent, due_date=date(2025, 5, 10))
+        self.create_task(title="Other status", status="done", prio=self.urgent, due_date=date(2025, 5, 10))
+        self.create_task(title="Too late", status="in_progress", prio=self.urgent, due_date=date(2025, 7, 1))
+        unassigned = self.create_task(title="Unassigned", status="in_progress", prio=self.urgent,
+                                      due_date=date(2025, 5, 10))
+        unassigned.assigned_users.clear()
+
+        response = self.client.get(reverse("task-list"), {
+            "status": "in_progress",
+            "prio": self.urgent.id,
+            "category": self.category.id,
+            "assignee": f"{self.users[0].id},{self.users[1].id}",
+            "due_after": "2025-05-01",
+            "due_before": "2025-06-01",
+        })
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([item["id"] for item in response.data], [match.id])
+
+    def test_invalid_filter_values_are_rejected(self):
+        for params in ({"prio": "high"}, {"due_after": "tomorrow"}, {"due_before": "2025-13-01"}):
+            response = self.client.get(reverse("task-list"), params)
+            self.assertEqual(response.status_code, 400, params)
+
+    @skipUnless(connection.vendor == "sqlite", "Asserts on SQLite query plans")
+    def test_each_filter_combination_uses_an_index(self):
+        for params in self.FILTER_COMBINATIONS:
+            plan = self.filtered_queryset(params).explain()
+            self.assertIn("SEARCH task_management_app_task USING", plan, params)
+            self.assertNotIn(" SCAN ", plan, f"{params}: {plan}")
+
+
+class SummaryCacheTests(TaskApiTestCase):
+    """
+    Tests for the cached summary counters and their invalidation.
+    """
+
+    def get_summary(self):
+        response = self.client.get(reverse("summary"))
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def test_cached_summary_is_served_without_queries(self):
+        self.create_task(prio=self.urgent, due_date=date(2025, 4, 1))
+        self.assertEqual(self.get_summary()["urgent_count"], 1)
+
+        # Only the board version is read for the ETag.
+        with self.assertNumQueries(1):
+            self.assertEqual(self.get_summary()["total_tasks"], 1)
+
+    def test_task_writes_invalidate_summary(self):
+        task = self.create_task()
+        self.assertEqual(self.get_summary()["todo_count"], 1)
+
+        response = self.client.patch(reverse("task-detail", args=[task.id]), {"status": "done"}, format="json")
+        self.assertEqual(response.status_code, 200)
+        summary = self.get_summary()
+        self.assertEqual(summary["todo_count"], 0)
+        self.assertEqual(summary["done_count"], 1)
+
+        self.client.delete(reverse("task-detail", args=[task.id]))
+        self.assertEqual(self.get_summary()["total_tasks"], 0)
+
+    def test_summary_cached_during_the_write_is_dropped_on_commit(self):
+        task = self.create_task()
+        with self.captureOnCommitCallbacks(execute=True):
+            task.status = "done"
+            task.save()
+            # A concurrent read that still saw the old rows re-caches them.
+            cache.set(get_summary_cache_key(), {"done_count": 0}, 300)
+        self.assertIsNone(cache.get(get_summary_cache_key()))
+        self.assertEqual(self.get_summary()["done_count"], 1)
+
+    def test_prio_changes_invalidate_summary(self):
+        self.create_task()
+        self.assertEqual(self.get_summary()["urgent_count"], 0)
+
+        self.prio.level = "urgent"
+        self.prio.save()
+        self.assertEqual(self.get_summary()["urgent_count"], 1)
+
+    def test_rebuild_command_reports_drift(self):
+        # The command needs a cache shared with the server.
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        shared = override_settings(CACHES={"default": {
+            "BACKEND": "django.core.cache.backends.filebased.FileBasedCache", "LOCATION": directory.name,
+        }})
+        shared.enable()
+        self.addCleanup(shared.disable)
+        self.create_task()
+        self.get_summary()
+        Task.objects.update(status="done")  # bypasses signals, so the cache drifts
+
+        out = StringIO()
+        call_command("rebuild_summary", stdout=out)
+        self.assertIn("todo_count: cached 1, live 0", out.getvalue())
+        self.assertEqual(self.get_summary()["done_count"], 1)
+
+    def test_rebuild_command_refuses_a_process_local_cache(self):
+        with self.assertRaisesMessage(CommandError, "LocMemCache"):
+            call_command("rebuild_summary", stdout=StringIO())
+
+
+class TaskBulkTests(TaskApiTestCase):
+    """
+    Tests for the bulk task endpoint.
+    """
+
+    def task_data(self, title="Bulk", **extra):
+        data = {
+            "title": title,
+            "due_date": "2025-05-01",
+            "category_id": self.category.id,
+            "prio_id": self.prio.id,
+        }
+        data.update(extra)
+        return data
+
+    def test_operations_are_applied_and_reported(self):
+        to_update = self.create_task(title="Update me")
+        to_delete = self.create_task(title="Delete me")
+        operations = [
+            {"op": "create", "data": self.task_data(
+                assigned_user_id=[user.id for user in self.users],
+                subtasks=[{"subtask": "One"}, {"subtask": "Two", "completed": True}],
+            )},
+            {"op": "update", "id": to_update.id, "data": {"status": "done", "assigned_user_id": [self.users[0].id]}},
+            {"op": "delete", "id": to_delete.id},
+        ]
+
+        response = self.client.post(reverse("task-bulk"), operations, format="json")
+
+        self.assertEqual(response.status_code, 200)
+        results = response.data["results"]
+        self.assertEqual([result["status"] for result in results], ["ok", "ok", "ok"])
+        created = Task.objects.get(id=results[0]["id"])
+        self.assertEqual(created.assigned_users.count(), 3)
+        self.assertEqual(sorted(created.subtasks.values_list("subtask", "completed")), [("One", False), ("Two", True)])
+        to_update.refresh_from_db()
+        self.assertEqual(to_update.status, "done")
+        self.assertEqual(list(to_update.assigned_users.all()), [self.users[0]])
+        self.assertEqual(to_update.subtasks.count(), 2)
+        self.assertFalse(Task.objects.filter(id=to_delete.id).exists())
+
+    def test_invalid_operation_aborts_whole_batch(self):
+        task = self.create_task()
+        operations = [
+            {"op": "update", "id": task.id, "data": {"status": "done"}},
+            {"op": "create", "data": self.task_data(prio_id=9999)},
+            {"op": "delete", "id": 9999},
+        ]
+
+        response = self.client.post(reverse("task-bulk"), operations, format="json")
+
+        self.assertEqual(response.status_code, 400)
+        results = response.data["results"]
+        self.assertEqual([result["status"] for result in results], ["skipped", "error", "error"])
+        self.assertIn("prio_id", results[1]["errors"])
+        task.refresh_from_db()
+        self.assertEqual(task.status, "to_do")
+
+    def test_task_deleted_after_validation_is_reported(self):
+        task, deleted = self.create_task(), self.create_task(title="Deleted")
+
+        def delete_then_apply(operations):
+            Task.objects.filter(id=deleted.id).delete()
+            return bulk.apply_operations(operations)
+
+        with mock.patch("task_management_app.api.views.apply_operations", delete_then_apply):
+            response = self.client.post(reverse("task-bulk"), [
+                {"op": "update", "id": task.id, "data": {"status": "done"}},
+                {"op": "update", "id": deleted.id, "data": {"status": "done"}},
+            ], format="json")
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual([result["status"] for result in response.data["results"]], ["skipped", "error"])
+        task.refresh_from_db()
+        self.assertEqual(task.status, "to_do")
+
+    def test_create_with_id_is_rejected(self):
+        response = self.client.post(reverse("task-bulk"), [{"op": "create", "id": 5, "data": self.task_data()}],
+                                    format="json")
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("Must not be set on create operations", str(response.data["results"][0]["errors"]["id"]))
+
+    def test_malformed_operation_is_reported(self):
+        response = self.client.post(reverse("task-bulk"), [{"op": "create", "data": {"title": "No date"}}],
+                                    format="json")
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("data", response.data["results"][0]["errors"])
+
+    def test_query_count_does_not_grow_with_number_of_operations(self):
+        def post_creates(count):
+            operations = [{"op": "create", "data": self.task_data(
+                title=f"Task {i}", assigned_user_id=[self.users[0].id], subtasks=[{"subtask": "Sub"}],
+            )} for i in range(count)]
+            with CaptureQueriesContext(connection) as ctx:
+                response = self.client.post(reverse("task-bulk"), operations, format="json")
+            self.assertEqual(response.status_code, 200)
+            return len(ctx.captured_queries)
+
+        self.assertEqual(post_creates(2), post_creates(50))
+        self.assertEqual(Task.objects.count(), 52)
+
+
+class SubtaskReconciliationTests(TaskApiTestCase):
+    """
+    Tests for diff-based subtask updates in TaskSerializer.update.
+    """
+
+    def patch_subtasks(self, task, subtasks):
+        return self.client.patch(reverse("task-detail", args=[task.id]), {"subtasks": subtasks}, format="json")
+
+    def test_update_keeps_ids_of_existing_subtasks(self):
+        task = self.create_task(subtasks=3)
+        keep, change, drop = task.subtasks.order_by("id")
+
+        response = self.patch_subtasks(task, [
+            {"id": keep.id, "subtask": keep.subtask, "completed": keep.completed},
+            {"id": change.id, "subtask": "Renamed", "completed": True},
+            {"subtask": "New"},
+        ])
+
+        self.assertEqual(response.status_code, 200)
+        subtasks = {subtask.subtask: subtask for subtask in task.subtasks.all()}
+        self.assertEqual(set(subtasks), {keep.subtask, "Renamed", "New"})
+        self.assertEqual(subtasks[keep.subtask].id, keep.id)
+        self.assertEqual(subtasks["Renamed"].id, change.id)
+        self.assertTrue(subtasks["Renamed"].completed)
+        self.assertFalse(Subtask.objects.filter(id=drop.id).exists())
+        self.assertEqual({item["id"] for item in response.data["subtasks"]}, {s.id for s in subtasks.values()})
+
+    def test_subtask_writes_do_not_grow_with_number_of_subtasks(self):
+        def count_update_queries(subtask_count):
+            task = self.create_task(subtasks=subtask_count)
+            payload = [{"id": subtask.id, "subtask": subtask.subtask, "completed": True}
+                       for subtask in task.subtasks.all()[1:]]
+            payload += [{"subtask": f"New {i}"} for i in range(subtask_count)]
+            with CaptureQueriesContext(connection) as ctx:
+                response = self.patch_subtasks(task, payload)
+            self.assertEqual(response.status_code, 200)
+            return len(ctx.captured_queries)
+
+        self.assertEqual(count_update_queries(3), count_update_queries(30))
+
+    def test_foreign_subtask_id_is_rejected(self):
+        task = self.create_task()
+        other = self.create_task(title="Other")
+        foreign = other.subtasks.first()
+
+        response = self.patch_subtasks(task, [{"id": foreign.id, "subtask": "Stolen"}])
+
+        self.assertEqual(response.status_code, 400)
+        foreign.refresh_from_db()
+        self.assertEqual(foreign.task_id, other.id)
+        self.assertEqual(task.subtasks.count(), 2)
+
+
+class TaskCreateTests(TaskApiTestCase):
+    """
+    Tests for batched writes in TaskSerializer.create.
+    """
+
+    def post_task(self, user_ids, subtask_count):
+        return self.client.post(reverse("task-list"), {
+            "title": "Created",
+            "due_date": "2025-05-01",
+            "category_id": self.category.id,
+            "prio_id": self.prio.id,
+            "assigned_user_id": user_ids,
+            "subtasks": [{"subtask": f"Sub {i}"} for i in range(subtask_count)],
+        }, format="json")
+
+    def test_query_count_does_not_grow_with_assignees_and_subtasks(self):
+        extra_users = [
+            User.objects.create(username=f"extra{i}", email="", contactNumber="", color="#000000")
+            for i in range(17)
+        ]
+        all_ids = [user.id for user in self.users + extra_users]
+
+        with CaptureQueriesContext(connection) as small:
+            response = self.post_task(all_ids[:1], 1)
+        self.assertEqual(response.status_code, 201)
+        with CaptureQueriesContext(connection) as large:
+            response = self.post_task(all_ids, 50)
+        self.assertEqual(response.status_code, 201)
+
+        self.assertEqual(len(small.captured_queries), len(large.captured_queries))
+        task = Task.objects.get(id=response.data["id"])
+        self.assertEqual(task.assigned_users.count(), 20)
+        self.assertEqual(task.subtasks.count(), 50)
+
+    def test_unknown_assignee_is_rejected(self):
+        response = self.post_task([self.users[0].id, 9999], 0)
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('Invalid pk "9999"', str(response.data["assigned_user_id"]))
+        self.assertFalse(Task.objects.exists())
+
+
+class SubtaskViewTests(TaskApiTestCase):
+    """
+    Tests for the subtask endpoints' write path.
+    """
+
+    def test_create_assigns_task_with_one_lookup(self):
+        task = self.create_task(subtasks=0)
+        # 1. SELECT the task id (the only task lookup)
+        # 2. INSERT the subtask
+        # 3. UPDATE the board version
+        # 4. DELETE the task's search index row
+        # 5. INSERT the task's search index row with the new subtask text
+        # 6. UPDATE the task's subtask counters
+        with self.assertNumQueries(6):
+            response = self.client.post(reverse("subtask-list", args=[task.id]), {"subtask": "New"}, format="json")
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data["task"], task.id)
+        self.assertEqual(task.subtasks.get().subtask, "New")
+
+    def test_update_keeps_subtask_linked_to_its_task(self):
+        task = self.create_task(subtasks=1)
+        other = self.create_task(title="Other", subtasks=0)
+        subtask = task.subtasks.get()
+        url = reverse("subtask-detail", args=[task.id, subtask.id])
+
+        # 1. SELECT the subtask
+        # 2. UPDATE the subtask
+        # 3. UPDATE the board version
+        # 4. UPDATE the task's subtask counters (completed changed)
+        # The text is unchanged, so the search index is not touched.
+        with self.assertNumQueries(4):
+            response = self.client.patch(url, {"completed": True, "task": other.id}, format="json")
+
+        self.assertEqual(response.status_code, 200)
+        subtask.refresh_from_db()
+        self.assertTrue(subtask.completed)
+        self.assertEqual(subtask.task_id, task.id)
+
+    def test_delete_removes_subtask(self):
+        task = self.create_task(subtasks=1)
+        subtask = task.subtasks.get()
+
+        # 1. SELECT the subtask
+        # 2. DELETE the subtask
+        # 3. UPDATE the board version
+        # 4. INSERT the subtask's tombstone
+        # 5. DELETE the task's search index row
+        # 6. INSERT the task's search index row without the subtask text
+        # 7. UPDATE the task's subtask counters
+        with self.assertNumQueries(7):
+            response = self.client.delete(reverse("subtask-detail", args=[task.id, subtask.id]))
+
+        self.assertEqual(response.status_code, 204)
+        self.assertFalse(Subtask.objects.filter(id=subtask.id).exists())
+
+    def test_missing_task_returns_404(self):
+        self.assertEqual(self.client.get(reverse("subtask-list", args=[9999])).status_code, 404)
+        response = self.client.post(reverse("subtask-list", args=[9999]), {"subtask": "New"}, format="json")
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(self.client.delete(reverse("subtask-detail", args=[9999, 1])).status_code, 404)
+
+
+class LookupCacheTests(TaskApiTestCase):
+    """
+    Tests for the cached prio and category lookup tables.
+    """
+
+    def test_list_is_served_from_cache_and_revalidated_with_etag(self):
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse("prio-list"))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([prio["level"] for prio in response.data], ["urgent", "medium", "low"])
+        etag = response["ETag"]
+
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse("prio-list"), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_write_changes_version_and_contents(self):
+        etag = self.client.get(reverse("category-list"))["ETag"]
+
+        response = self.client.post(reverse("category-list"), {"name": "Research", "color": "#0038FF"})
+        self.assertEqual(response.status_code, 201)
+
+        response = self.client.get(reverse("category-list"), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+        self.assertIn("Research", [category["name"] for category in response.data])
+
+    def test_version_is_replaced_on_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            Category.objects.create(name="Research", color="#0038FF")
+            # A concurrent read that still saw the old rows re-caches them.
+            stale_version = category_cache.get_version()
+        self.assertNotEqual(category_cache.get_version(), stale_version)
+        self.assertIn("Research", [category["name"] for category in category_cache.all()])
+
+    def test_version_expires_so_other_processes_reload(self):
+        version = category_cache.get_version()
+        later = time.time() + settings.LOOKUP_CACHE_TIMEOUT + 1
+        with mock.patch("django.core.cache.backends.locmem.time.time", return_value=later):
+            self.assertNotEqual(category_cache.get_version(), version)
+
+    def test_etag_depends_on_content_only(self):
+        etag = self.client.get(reverse("prio-list"))["ETag"]
+        # Another process, and the version stamp expiring, give the same ETag.
+        other_process = LookupTableCache(Prio, ["id", "level", "icon_path"])
+        later = time.time() + settings.LOOKUP_CACHE_TIMEOUT + 1
+        with mock.patch("django.core.cache.backends.locmem.time.time", return_value=later):
+            self.assertEqual(f'"{other_process.get_etag()}"', etag)
+            with self.assertNumQueries(1):
+                response = self.client.get(reverse("prio-list"), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_task_renders_prio_and_category_from_cache(self):
+        task = self.create_task()
+        response = self.client.get(reverse("task-detail", args=[task.id]))
+
+        self.assertEqual(response.data["prio"], {"id": self.prio.id, "level": "medium", "icon_path": self.prio.icon_path})
+        self.assertEqual(response.data["category"], {"id": self.category.id, "name": "Technical", "color": "#1FD7C1"})
+
+        self.category.name = "Renamed"
+        self.category.save()
+        response = self.client.get(reverse("task-detail", args=[task.id]))
+        self.assertEqual(response.data["category"]["name"], "Renamed")
+
+
+class ConditionalGetTests(TaskApiTestCase):
+    """
+    Tests for ETag revalidation based on the board version.
+    """
+
+    def assert_not_modified_with_one_query(self, url):
+        etag = self.client.get(url)["ETag"]
+        with self.assertNumQueries(1):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b"")
+        return etag
+
+    def test_unchanged_endpoints_answer_304_with_one_query(self):
+        task = self.create_task()
+        for url in (reverse("task-list"), reverse("task-detail", args=[task.id]), reverse("summary")):
+            self.assert_not_modified_with_one_query(url)
+
+    def test_etag_depends_on_query_string(self):
+        self.create_task()
+        plain = self.client.get(reverse("task-list"))["ETag"]
+        filtered = self.client.get(reverse("task-list"), {"status": "done"})["ETag"]
+        self.assertNotEqual(plain, filtered)
+
+    def test_task_subtask_and_assignment_writes_change_etag(self):
+        task = self.create_task()
+        url = reverse("task-detail", args=[task.id])
+        writes = [
+            lambda: self.client.patch(url, {"title": "Changed"}, format="json"),
+            lambda: self.client.post(reverse("subtask-list", args=[task.id]), {"subtask": "New"}, format="json"),
+            lambda: task.assigned_users.remove(self.users[0]),
+            lambda: self.client.post(reverse("task-bulk"), [{"op": "update", "id": task.id, "data": {"status": "done"}}],
+                                     format="json"),
+        ]
+        for write in writes:
+            etag = self.client.get(url)["ETag"]
+            write()
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, 200)
+            self.assertNotEqual(response["ETag"], etag)
+
+    def test_contact_edit_and_delete_change_etag(self):
+        self.create_task()
+        url = reverse("task-list")
+        for write in (lambda: self.client.patch(reverse("user-detail", args=[self.users[0].id]),
+                                                {"username": "Renamed"}, format="json"),
+                      lambda: self.client.delete(reverse("user-detail", args=[self.users[1].id]))):
+            etag = self.client.get(url)["ETag"]
+            self.assertLess(write().status_code, 300)
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, 200)
+            self.assertNotEqual(response["ETag"], etag)
+
+
+@override_settings(SYNC_TOKEN_OVERLAP=timedelta(0))
+class DeltaSyncTests(TaskApiTestCase):
+    """
+    Tests for the delta sync endpoint.
+    """
+
+    def sync(self, token=None):
+        params = {"since": token} if token else {}
+        response = self.client.get(reverse("task-changes"), params)
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def test_initial_sync_returns_all_tasks(self):
+        tasks = [self.create_task(title=f"Task {i}") for i in range(3)]
+        data = self.sync()
+        self.assertEqual({item["id"] for item in data["tasks"]}, {task.id for task in tasks})
+
+    def test_only_changes_since_token_are_returned(self):
+        unchanged = self.create_task(title="Unchanged")
+        changed = self.create_task(title="Changed")
+        assigned = self.create_task(title="Assigned")
+        token = self.sync()["token"]
+
+        self.assertEqual(self.sync(token)["tasks"], [])
+
+        self.client.patch(reverse("task-detail", args=[changed.id]), {"status": "done"}, format="json")
+        assigned.assigned_users.remove(self.users[0])
+        data = self.sync(token)
+
+        self.assertEqual({item["id"] for item in data["tasks"]}, {changed.id, assigned.id})
+        self.assertNotIn(unchanged.id, [item["id"] for item in data["tasks"]])
+
+    def test_deletions_are_reported(self):
+        task = self.create_task(subtasks=2)
+        removed_task = self.create_task(title="Removed")
+        subtask = task.subtasks.first()
+        token = self.sync()["token"]
+
+        self.client.delete(reverse("subtask-detail", args=[task.id, subtask.id]))
+        self.client.delete(reverse("task-detail", args=[removed_task.id]))
+        data = self.sync(token)
+
+        self.assertEqual(data["deleted_tasks"], [removed_task.id])
+        self.assertEqual(data["deleted_subtasks"], [subtask.id])
+        self.assertEqual([item["id"] for item in data["tasks"]], [task.id])
+        self.assertEqual(Tombstone.objects.filter(model=Tombstone.SUBTASK).count(), 1)
+
+    def test_bulk_writes_are_reported(self):
+        task = self.create_task()
+        removed = self.create_task(title="Removed")
+        token = self.sync()["token"]
+
+        replaced_ids = sorted(task.subtasks.values_list("id", flat=True))
+
+        self.client.post(reverse("task-bulk"), [
+            {"op": "update", "id": task.id, "data": {"status": "done", "subtasks": [{"subtask": "New"}]}},
+            {"op": "delete", "id": removed.id},
+        ], format="json")
+        data = self.sync(token)
+
+        self.assertEqual([item["id"] for item in data["tasks"]], [task.id])
+        self.assertEqual(data["deleted_tasks"], [removed.id])
+        # The removed task's subtasks are covered by its own tombstone.
+        self.assertEqual(sorted(data["deleted_subtasks"]), replaced_ids)
+
+    def test_contact_edits_and_deletes_are_reported(self):
+        task = self.create_task()
+        other = self.create_task(title="Other")
+        other.assigned_users.set([self.users[2]])
+        token = self.sync()["token"]
+
+        self.users[0].username = "Renamed"
+        self.users[0].save()
+        data = self.sync(token)
+        self.assertEqual([item["id"] for item in data["tasks"]], [task.id])
+        self.assertIn("Renamed", [user["username"] for user in data["tasks"][0]["assigned_users"]])
+        token = data["token"]
+
+        self.users[1].delete()
+        data = self.sync(token)
+        self.assertEqual([item["id"] for item in data["tasks"]], [task.id])
+        self.assertNotIn(self.users[1].id, [user["id"] for user in data["tasks"][0]["assigned_users"]])
+
+    def test_expired_and_invalid_tokens(self):
+        expired = str(int((timezone.now() - timedelta(days=365)).timestamp() * 1_000_000))
+        self.assertEqual(self.client.get(reverse("task-changes"), {"since": expired}).status_code, 410)
+        self.assertEqual(self.client.get(reverse("task-changes"), {"since": "yesterday"}).status_code, 400)
+
+
+class RecordingChannelLayer(push.BaseChannelLayer):
+    """
+    Channel layer that records published messages instead of delivering them.
+    """
+
+    def __init__(self):
+        self.messages = []
+
+    def publish(self, group, message):
+        self.messages.append(message)
+
+
+class InMemoryChannelLayerTests(TestCase):
+    """
+    Tests delivery and backpressure of the in-memory channel layer.
+    """
+
+    def test_publish_from_another_thread(self):
+        layer = push.InMemoryChannelLayer()
+
+        async def run():
+            subscription = layer.subscribe(push.BOARD_GROUP)
+            self.assertTrue(layer.has_subscribers(push.BOARD_GROUP))
+            thread = threading.Thread(target=layer.publish, args=(push.BOARD_GROUP, {"op": "ping"}))
+            thread.start()
+            message = await asyncio.wait_for(subscription.get(), timeout=1)
+            thread.join()
+            subscription.close()
+            return message
+
+        self.assertEqual(asyncio.run(run()), {"op": "ping"})
+        self.assertFalse(layer.has_subscribers(push.BOARD_GROUP))
+
+    def test_slow_subscriber_receives_resync(self):
+        layer = push.InMemoryChannelLayer(max_queue_size=2)
+
+        async def run():
+            subscription = layer.subscribe(push.BOARD_GROUP)
+            for i in range(5):
+                layer.publish(push.BOARD_GROUP, {"op": "update", "id": i})
+            await asyncio.sleep(0)
+            messages = [subscription.queue.get_nowait() for _ in range(subscription.queue.qsize())]
+            subscription.close()
+            return messages
+
+        messages = asyncio.run(run())
+        self.assertEqual(messages[0], {"type": "board", "op": "resync"})
+        self.assertLessEqual(len(messages), 2)
+
+
+class CacheChannelLayerTests(TestCase):
+    """
+    Tests delivery between processes and backpressure of the cache channel
+    layer, with two layers sharing the cache.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+
+    def test_publish_from_another_layer(self):
+        publisher = push.CacheChannelLayer(poll_interval=0.01)
+        subscriber = push.CacheChannelLayer(poll_interval=0.01)
+        publisher.publish(push.BOARD_GROUP, {"op": "before"})
+
+        async def run():
+            subscription = subscriber.subscribe(push.BOARD_GROUP)
+            thread = threading.Thread(target=lambda: [publisher.publish(push.BOARD_GROUP, {"op": "update", "id": i})
+                                                      for i in range(2)])
+            thread.start()
+            messages = [await asyncio.wait_for(subscription.get(), timeout=1) for _ in range(2)]
+            thread.join()
+            subscription.close()
+            return messages
+
+        self.assertEqual(asyncio.run(run()), [{"op": "update", "id": 0}, {"op": "update", "id": 1}])
+
+    def test_slow_subscriber_receives_resync(self):
+        layer = push.CacheChannelLayer(poll_interval=0.01, max_queue_size=2)
+
+        async def run():
+            subscription = layer.subscribe(push.BOARD_GROUP)
+            for i in range(3):
+                layer.publish(push.BOARD_GROUP, {"op": "update", "id": i})
+            message = await asyncio.wait_for(subscription.get(), timeout=1)
+            return message, list(subscription.pending)
+
+        self.assertEqual(asyncio.run(run()), ({"type": "board", "op": "resync"}, []))
+
+    def test_expired_message_causes_resync(self):
+        layer = push.CacheChannelLayer(poll_interval=0.01)
+
+        async def run():
+            subscription = layer.subscribe(push.BOARD_GROUP)
+            for i in range(2):
+                layer.publish(push.BOARD_GROUP, {"op": "update", "id": i})
+            cache.delete(layer.message_key(push.BOARD_GROUP, 1))
+            return await asyncio.wait_for(subscription.get(), timeout=1)
+
+        self.assertEqual(asyncio.run(run()), {"type": "board", "op": "resync"})
+
+
+class PushMessageTests(TaskApiTestCase):
+    """
+    Tests the change messages pushed for writes to the board.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.layer = RecordingChannelLayer()
+        patcher = mock.patch.object(push, "_layer", self.layer)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(push._last_summary.clear)
+
+    def messages_of(self, message_type):
+        return [message for message in self.layer.messages if message["type"] == message_type]
+
+    def test_task_update_pushes_changed_fields_only(self):
+        task = self.create_task(subtasks=0)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.patch(reverse("task-detail", args=[task.id]), {"status": "done"}, format="json")
+
+        self.assertEqual(self.messages_of("task"), [
+            {"type": "task", "op": "update", "id": task.id, "fields": {"status": "done"}},
+        ])
+        self.assertEqual(self.messages_of("summary")[0]["data"]["done_count"], 1)
+
+    def test_subtask_and_task_deletes_are_pushed(self):
+        task = self.create_task(subtasks=2)
+        subtask = task.subtasks.first()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.delete(reverse("subtask-detail", args=[task.id, subtask.id]))
+            self.client.delete(reverse("task-detail", args=[task.id]))
+
+        self.assertEqual(self.messages_of("subtask"), [
+            {"type": "subtask", "op": "delete", "id": subtask.id, "task": task.id},
+        ])
+        self.assertEqual(self.messages_of("task"), [{"type": "task", "op": "delete", "id": task.id}])
+
+    def test_rolled_back_changes_are_not_pushed(self):
+        task = self.create_task(subtasks=0)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.patch(reverse("task-detail", args=[task.id]),
+                                         {"status": "done", "assigned_user_id": [0]}, format="json")
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.layer.messages, [])
+
+    def test_contact_edits_and_deletes_are_pushed(self):
+        contact = self.users[0]
+        with self.captureOnCommitCallbacks(execute=True):
+            contact.color = "#000000"
+            contact.save()
+            contact_id = contact.id
+            contact.delete()
+
+        self.assertEqual(self.messages_of("user"), [
+            {"type": "user", "op": "update", "id": contact_id,
+             "fields": {"username": "user0", "email": "user0@example.com", "contactNumber": "0123",
+                        "color": "#000000"}},
+            {"type": "user", "op": "delete", "id": contact_id},
+        ])
+
+    def test_task_create_pushes_assignees_and_subtasks(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(reverse("task-list"), {
+                "title": "Created", "due_date": "2025-05-01", "category_id": self.category.id,
+                "prio_id": self.prio.id, "assigned_user_id": [self.users[0].id],
+                "subtasks": [{"subtask": "A", "completed": True}],
+            }, format="json")
+        self.assertEqual(response.status_code, 201)
+        task = Task.objects.get(id=response.data["id"])
+
+        task_messages = self.messages_of("task")
+        self.assertEqual([message["op"] for message in task_messages], ["create", "update"])
+        self.assertEqual(task_messages[1]["fields"], {"assigned_users": [self.users[0].id]})
+        self.assertEqual(self.messages_of("subtask"), [
+            {"type": "subtask", "op": "create", "id": task.subtasks.get().id, "task": task.id,
+             "fields": {"subtask": "A", "completed": True}},
+        ])
+
+    def test_task_update_pushes_reconciled_subtasks(self):
+        task = self.create_task(subtasks=2)
+        renamed, removed = task.subtasks.order_by("id")
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.patch(reverse("task-detail", args=[task.id]), {"subtasks": [
+                {"id": renamed.id, "subtask": "Renamed", "completed": True},
+                {"subtask": "New"},
+            ]}, format="json")
+        self.assertEqual(response.status_code, 200)
+        created = task.subtasks.get(subtask="New")
+
+        self.assertEqual(self.messages_of("subtask"), [
+            {"type": "subtask", "op": "delete", "id": removed.id, "task": task.id},
+            {"type": "subtask", "op": "create", "id": created.id, "task": task.id,
+             "fields": {"subtask": "New", "completed": False}},
+            {"type": "subtask", "op": "update", "id": renamed.id, "task": task.id,
+             "fields": {"subtask": "Renamed", "completed": True}},
+        ])
+
+    def test_bulk_writes_push_a_resync(self):
+        task = self.create_task(subtasks=0)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse("task-bulk"), [{"op": "update", "id": task.id, "data": {"status": "done"}}],
+                             format="json")
+
+        self.assertEqual(self.messages_of("task"), [])
+        self.assertEqual(self.messages_of("board"), [{"type": "board", "op": "resync"}])
+
+
+class BoardConsumerTests(TaskApiTestCase):
+    """
+    Tests the board websocket consumer through direct ASGI calls.
+    """
+
+    def run_consumer(self, query_string, publish=None, on_accept=None):
+        layer = push.InMemoryChannelLayer()
+
+        async def run():
+            incoming, sent = asyncio.Queue(), []
+
+            async def send(event):
+                sent.append(event)
+                if event["type"] == "websocket.accept" and publish:
+                    layer.publish(push.BOARD_GROUP, publish)
+                elif event["type"] == "websocket.accept" and on_accept:
+                    await sync_to_async(on_accept)()
+                elif event["type"] == "websocket.send":
+                    await incoming.put({"type": "websocket.disconnect"})
+
+            await incoming.put({"type": "websocket.connect"})
+            scope = {"type": "websocket", "path": "/ws/board/", "query_string": query_string}
+            await asyncio.wait_for(board_consumer(scope, incoming.get, send), timeout=3)
+            return sent
+
+        # async_to_sync runs the consumer's database access in this thread,
+        # inside the test's transaction.
+        with mock.patch.object(push, "_layer", layer):
+            sent = async_to_sync(run)()
+        self.assertFalse(layer.has_subscribers(push.BOARD_GROUP))
+        return sent
+
+    def test_rejects_missing_or_invalid_token(self):
+        for query_string in (b"", b"token=invalid"):
+            self.assertEqual(self.run_consumer(query_string),
+                             [{"type": "websocket.close", "code": UNAUTHORIZED_CLOSE_CODE}])
+
+    def test_rejects_token_of_deleted_or_inactive_user(self):
+        token = AccessToken.for_user(self.auth_user)
+        AuthUser.objects.filter(pk=self.auth_user.pk).update(is_active=False)
+        self.assertEqual(self.run_consumer(f"token={token}".encode()),
+                         [{"type": "websocket.close", "code": UNAUTHORIZED_CLOSE_CODE}])
+
+    def test_pushes_messages_to_authenticated_client(self):
+        token = AccessToken.for_user(self.auth_user)
+        sent = self.run_consumer(f"token={token}".encode(), publish={"type": "task", "op": "delete", "id": 1})
+
+        self.assertEqual(sent[0], {"type": "websocket.accept"})
+        self.assertEqual(json.loads(sent[1]["text"]), {"type": "task", "op": "delete", "id": 1})
+
+    def test_closes_when_access_token_expires(self):
+        token = AccessToken.for_user(self.auth_user)
+        token.set_exp(lifetime=timedelta(seconds=1))
+        sent = self.run_consumer(f"token={token}".encode())
+
+        self.assertEqual(sent, [{"type": "websocket.accept"},
+                                {"type": "websocket.close", "code": UNAUTHORIZED_CLOSE_CODE}])
+
+    @override_settings(PUSH_AUTH_CHECK_INTERVAL=0.05)
+    def test_closes_when_user_is_deactivated_or_deleted(self):
+        closed = [{"type": "websocket.accept"}, {"type": "websocket.close", "code": UNAUTHORIZED_CLOSE_CODE}]
+        token = f"token={AccessToken.for_user(self.auth_user)}".encode()
+
+        def deactivate():
+            self.auth_user.is_active = False
+            self.auth_user.save()
+
+        self.assertEqual(self.run_consumer(token, on_accept=deactivate), closed)
+
+        self.auth_user.is_active = True
+        self.auth_user.save()
+        self.assertEqual(self.run_consumer(token, on_accept=self.auth_user.delete), closed)
+
+
+class AsyncReadViewTests(TaskApiTestCase):
+    """
+    Tests that the async read views served under ASGI return the same
+    responses as the sync views.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.async_client = AsyncClient()
+        self.auth_header = {"Authorization": f"Bearer {AccessToken.for_user(self.auth_user)}"}
+
+    def async_request(self, method, url, headers=None, **kwargs):
+        with override_settings(ROOT_URLCONF="task_manager.asgi_urls"):
+            request = getattr(self.async_client, method)
+            return async_to_sync(request)(url, headers={**self.auth_header, **(headers or {})}, **kwargs)
+
+    def async_get(self, url, **kwargs):
+        return self.async_request("get", url, **kwargs)
+
+    def assertSameResponse(self, url, **kwargs):
+        sync_response = self.client.get(url, **kwargs)
+        async_response = self.async_get(url, **kwargs)
+        self.assertEqual(async_response.status_code, sync_response.status_code)
+        self.assertEqual(async_response.content, sync_response.content)
+        self.assertEqual(async_response.get("ETag"), sync_response.get("ETag"))
+        return async_response
+
+    def test_reads_match_sync_views(self):
+        tasks = [self.create_task(title=f"Task {i}", due_date=date(2025, 5, i + 1)) for i in range(3)]
+
+        self.assertSameResponse(reverse("task-list"))
+        self.assertSameResponse(reverse("task-list"), data={"status": "to_do", "fields": "id,title,subtasks"})
+        page = self.assertSameResponse(reverse("task-list"), data={"page_size": 2}).json()
+        self.assertEqual([item["id"] for item in page["results"]], [tasks[0].id, tasks[1].id])
+        self.assertSameResponse(page["next"])
+        self.assertSameResponse(reverse("task-detail", args=[tasks[0].id]))
+        self.assertSameResponse(reverse("summary"))
+
+    def test_errors_match_sync_views(self):
+        self.assertSameResponse(reverse("task-detail", args=[0]))
+        self.assertSameResponse(reverse("task-list"), data={"fields": "unknown"})
+        self.assertSameResponse(reverse("task-list"), data={"cursor": "invalid"})
+
+    def test_conditional_get_and_authentication(self):
+        etag = self.async_get(reverse("summary"))["ETag"]
+        self.assertEqual(self.async_get(reverse("summary"), headers={"If-None-Match": etag}).status_code, 304)
+
+        self.auth_header = {}
+        self.assertEqual(self.async_get(reverse("task-list")).status_code, 401)
+
+    def test_writes_use_sync_views(self):
+        task = self.create_task(subtasks=0)
+        response = self.async_request("patch", reverse("task-detail", args=[task.id]), data={"status": "done"},
+                                      content_type="application/json")
+        self.assertEqual(response.status_code, 200)
+        task.refresh_from_db()
+        self.assertEqual(task.status, "done")
+
+
+class TaskRowRenderingTests(TaskApiTestCase):
+    """
+    Contract tests for the row-based task rendering: its output must be
+    byte-for-byte identical to rendering `TaskSerializer` with DRF's
+    `JSONRenderer`.
+    """
+
+    def setUp(self):
+        super().setUp()
+        research = Category.objects.create(name="Research", color="#FF0000")
+        self.create_task(title="Plain")
+        task = self.create_task(title="Ünïcödé \u2028 \"quoted\" \x07", prio=self.urgent, subtasks=3)
+        task.category = research
+        task.description = "Line\nbreak\ttab \u2029 😀 </script>"
+        task.save()
+        task.assigned_users.set(self.users[1:])
+        bare = self.create_task(title="Bare", subtasks=0, status="done")
+        bare.assigned_users.clear()
+        bare.description = ""
+        bare.save()
+
+    def expected(self, fields=None):
+        tasks = Task.objects.with_relations(fields).order_by("due_date", "id")
+        return JSONRenderer().render(TaskSerializer(tasks, many=True, fields=fields).data)
+
+    def actual(self, fields=None):
+        rows = list(task_rows(Task.objects.order_by("due_date", "id"), fields))
+        return FastJSONRenderer().render(serialize_task_rows(rows, fields))
+
+    def test_matches_task_serializer(self):
+        self.assertEqual(self.actual(), self.expected())
+
+    def test_matches_task_serializer_with_sparse_fields(self):
+        for fields in (["id"], ["title", "subtasks"], ["status", "prio", "category", "assigned_users", "id"]):
+            with self.subTest(fields=fields):
+                self.assertEqual(self.actual(fields), self.expected(fields))
+
+    def test_matches_without_orjson(self):
+        with mock.patch.object(renderers, "orjson", None):
+            self.assertEqual(self.actual(), self.expected())
+
+    def test_list_endpoint_matches_task_serializer(self):
+        response = self.client.get(reverse("task-list"), {"page_size": 2})
+        tasks = Task.objects.with_relations().order_by("due_date", "id")[:2]
+        expected = TaskSerializer(tasks, many=True).data
+        self.assertEqual(response.content, JSONRenderer().render({"next": response.json()["next"], "results": expected}))
+
+    def test_renderer_falls_back_for_unsupported_data(self):
+        for data in ({"due": date(2025, 5, 1), "when": timezone.now()}, {1: "non-string key"}):
+            with self.subTest(data=data):
+                self.assertEqual(FastJSONRenderer().render(data), JSONRenderer().render(data))
+
+
+class TaskExportTests(TaskApiTestCase):
+    """
+    Tests the streaming task export.
+    """
+
+    def export(self, **params):
+        response = self.client.get(reverse("task-export"), params)
+        self.assertTrue(response.streaming)
+        return response, b"".join(response.streaming_content).decode()
+
+    def test_ndjson_matches_task_list(self):
+        for i in range(3):
+            self.create_task(title=f"Task {i}", due_date=date(2025, 5, 3 - i))
+        response, content = self.export(format="ndjson")
+
+        self.assertEqual(response["Content-Type"], "application/x-ndjson")
+        expected = sorted(self.client.get(reverse("task-list")).json(), key=lambda task: task["id"])
+        self.assertEqual([json.loads(line) for line in content.splitlines()], expected)
+
+    def test_csv_export(self):
+        task = self.create_task(title="Report, \"quarterly\"", subtasks=2)
+        self.create_task(title="Done", status="done")
+        response, content = self.export(format="csv", status="to_do")
+
+        self.assertEqual(response["Content-Type"], "text/csv")
+        rows = list(csv.DictReader(StringIO(content)))
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0]["id"], str(task.id))
+        self.assertEqual(rows[0]["title"], task.title)
+        self.assertEqual(rows[0]["category"], "Technical")
+        self.assertEqual(rows[0]["prio"], "medium")
+        self.assertEqual(rows[0]["assigned_users"].split(";"), [user.email for user in self.users])
+        self.assertEqual(json.loads(rows[0]["subtasks"]), [
+            {"subtask": "Report, \"quarterly\" subtask 0", "completed": False},
+            {"subtask": "Report, \"quarterly\" subtask 1", "completed": True},
+        ])
+
+    def test_empty_csv_has_header(self):
+        _, content = self.export(format="csv")
+        self.assertEqual(content.strip(), "id,title,description,due_date,status,category,prio,assigned_users,subtasks")
+
+    def test_invalid_format(self):
+        response = self.client.get(reverse("task-export"), {"format": "xml"})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("format", response.json())
+
+    def test_memory_stays_flat_for_100k_tasks(self):
+        Task.objects.bulk_create([
+            Task(title=f"Task {i}", due_date=date(2025, 5, 1), category=self.category, prio=self.prio)
+            for i in range(100_000)
+        ], batch_size=5000)
+        response = self.client.get(reverse("task-export"), {"format": "ndjson"})
+
+        lines = 0
+        tracemalloc.start()
+        try:
+            for chunk in response.streaming_content:
+                lines += chunk.count(b"\n")
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        self.assertEqual(lines, 100_000)
+        # Rendering the same export in one piece peaks at about 95 MB.
+        self.assertLess(peak, 10 * 1024 * 1024)
+
+
+class TaskImportTests(TaskApiTestCase):
+    """
+    Tests importing tasks from NDJSON and CSV.
+    """
+
+    def post_import(self, body, import_format="ndjson"):
+        content_type = "text/csv" if import_format == "csv" else "application/x-ndjson"
+        return self.client.post(f"{reverse('task-import')}?format={import_format}", data=body,
+                                content_type=content_type)
+
+    def test_ndjson_import_reports_row_errors(self):
+        lines = [
+            {"title": "By name", "due_date": "2025-05-01", "category": "technical", "prio": "Urgent",
+             "assigned_users": [self.users[0].email.upper(), {"email": self.users[1].email}],
+             "subtasks": [{"subtask": "First", "completed": True}]},
+            {"title": "By id", "due_date": "2025-05-02", "category_id": self.category.id, "prio_id": self.prio.id,
+             "assigned_user_id": [self.users[2].id], "status": "done"},
+            {"title": "", "due_date": "tomorrow", "category": "Unknown", "prio": "medium",
+             "assigned_users": ["nobody@example.com"]},
+        ]
+        body = "\n".join(json.dumps(line) for line in lines) + "\n\nnot json\n"
+        response = self.post_import(body)
+
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(data["created"], 2)
+        self.assertEqual(data["error_count"], 2)
+        self.assertEqual(data["errors"][0]["line"], 3)
+        self.assertEqual(set(data["errors"][0]["errors"]), {"title", "due_date", "category", "assigned_users"})
+        self.assertEqual(data["errors"][1]["line"], 5)
+
+        task = Task.objects.get(title="By name")
+        self.assertEqual(task.prio, self.urgent)
+        self.assertEqual(set(task.assigned_users.all()), set(self.users[:2]))
+        self.assertEqual(list(task.subtasks.values_list("subtask", "completed")), [("First", True)])
+        self.assertEqual(Task.objects.get(title="By id").status, "done")
+
+    def test_csv_export_round_trip(self):
+        task = self.create_task(title="Exported, \"quoted\"", subtasks=2)
+        subtasks = list(task.subtasks.order_by("id").values_list("subtask", "completed"))
+        export = b"".join(self.client.get(reverse("task-export"), {"format": "csv"}).streaming_content)
+        Task.objects.all().delete()
+
+        response = self.post_import(export, import_format="csv")
+        self.assertEqual(response.json(), {"created": 1, "error_count": 0, "errors": []})
+        imported = Task.objects.get()
+        self.assertEqual(imported.title, task.title)
+        self.assertEqual(set(imported.assigned_users.all()), set(self.users))
+        self.assertEqual(list(imported.subtasks.order_by("id").values_list("subtask", "completed")), subtasks)
+
+    def test_rejected_batch_does_not_abort_the_import(self):
+        lines = [json.dumps({"title": f"Task {i}", "due_date": "2025-05-01", "category": "Technical",
+                             "prio": "medium", "subtasks": [{"subtask": "Sub", "completed": False}]})
+                 for i in range(4)]
+        original_bulk_create = Subtask.objects.bulk_create
+        calls = []
+
+        def failing_first_batch(objs, *args, **kwargs):
+            calls.append(objs)
+            if len(calls) == 1:
+                raise IntegrityError("simulated")
+            return original_bulk_create(objs, *args, **kwargs)
+
+        with mock.patch.object(Subtask.objects, "bulk_create", side_effect=failing_first_batch):
+            importer = TaskImporter(batch_size=2).run(parse_ndjson(lines))
+
+        self.assertEqual(importer.created, 2)
+        self.assertEqual([error["line"] for error in importer.errors], [1, 2])
+        self.assertEqual(sorted(Task.objects.values_list("title", flat=True)), ["Task 2", "Task 3"])
+
+    def test_invalid_upload(self):
+        self.assertEqual(self.post_import("x", import_format="xml").status_code, 400)
+        response = self.post_import(b"\xff\xfe broken\n")
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()["created"], 0)
+
+    def test_management_command(self):
+        with tempfile.NamedTemporaryFile("w", suffix=".csv", delete=False) as file:
+            file.write("title,due_date,category,prio,assigned_users\n")
+            file.write(f"Imported,2025-05-01,Technical,medium,{self.users[0].email}\n")
+            file.write("Broken,2025-13-01,Technical,medium,\n")
+        self.addCleanup(os.remove, file.name)
+
+        stdout, stderr = StringIO(), StringIO()
+        call_command("import_tasks", file.name, stdout=stdout, stderr=stderr)
+        self.assertIn("Imported 1 task(s), rejected 1 row(s).", stdout.getvalue())
+        self.assertIn("Line 3", stderr.getvalue())
+        self.assertEqual(list(Task.objects.get(title="Imported").assigned_users.all()), [self.users[0]])
+
+
+class TaskSearchTests(TaskApiTestCase):
+    """
+    Tests the full-text task search and the incremental maintenance of the
+    search index.
+    """
+
+    def search(self, query, **params):
+        response = self.client.get(reverse("task-search"), {"q": query, **params})
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def search_titles(self, query):
+        return [task["title"] for task in self.search(query)["results"]]
+
+    def test_title_matches_rank_above_subtask_matches(self):
+        in_subtask = self.create_task(title="Plain", subtasks=0)
+        Subtask.objects.create(task=in_subtask, subtask="Deploy release")
+        self.create_task(title="Deploy backend", subtasks=0)
+
+        data = self.search("deploy")
+        self.assertEqual([task["title"] for task in data["results"]], ["Deploy backend", "Plain"])
+        self.assertEqual(data["results"][1]["subtasks"][0]["subtask"], "Deploy release")
+        self.assertIsNone(data["next"])
+
+    def test_words_match_as_prefixes_and_all_must_match(self):
+        self.create_task(title="Refactor login form", subtasks=0)
+        self.create_task(title="Refactor signup", subtasks=0)
+
+        self.assertEqual(self.search_titles("refac LOG"), ["Refactor login form"])
+        self.assertCountEqual(self.search_titles("refactor-*"), ["Refactor login form", "Refactor signup"])
+        self.assertEqual(self.search_titles("missing"), [])
+
+    def test_index_follows_task_and_subtask_writes(self):
+        task = self.create_task(title="Alpha", subtasks=0)
+        self.client.patch(reverse("task-detail", args=[task.id]), {"title": "Bravo"}, format="json")
+        self.assertEqual(self.search_titles("alpha"), [])
+        self.assertEqual(self.search_titles("bravo"), ["Bravo"])
+
+        response = self.client.post(reverse("subtask-list", args=[task.id]), {"subtask": "Charlie"}, format="json")
+        self.assertEqual(self.search_titles("charlie"), ["Bravo"])
+        self.client.delete(reverse("subtask-detail", args=[task.id, response.json()["id"]]))
+        self.assertEqual(self.search_titles("charlie"), [])
+
+        self.client.put(reverse("task-detail", args=[task.id]), {
+            "title": "Bravo", "due_date": "2025-05-01", "category_id": self.category.id, "prio_id": self.prio.id,
+            "subtasks": [{"subtask": "Delta", "completed": False}],
+        }, format="json")
+        self.assertEqual(self.search_titles("delta"), ["Bravo"])
+
+        self.client.delete(reverse("task-detail", args=[task.id]))
+        self.assertEqual(self.search_titles("bravo"), [])
+
+    def test_bulk_writes_are_indexed(self):
+        response = self.client.post(reverse("task-list"), {
+            "title": "Created", "due_date": "2025-05-01", "category_id": self.category.id,
+            "prio_id": self.prio.id, "subtasks": [{"subtask": "Echo", "completed": False}],
+        }, format="json")
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(self.search_titles("echo"), ["Created"])
+
+        existing = self.create_task(title="Existing", subtasks=0)
+        self.client.post(reverse("task-bulk"), [
+            {"op": "create", "data": {"title": "Foxtrot", "due_date": "2025-05-01",
+                                      "category_id": self.category.id, "prio_id": self.prio.id}},
+            {"op": "delete", "id": existing.id},
+        ], format="json")
+        self.assertEqual(self.search_titles("foxtrot"), ["Foxtrot"])
+        self.assertEqual(self.search_titles("existing"), [])
+
+        TaskImporter().run(parse_ndjson([json.dumps({
+            "title": "Golf", "due_date": "2025-05-01", "category": "Technical", "prio": "medium",
+        })]))
+        self.assertEqual(self.search_titles("golf"), ["Golf"])
+
+    def test_pagination(self):
+        for i in range(5):
+            self.create_task(title=f"Hotel {i}", subtasks=0)
+
+        first = self.search("hotel", page_size=2)
+        self.assertEqual(len(first["results"]), 2)
+        second = self.client.get(first["next"]).json()
+        third = self.client.get(second["next"]).json()
+        self.assertEqual(len(third["results"]), 1)
+        self.assertIsNone(third["next"])
+        titles = [task["title"] for page in (first, second, third) for task in page["results"]]
+        self.assertEqual(sorted(titles), [f"Hotel {i}" for i in range(5)])
+
+    def test_invalid_queries(self):
+        self.assertEqual(self.client.get(reverse("task-search")).status_code, 400)
+        self.assertEqual(self.client.get(reverse("task-search"), {"q": "  "}).status_code, 400)
+        self.assertEqual(self.search('"*:()')["results"], [])
+        self.assertEqual(self.client.get(reverse("task-search"), {"q": "x", "page": "0"}).status_code, 404)
+
+    def test_rebuild_command_repairs_the_index(self):
+        task = self.create_task(title="India", subtasks=0)
+        Task.objects.filter(id=task.id).update(title="Juliett")
+        self.assertEqual(self.search_titles("juliett"), [])
+
+        stdout = StringIO()
+        call_command("rebuild_search_index", stdout=stdout)
+        self.assertIn("Indexed 1 task(s).", stdout.getvalue())
+        self.assertEqual(self.search_titles("juliett"), ["Juliett"])
+        self.assertEqual(self.search_titles("india"), [])
+
+
+class SubtaskCounterTests(TaskApiTestCase):
+    """
+    Tests the denormalized `subtask_total` / `subtask_done` counters and the
+    card representation built from them.
+    """
+
+    def assertCounters(self, task, total, done):
+        task.refresh_from_db(fields=["subtask_total", "subtask_done"])
+        self.assertEqual((task.subtask_total, task.subtask_done), (total, done))
+
+    def test_subtask_endpoints_keep_counters_consistent(self):
+        task = self.create_task(subtasks=0)
+        ids = [self.client.post(reverse("subtask-list", args=[task.id]), {"subtask": f"S{i}"}, format="json")
+               .json()["id"] for i in range(3)]
+        self.assertCounters(task, 3, 0)
+
+        self.client.patch(reverse("subtask-detail", args=[task.id, ids[0]]), {"completed": True}, format="json")
+        self.client.patch(reverse("subtask-detail", args=[task.id, ids[1]]), {"subtask": "Renamed"}, format="json")
+        self.assertCounters(task, 3, 1)
+
+        self.client.delete(reverse("subtask-detail", args=[task.id, ids[0]]))
+        self.assertCounters(task, 2, 0)
+
+    def test_task_serializer_writes_counters(self):
+        response = self.client.post(reverse("task-list"), {
+            "title": "Created", "due_date": "2025-05-01", "category_id": self.category.id, "prio_id": self.prio.id,
+            "subtasks": [{"subtask": "A", "completed": True}, {"subtask": "B", "completed": False}],
+        }, format="json")
+        self.assertEqual((response.data["subtask_total"], response.data["subtask_done"]), (2, 1))
+        task = Task.objects.get(id=response.data["id"])
+        self.assertCounters(task, 2, 1)
+
+        kept = task.subtasks.order_by("id").first()
+        response = self.client.patch(reverse("task-detail", args=[task.id]), {
+            "subtasks": [{"id": kept.id, "subtask": "A", "completed": True},
+                         {"subtask": "C", "completed": True}, {"subtask": "D", "completed": False}],
+        }, format="json")
+        self.assertEqual((response.data["subtask_total"], response.data["subtask_done"]), (3, 2))
+        self.assertCounters(task, 3, 2)
+
+    def test_stale_task_save_keeps_counters(self):
+        task = self.create_task(subtasks=0)
+        Subtask.objects.create(task=task, subtask="Done", completed=True)
+        task.title = "Renamed"
+        task.save()
+        self.assertCounters(task, 1, 1)
+
+    def test_bulk_and_import_write_counters(self):
+        existing = self.create_task(subtasks=3)
+        self.client.post(reverse("task-bulk"), [
+            {"op": "create", "data": {"title": "Bulk", "due_date": "2025-05-01", "category_id": self.category.id,
+                                      "prio_id": self.prio.id, "subtasks": [{"subtask": "A", "completed": True}]}},
+            {"op": "update", "id": existing.id, "data": {"subtasks": []}},
+        ], format="json")
+        self.assertCounters(Task.objects.get(title="Bulk"), 1, 1)
+        self.assertCounters(existing, 0, 0)
+
+        TaskImporter().run(parse_ndjson([json.dumps({
+            "title": "Imported", "due_date": "2025-05-01", "category": "Technical", "prio": "medium",
+            "subtasks": [{"subtask": "A", "completed": False}, {"subtask": "B", "completed": True}],
+        })]))
+        self.assertCounters(Task.objects.get(title="Imported"), 2, 1)
+
+    def test_card_view_skips_subtasks(self):
+        self.create_task(subtasks=3)
+        self.create_task(title="Other", subtasks=2)
+
+        # board version (ETag), tasks, assignees; no subtask query
+        with self.assertNumQueries(3):
+            response = self.client.get(reverse("task-list"), {"view": "card"})
+        cards = response.json()
+        self.assertEqual(list(cards[0]), ["id", "title", "description", "assigned_users", "due_date", "prio",
+                                          "category", "status", "subtask_total", "subtask_done"])
+        self.assertEqual([(card["subtask_total"], card["subtask_done"]) for card in cards], [(3, 1), (2, 1)])
+
+        self.assertEqual(self.client.get(reverse("task-list"), {"view": "tiny"}).status_code, 400)
+        self.assertEqual(self.client.get(reverse("task-list"), {"view": "card", "fields": "id"}).status_code, 400)
+
+    def test_check_command_repairs_drift(self):
+        task = self.create_task(subtasks=2)
+        clean = self.create_task(title="Clean", subtasks=1)
+        Subtask.objects.filter(task=task).update(completed=True)
+        Task.objects.filter(id=clean.id).update(subtask_total=5)
+
+        stdout = StringIO()
+        call_command("check_subtask_counts", "--dry-run", stdout=stdout)
+        self.assertIn(f"Task {task.id}: stored 1/2, live 2/2", stdout.getvalue())
+        self.assertIn("Found 2 task(s)", stdout.getvalue())
+        self.assertCounters(task, 2, 1)
+
+        stdout = StringIO()
+        call_command("check_subtask_counts", stdout=stdout)
+        self.assertIn("Repaired the subtask counters of 2 task(s).", stdout.getvalue())
+        self.assertCounters(task, 2, 2)
+        self.assertCounters(clean, 1, 0)
+
+        stdout = StringIO()
+        call_command("check_subtask_counts", stdout=stdout)
+        self.assertIn("Subtask counters match", stdout.getvalue())
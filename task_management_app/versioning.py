@@ -0,0 +1,22 @@
+from django.db.models import F
+
+from .models import DEFAULT_BOARD, BoardVersion
+
+
+def get_board_version(board=DEFAULT_BOARD):
+    """
+    Returns the current change version of a board with a single query.
+    """
+    versions = BoardVersion.objects.filter(board=board).values_list('version', flat=True)[:1]
+    return versions[0] if versions else 0
+
+
+def bump_board_version(board=DEFAULT_BOARD):
+    """
+    Increments the change version of a board. The update runs in the
+    caller's transaction, so the new version becomes visible together with
+    the change that caused it.
+    """
+    if not BoardVersion.objects.filter(board=board).update(version=F('version') + 1):
+        BoardVersion.objects.get_or_create(board=board)
+        BoardVersion.objects.filter(board=board).update(version=F('version') + 1)
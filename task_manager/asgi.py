@@ -2,6 +2,9 @@
 ASGI config for join project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
+HTTP requests are handled by Django using the ``task_manager.asgi_urls``
+URLconf, which serves the task reads with async views; websocket
+connections to ``/ws/board/`` receive pushed board changes.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.1/howto/deployment/asgi/
@@ -9,8 +12,43 @@ https://docs.djangoproject.com/en/5.1/howto/deployment/asgi/
 
 import os
 
-from django.core.asgi import get_asgi_application
+import django
+from django.core.handlers.asgi import ASGIHandler
 
-os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'join.settings')
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'task_manager.settings')
 
-application = get_asgi_application()
+ASGI_URLCONF = 'task_manager.asgi_urls'
+
+
+class AsyncURLConfASGIHandler(ASGIHandler):
+    """
+    ASGI handler that resolves requests against the async URLconf.
+    """
+
+    def create_request(self, scope, body_file):
+        request, error_response = super().create_request(scope, body_file)
+        if request is not None:
+            request.urlconf = ASGI_URLCONF
+        return request, error_response
+
+
+django.setup(set_prefix=False)
+django_application = AsyncURLConfASGIHandler()
+
+from task_management_app.consumers import board_consumer  # noqa: E402  (needs configured settings)
+
+websocket_routes = {
+    '/ws/board/': board_consumer,
+}
+
+
+async def application(scope, receive, send):
+    if scope['type'] == 'websocket':
+        consumer = websocket_routes.get(scope['path'])
+        if consumer is None:
+            await receive()  # websocket.connect
+            await send({'type': 'websocket.close'})
+            return
+        await consumer(scope, receive, send)
+    else:
+        await django_application(scope, receive, send)
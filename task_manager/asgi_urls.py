@@ -0,0 +1,15 @@
+"""
+URL configuration for the ASGI application.
+
+Mirrors `task_manager.urls`, but routes the task API through
+`task_management_app.api.async_urls`, which serves the task reads with
+async views.
+"""
+from django.contrib import admin
+from django.urls import path, include
+
+urlpatterns = [
+    path('admin/', admin.site.urls),
+    path('api/', include('task_management_app.api.async_urls')),
+    path('api/auth/', include('user_auth_app.api.urls'))
+]
@@ -0,0 +1,76 @@
+"""
+Builds the `DATABASES['default']` setting from environment variables.
+
+    DB_ENGINE          sqlite (default) or postgresql
+    DB_NAME            SQLite file (default: db.sqlite3 in the project) or
+                       PostgreSQL database name
+    DB_USER, DB_PASSWORD, DB_HOST, DB_PORT
+                       PostgreSQL connection parameters
+    DB_CONN_MAX_AGE    Seconds a connection is reused across requests
+                       (default 60, 0 closes it after every request)
+    DB_POOL_MAX_SIZE   PostgreSQL only: use a psycopg connection pool of at
+                       most this many connections instead of persistent
+                       connections (requires psycopg[pool])
+    DB_POOL_MIN_SIZE   Connections the pool keeps open (default 2)
+    DB_BUSY_TIMEOUT    SQLite only: seconds a write waits for the database
+                       lock before failing (default 5)
+"""
+
+DEFAULT_CONN_MAX_AGE = 60
+
+# Applied to every new SQLite connection. WAL lets reads run alongside a
+# write, and with WAL, synchronous=NORMAL only syncs at checkpoints, which
+# is still safe against corruption (a power loss can drop the last commits).
+SQLITE_INIT_COMMAND = 'PRAGMA journal_mode=WAL; PRAGMA synchronous=NORMAL'
+
+
+def database_config(environ, base_dir):
+    """
+    Returns the settings of the default database for `environ`.
+
+    Persistent connections are checked before they are reused
+    (`CONN_HEALTH_CHECKS`), so a connection dropped by the server fails over
+    to a new one instead of failing the request.
+    """
+    engine = environ.get('DB_ENGINE', 'sqlite')
+    config = {
+        'CONN_MAX_AGE': int(environ.get('DB_CONN_MAX_AGE', DEFAULT_CONN_MAX_AGE)),
+        'CONN_HEALTH_CHECKS': True,
+    }
+
+    if engine == 'sqlite':
+        config.update({
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': environ.get('DB_NAME', base_dir / 'db.sqlite3'),
+            'OPTIONS': {
+                'init_command': SQLITE_INIT_COMMAND,
+                # Sets SQLite's busy timeout.
+                'timeout': float(environ.get('DB_BUSY_TIMEOUT', 5)),
+                # Take the write lock when the transaction begins: a deferred
+                # transaction that has read cannot wait for the lock and
+                # fails with "database is locked" instead.
+                'transaction_mode': 'IMMEDIATE',
+            },
+        })
+    elif engine == 'postgresql':
+        config.update({
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': environ.get('DB_NAME', 'join'),
+            'USER': environ.get('DB_USER', ''),
+            'PASSWORD': environ.get('DB_PASSWORD', ''),
+            'HOST': environ.get('DB_HOST', ''),
+            'PORT': environ.get('DB_PORT', ''),
+            'OPTIONS': {},
+        })
+        if environ.get('DB_POOL_MAX_SIZE'):
+            # Pooled connections go back to the pool after every request,
+            # so they must not be kept by the request thread as well.
+            config['CONN_MAX_AGE'] = 0
+            config['OPTIONS']['pool'] = {
+                'min_size': int(environ.get('DB_POOL_MIN_SIZE', 2)),
+                'max_size': int(environ['DB_POOL_MAX_SIZE']),
+            }
+    else:
+        raise ValueError(f"Unsupported DB_ENGINE {engine!r}, use 'sqlite' or 'postgresql'.")
+
+    return config
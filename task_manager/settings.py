@@ -10,9 +10,12 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.1/ref/settings/
 """
 
+import os
 from datetime import timedelta
 from pathlib import Path
 
+from .database import database_config
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -127,14 +130,70 @@ WSGI_APPLICATION = 'task_manager.wsgi.application'
 
 # Database
 # https://docs.djangoproject.com/en/5.1/ref/settings/#databases
+# Configured from DB_* environment variables (see task_manager/database.py);
+# without them, SQLite in WAL mode with persistent connections.
 
 DATABASES = {
+    'default': database_config(os.environ, BASE_DIR),
+}
+
+
+# Cache
+# https://docs.djangoproject.com/en/5.1/topics/cache/
+# The local-memory cache is per process. Deployments running several worker
+# processes should switch to a shared backend (e.g. Redis or Memcached) so
+# cache invalidation reaches every worker; `manage.py rebuild_summary`
+# requires one.
+
+CACHES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
     }
 }
 
+# Seconds the summary counters stay cached; they are also invalidated on every task write.
+SUMMARY_CACHE_TIMEOUT = 300
+
+# Seconds the version stamp of the prio and category lookup caches lives.
+# Writes replace it at once in the shared cache; with the per-process cache,
+# other processes reload the tables when it expires.
+LOOKUP_CACHE_TIMEOUT = 30
+
+
+# Delta sync (/api/task/changes/)
+# Tokens are moved back by SYNC_TOKEN_OVERLAP so writes that commit slightly
+# after a sync are not missed; clients may therefore see a change twice.
+# Tokens older than SYNC_TOMBSTONE_RETENTION require a full resync, and
+# tombstones older than that are removed by `manage.py purge_tombstones`.
+
+SYNC_TOKEN_OVERLAP = timedelta(seconds=2)
+
+SYNC_TOMBSTONE_RETENTION = timedelta(days=30)
+
+# Board changes are pushed to websocket clients (`/ws/board/`) through this
+# channel layer. The in-memory layer only reaches clients connected to the
+# same process; multi-process deployments use
+# 'task_management_app.push.CacheChannelLayer' with a shared cache, e.g.
+# {'cache_alias': 'default', 'poll_interval': 0.5}.
+
+PUSH_CHANNEL_LAYER = 'task_management_app.push.InMemoryChannelLayer'
+
+PUSH_CHANNEL_LAYER_OPTIONS = {'max_queue_size': 100}
+
+# Websocket connections are closed when the access token expires, and when
+# a check this often (seconds) finds the user deleted or deactivated.
+
+PUSH_AUTH_CHECK_INTERVAL = 60
+
+
+# Email logins are resolved by the indexed, case-insensitive email lookup;
+# ModelBackend keeps username logins (e.g. the admin) working.
+
+AUTHENTICATION_BACKENDS = [
+    'user_auth_app.backends.EmailBackend',
+    'django.contrib.auth.backends.ModelBackend',
+]
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
@@ -154,6 +213,37 @@ AUTH_PASSWORD_VALIDATORS = [
     },
 ]
 
+# Password hashing
+# PASSWORD_HASHER picks the hasher for new hashes: 'scrypt' (default),
+# 'argon2' (requires the argon2-cffi package) or 'pbkdf2' (Django's default).
+# Hashes made with another hasher or cost stay valid and are rehashed with the
+# preferred hasher when their user logs in. The costs follow the OWASP
+# password storage recommendations.
+PASSWORD_HASHER = os.environ.get('PASSWORD_HASHER', 'scrypt')
+
+PASSWORD_HASHER_COST = {
+    'scrypt': {'work_factor': 2 ** 14, 'block_size': 8, 'parallelism': 5},
+    'argon2': {'time_cost': 2, 'memory_cost': 19 * 1024, 'parallelism': 1},
+    'pbkdf2': {'iterations': 870000},
+}
+
+PASSWORD_HASHER_CLASSES = {
+    'scrypt': 'user_auth_app.hashers.ScryptPasswordHasher',
+    'argon2': 'user_auth_app.hashers.Argon2PasswordHasher',
+    'pbkdf2': 'user_auth_app.hashers.PBKDF2PasswordHasher',
+}
+
+# The first hasher makes new hashes; the others verify existing ones.
+PASSWORD_HASHERS = [PASSWORD_HASHER_CLASSES[PASSWORD_HASHER]] + [
+    path for name, path in PASSWORD_HASHER_CLASSES.items() if name != PASSWORD_HASHER
+]
+
+# Logins and registrations hash in a pool of PASSWORD_HASHING_WORKERS threads
+# (0 hashes in the request thread). When PASSWORD_HASHING_QUEUE_SIZE further
+# hashes are waiting, requests are answered with 503 instead of queueing.
+PASSWORD_HASHING_WORKERS = os.cpu_count() or 1
+PASSWORD_HASHING_QUEUE_SIZE = 64
+
 
 # Internationalization
 # https://docs.djangoproject.com/en/5.1/topics/i18n/
@@ -181,15 +271,38 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 # Default classes for permission & authentication
 
 REST_FRAMEWORK = {
+    'DEFAULT_RENDERER_CLASSES': [
+        'task_management_app.api.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated'
     ],
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'user_auth_app.authentication.CachedJWTAuthentication',
         # 'rest_framework.authentication.TokenAuthentication'
-    ]
+    ],
+    # Token bucket limits on the writes of every view; the auth views set
+    # their own (see user_auth_app.api.throttles).
+    'DEFAULT_THROTTLE_CLASSES': [
+        'user_auth_app.api.throttles.WriteRateThrottle',
+    ],
+    'DEFAULT_THROTTLE_RATES': {
+        # Token buckets per user (or client IP): bursts of up to n requests,
+        # refilled at n per period. Guest logins are limited per client IP.
+        'guest_login': '10/min',
+        'login': '20/min',
+        'registration': '20/hour',
+        'write': '300/min',
+        'bulk_write': '30/min',
+    },
 }
 
+# Where the rate limit buckets are kept: LocalBucketStore limits per process;
+# CacheBucketStore shares them through the RATE_LIMIT_CACHE cache (e.g. Redis).
+RATE_LIMIT_STORE = 'user_auth_app.ratelimit.LocalBucketStore'
+RATE_LIMIT_CACHE = 'default'
+
 SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(minutes=15),
     "REFRESH_TOKEN_LIFETIME": timedelta(days=7),
@@ -197,3 +310,21 @@ SIMPLE_JWT = {
     "BLACKLIST_AFTER_ROTATION": True,
     "AUTH_HEADER_TYPES": ("Bearer",),
 }
+
+# Users resolved from access tokens are cached for JWT_USER_CACHE_TIMEOUT
+# seconds and dropped when they are saved or deleted; refresh token blacklist
+# checks are memoized for JWT_BLACKLIST_CACHE_TIMEOUT seconds (blacklisted
+# tokens until they expire). 0 disables either cache. With the per-process
+# local-memory cache, other workers may see a deleted or deactivated user
+# for up to the timeout.
+
+JWT_USER_CACHE_TIMEOUT = 60
+
+JWT_BLACKLIST_CACHE_TIMEOUT = 60
+
+# Guest accounts (/api/auth/login/guest/) expire after GUEST_ACCOUNT_LIFETIME; their
+# refresh tokens expire with them. Expired guests and their tokens are
+# deleted by `manage.py purge_guests`, which should run periodically (e.g.
+# hourly from cron).
+
+GUEST_ACCOUNT_LIFETIME = timedelta(days=1)
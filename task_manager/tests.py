@@ -0,0 +1,56 @@
+import os
+import tempfile
+from pathlib import Path
+from unittest import skipUnless
+
+from django.db import connection, connections
+from django.test import TestCase
+
+from .database import database_config
+
+
+class DatabaseConfigTests(TestCase):
+    """
+    Tests the environment-driven database settings and the SQLite
+    connection setup.
+    """
+
+    def test_defaults_to_tuned_sqlite_with_persistent_connections(self):
+        config = database_config({}, Path("/srv/join"))
+        self.assertEqual(config["ENGINE"], "django.db.backends.sqlite3")
+        self.assertEqual(config["NAME"], Path("/srv/join/db.sqlite3"))
+        self.assertEqual(config["CONN_MAX_AGE"], 60)
+        self.assertTrue(config["CONN_HEALTH_CHECKS"])
+        self.assertEqual(config["OPTIONS"]["transaction_mode"], "IMMEDIATE")
+        self.assertEqual(config["OPTIONS"]["timeout"], 5)
+
+    def test_postgres_pool_replaces_persistent_connections(self):
+        environ = {"DB_ENGINE": "postgresql", "DB_NAME": "board", "DB_HOST": "db", "DB_CONN_MAX_AGE": "300"}
+        config = database_config(environ, Path("/srv/join"))
+        self.assertEqual(config["ENGINE"], "django.db.backends.postgresql")
+        self.assertEqual((config["NAME"], config["HOST"]), ("board", "db"))
+        self.assertEqual(config["CONN_MAX_AGE"], 300)
+        self.assertNotIn("pool", config["OPTIONS"])
+
+        config = database_config({**environ, "DB_POOL_MAX_SIZE": "20"}, Path("/srv/join"))
+        self.assertEqual(config["CONN_MAX_AGE"], 0)
+        self.assertEqual(config["OPTIONS"]["pool"], {"min_size": 2, "max_size": 20})
+
+        with self.assertRaises(ValueError):
+            database_config({"DB_ENGINE": "oracle"}, Path("/srv/join"))
+
+    @skipUnless(connection.vendor == "sqlite", "SQLite pragmas")
+    def test_sqlite_connections_are_tuned(self):
+        with tempfile.TemporaryDirectory() as directory:
+            settings_dict = {**connection.settings_dict, "NAME": os.path.join(directory, "board.sqlite3")}
+            wrapper = type(connections["default"])(settings_dict, alias="tuned")
+            try:
+                with wrapper.cursor() as cursor:
+                    pragmas = {}
+                    for pragma in ("journal_mode", "synchronous", "busy_timeout"):
+                        cursor.execute(f"PRAGMA {pragma}")
+                        pragmas[pragma] = cursor.fetchone()[0]
+            finally:
+                wrapper.close()
+        # synchronous=1 is NORMAL
+        self.assertEqual(pragmas, {"journal_mode": "wal", "synchronous": 1, "busy_timeout": 5000})
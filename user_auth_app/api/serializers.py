@@ -2,6 +2,8 @@ from rest_framework import serializers
 from ..models import UserProfile
 from django.contrib.auth.models import User
 from django.contrib.auth import authenticate
+from ..backends import users_with_email
+from ..hashers import hash_password
 
 
 class UserProfileSerializer(serializers.ModelSerializer):
@@ -43,7 +45,7 @@ class RegistrationSerializer(serializers.ModelSerializer):
         if pw != confirmed_pw:
             raise serializers.ValidationError({'error': 'Passwords do not match'})
 
-        if User.objects.filter(email=data['email']).exists():
+        if users_with_email(data['email']).exists():
             raise serializers.ValidationError({'error': 'Invalid email or password'})
 
         return data
@@ -51,10 +53,14 @@ class RegistrationSerializer(serializers.ModelSerializer):
     def create(self, validated_data):
         """
         Creates a new user instance, excluding the 'confirmed_password' field.
-        This method uses the create_user method to hash the password and save the user.
+        The password is hashed in the hashing pool before the user is saved.
         """
         validated_data.pop('confirmed_password')
-        return User.objects.create_user(**validated_data)
+        return User.objects.create(
+            username=User.normalize_username(validated_data['username']),
+            email=User.objects.normalize_email(validated_data.get('email', '')),
+            password=hash_password(validated_data['password']),
+        )
 
 
 class EmailAuthTokenSerializer(serializers.Serializer):
@@ -71,18 +77,14 @@ class EmailAuthTokenSerializer(serializers.Serializer):
         """
         Validates the email and password, ensuring that both are provided and that they correspond
         to a valid user. If authentication is successful, the user instance is included in the
-        validated attributes.
+        validated attributes. The user is resolved with a single indexed, case-insensitive
+        email lookup (see `EmailBackend`).
         """
         email = attrs.get('email')
         password = attrs.get('password')
 
         if email and password:
-            try:
-                user = User.objects.get(email=email)
-            except User.DoesNotExist:
-                raise serializers.ValidationError({'error': 'Invalid email or password'})
-
-            user = authenticate(username=user.username, password=password)
+            user = authenticate(self.context.get('request'), email=email, password=password)
 
             if not user:
                 raise serializers.ValidationError({'error': 'Invalid email or password'})
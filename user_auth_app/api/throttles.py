@@ -0,0 +1,78 @@
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+
+from ..ratelimit import get_bucket_store
+
+
+class TokenBucketThrottle(BaseThrottle):
+    """
+    Token bucket rate limit per client and endpoint.
+
+    The rate of `scope` in `DEFAULT_THROTTLE_RATES` ('<n>/<period>') lets a
+    client send bursts of up to n requests, and refills its bucket at n
+    requests per period. Clients are identified by their user id, or by IP
+    address (see `NUM_PROXIES`) when not authenticated. The buckets are kept
+    in `RATE_LIMIT_STORE`. A view can select another rate with its
+    `throttle_scope`.
+
+    DRF checks throttles before the view's handler runs, and the user comes
+    from the JWT user cache, so rejected requests do no database work.
+    """
+    scope = None
+    # Methods that take a token; None limits every method.
+    methods = None
+    THROTTLE_RATES = api_settings.DEFAULT_THROTTLE_RATES
+
+    def __init__(self):
+        self.wait_seconds = None
+
+    def allow_request(self, request, view):
+        if self.methods is not None and request.method not in self.methods:
+            return True
+        scope = getattr(view, 'throttle_scope', None) or self.scope
+        rate = self.THROTTLE_RATES.get(scope)
+        if rate is None:
+            return True
+        count, period = rate.split('/')
+        count = int(count)
+        seconds = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}[period[0]]
+        ident = self.get_client_key(request)
+        self.wait_seconds = get_bucket_store().take(f'{scope}:{ident}', count, count / seconds)
+        return not self.wait_seconds
+
+    def get_client_key(self, request):
+        if request.user and request.user.is_authenticated:
+            return f'user:{request.user.pk}'
+        return f'ip:{self.get_ident(request)}'
+
+    def wait(self):
+        return self.wait_seconds
+
+
+class LoginRateThrottle(TokenBucketThrottle):
+    scope = 'login'
+
+
+class RegistrationRateThrottle(TokenBucketThrottle):
+    scope = 'registration'
+
+
+class GuestLoginRateThrottle(TokenBucketThrottle):
+    """
+    Limits how many guest accounts a client (by IP address, see
+    `NUM_PROXIES`) can create, at the `guest_login` rate. Applies whether or
+    not the request carries credentials.
+    """
+    scope = 'guest_login'
+
+    def get_client_key(self, request):
+        return f'ip:{self.get_ident(request)}'
+
+
+class WriteRateThrottle(TokenBucketThrottle):
+    """
+    Limits the writes to the board (any method but GET, HEAD and OPTIONS) at
+    the `write` rate, across all write endpoints.
+    """
+    scope = 'write'
+    methods = frozenset(['POST', 'PUT', 'PATCH', 'DELETE'])
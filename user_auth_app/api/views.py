@@ -1,18 +1,25 @@
 from rest_framework import generics
+from ..guests import GUEST_CLAIM, GuestRefreshToken, create_guest, delete_guests
 from ..models import UserProfile
+from ..authentication import CachedJWTAuthentication
+from ..tokens import REMEMBER_CLAIM, CachedRefreshToken
+from django.contrib.auth import authenticate
 from django.contrib.auth.models import User
+from django.db import IntegrityError, transaction
 from .serializers import UserProfileSerializer, RegistrationSerializer, EmailAuthTokenSerializer
+from .throttles import GuestLoginRateThrottle, LoginRateThrottle, RegistrationRateThrottle
 from rest_framework.views import APIView
 from rest_framework.permissions import AllowAny
 from rest_framework.authtoken.models import Token
 from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.authtoken.views import ObtainAuthToken
-from rest_framework_simplejwt.tokens import RefreshToken
-from rest_framework.decorators import api_view, permission_classes
+from rest_framework.decorators import api_view, permission_classes, throttle_classes
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+from rest_framework_simplejwt.settings import api_settings
 from django.http import JsonResponse
 from django.views.decorators.csrf import csrf_exempt
-import uuid
 
 
 class UserProfileList(generics.ListCreateAPIView):
@@ -45,6 +52,7 @@ class RegistrationView(APIView):
     creates a new user, and returns an authentication token along with user details.
     """
     permission_classes = [AllowAny]
+    throttle_classes = [RegistrationRateThrottle]
 
     def post(self, request):
         """
@@ -54,13 +62,17 @@ class RegistrationView(APIView):
 
         if serializer.is_valid():
             try:
-                saved_account = serializer.save()
+                with transaction.atomic():
+                    saved_account = serializer.save()
                 token, _ = Token.objects.get_or_create(user=saved_account)
                 return Response({
                     'token': token.key,
                     'username': saved_account.username,
                     'email': saved_account.email
                 }, status=status.HTTP_201_CREATED)
+            except IntegrityError:
+                # Lost a race against a registration with the same email.
+                return Response({'error': 'Invalid email or password'}, status=status.HTTP_400_BAD_REQUEST)
             except Exception as e:
                 return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
@@ -80,7 +92,7 @@ class LoginView(ObtainAuthToken):
         """
         Handles the POST request to authenticate a user and issue an authentication token.
         """
-        serializer = EmailAuthTokenSerializer(data=request.data)
+        serializer = EmailAuthTokenSerializer(data=request.data, context={'request': request})
 
         if serializer.is_valid():
             try:
@@ -100,48 +112,52 @@ class LoginView(ObtainAuthToken):
 
 @api_view(['POST'])
 @permission_classes([AllowAny])
+@throttle_classes([LoginRateThrottle])
 def login_view(request):
     """
     View for user login that returns an access token and optionally sets a refresh token cookie.
     
     This view handles user login, generates a JWT access token, and optionally sets the refresh token as a cookie 
-    (with a configurable expiration time based on 'remember me' choice).
+    (with a configurable expiration time based on 'remember me' choice). The user is resolved with a single
+    indexed, case-insensitive email lookup (see `EmailBackend`).
     """
     data = request.data
+    user = authenticate(request, email=data.get("email"), password=data.get("password"))
 
-    try:
-        user = User.objects.get(email=data["email"])
-
-        if user.check_password(data["password"]):
-            refresh = RefreshToken.for_user(user)
+    if user is None:
+        return Response({"error": "Invalid credentials"}, status=status.HTTP_400_BAD_REQUEST)
 
-            response = Response({
-                'accessToken': str(refresh.access_token),
-                'username': user.username,
-                'email': user.email,
-                'user_id': user.id
-            }, status=status.HTTP_200_OK)
+    refresh = CachedRefreshToken.for_user(user)
+    refresh[REMEMBER_CLAIM] = bool(data.get("remember"))
 
-            # When 'Remember Me' is clicked, we set a long refresh token
-            max_age = 60 * 60 * 24 * 30 if data.get("remember") else 60 * 60 * 24  # 30 Tage oder 1 Tag
+    response = Response({
+        'accessToken': str(refresh.access_token),
+        'username': user.username,
+        'email': user.email,
+        'user_id': user.id
+    }, status=status.HTTP_200_OK)
+    set_refresh_cookie(response, refresh)
 
-            # set Refresh-Token as HttpOnly-Cookie
-            response.set_cookie(
-                "refreshToken",
-                str(refresh),
-                httponly=True,
-                secure=True,
-                samesite="Strict",
-                max_age=max_age
-            )
+    return response
 
-            return response
 
-        else:
-            return Response({"error": "Invalid credentials"}, status=status.HTTP_400_BAD_REQUEST)
+def set_refresh_cookie(response, refresh):
+    """
+    Sets the refresh token as HttpOnly cookie. Its lifetime depends on the
+    "remember me" choice made at login, which the token carries.
+    """
+    # When 'Remember Me' is clicked, we set a long refresh token
+    max_age = 60 * 60 * 24 * 30 if refresh.get(REMEMBER_CLAIM) else 60 * 60 * 24  # 30 Tage oder 1 Tag
 
-    except User.DoesNotExist:
-        return Response({"error": "Invalid credentials"}, status=status.HTTP_400_BAD_REQUEST)
+    # set Refresh-Token as HttpOnly-Cookie
+    response.set_cookie(
+        "refreshToken",
+        str(refresh),
+        httponly=True,
+        secure=True,
+        samesite="Strict",
+        max_age=max_age
+    )
 
 
 @csrf_exempt
@@ -150,6 +166,10 @@ def refresh_view(request):
     View for refreshing the access token using a valid refresh token stored in a cookie.
     
     This view reads the refresh token from the request cookies, validates it, and returns a new access token.
+    With `ROTATE_REFRESH_TOKENS`, the cookie is replaced by a rotated refresh token and the old one is
+    blacklisted (`BLACKLIST_AFTER_ROTATION`) with batched writes; issuing tokens writes nothing. The
+    blacklist check and the user lookup are served from the cache where possible. Guest tokens are
+    refused once the guest account has expired, and their rotations keep the original expiry.
     """
     refresh_token = request.COOKIES.get("refreshToken")
 
@@ -157,12 +177,23 @@ def refresh_view(request):
         return JsonResponse({"error": "No refresh token"}, status=401)
 
     try:
-        refresh = RefreshToken(refresh_token)
-        access_token = str(refresh.access_token)
-        return JsonResponse({"accessToken": access_token})
-    except Exception:
+        refresh = CachedRefreshToken(refresh_token)
+        # Tokens of deleted or deactivated users must not be refreshed.
+        CachedJWTAuthentication().get_user(refresh)
+        if refresh.get(GUEST_CLAIM):
+            # Already verified above; rotates without outliving the account.
+            refresh = GuestRefreshToken(refresh_token, verify=False)
+            refresh.verify_account()
+        if api_settings.ROTATE_REFRESH_TOKENS:
+            refresh.rotate()
+    except (TokenError, AuthenticationFailed, InvalidToken):
         return JsonResponse({"error": "Invalid refresh token"}, status=401)
 
+    response = JsonResponse({"accessToken": str(refresh.access_token)})
+    if api_settings.ROTATE_REFRESH_TOKENS:
+        set_refresh_cookie(response, refresh)
+    return response
+
 
 @csrf_exempt
 def logout_view(request):
@@ -183,20 +214,18 @@ class GuestLoginView(APIView):
     This view creates a temporary guest user with a unique username and 
     generates JSON Web Tokens (JWT) for authentication.
 
+    Guest accounts expire after `GUEST_ACCOUNT_LIFETIME` (their refresh token
+    with them) and are deleted by `manage.py purge_guests`. Each client can
+    create a limited number of guests per minute.
     """
     permission_classes = [AllowAny]
+    throttle_classes = [GuestLoginRateThrottle]
 
     def post(self, request, *args, **kwargs):
-        guest_id = uuid.uuid4().hex  # create unique ID for guest
-        guest_user = User.objects.create_user(
-            username=f"guest_{guest_id}",
-            email=None,
-            password=None
-        )
-        guest_user.save()
+        guest_user, guest_id = create_guest()
 
         # Generiere ein JWT für den Gast
-        refresh = RefreshToken.for_user(guest_user)
+        refresh = GuestRefreshToken.for_user(guest_user)
         access_token = refresh.access_token
 
         return Response({
@@ -210,7 +239,8 @@ class GuestLogoutView(APIView):
     """
     API endpoint for guest logout.
 
-    This view invalidates the provided refresh token and deletes the guest user if it exists.
+    This view deletes the guest user the provided refresh token belongs to,
+    together with its tokens. Tokens of regular users are rejected.
 
     """
     permission_classes = [AllowAny]
@@ -220,10 +250,9 @@ class GuestLogoutView(APIView):
 
         if refresh_token:
             try:
-                token = RefreshToken(refresh_token)
-                user = User.objects.get(id=token["user_id"])
-                user.delete()
-                token.blacklist()
+                token = CachedRefreshToken(refresh_token)
+                user = User.objects.get(id=token["user_id"], guest_account__isnull=False)
+                delete_guests([user.id])
 
                 return Response({"message": "Guest logged out and removed"}, status=200)
             except User.DoesNotExist:
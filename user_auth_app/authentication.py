@@ -0,0 +1,52 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+
+def get_user_cache_key(user_id):
+    return f'jwt_user:{user_id}'
+
+
+def invalidate_cached_users(user_ids):
+    cache.delete_many([get_user_cache_key(user_id) for user_id in user_ids])
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWT authentication that caches the user row for `JWT_USER_CACHE_TIMEOUT`
+    seconds, keyed by the token's user id claim, so polling clients do not
+    load the user on every request.
+
+    Cached users are dropped when they are saved or deleted (see
+    `user_auth_app.signals`); the short timeout bounds how long other
+    processes can see a stale user when the cache is not shared. The
+    active and password-change checks still run against every token.
+    """
+
+    def get_user(self, validated_token):
+        timeout = settings.JWT_USER_CACHE_TIMEOUT
+        if not timeout:
+            return super().get_user(validated_token)
+
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+        key = get_user_cache_key(user_id)
+        user = cache.get(key)
+        if user is None:
+            user = super().get_user(validated_token)
+            cache.set(key, user, timeout)
+            return user
+
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+        if api_settings.CHECK_REVOKE_TOKEN and \
+                validated_token.get(api_settings.REVOKE_TOKEN_CLAIM) != get_md5_hash_password(user.password):
+            raise AuthenticationFailed(_("The user's password has been changed."), code="password_changed")
+        return user
@@ -0,0 +1,41 @@
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+from django.db.models import Value
+from django.db.models.functions import Lower
+
+from .hashers import check_user_password, harden_missing_user
+
+UserModel = get_user_model()
+
+
+def users_with_email(email):
+    """
+    Returns the users whose email matches `email` case-insensitively.
+
+    The condition matches the unique `lower(email)` index created by the
+    `0003_user_email_ci_unique` migration, so the lookup is a single index
+    probe. Users without an email (e.g. guests) never match.
+    """
+    return UserModel._default_manager.alias(email_lower=Lower('email')).filter(
+        email_lower=Lower(Value(email)),
+    ).exclude(email='')
+
+
+class EmailBackend(ModelBackend):
+    """
+    Authenticates with `email` and `password` through the indexed,
+    case-insensitive email lookup, with one query per login. The password is
+    checked in the hashing pool and upgraded to the preferred hasher if
+    needed (see `user_auth_app.hashers`).
+    """
+
+    def authenticate(self, request, email=None, password=None, **kwargs):
+        if not email or password is None:
+            return None
+        user = users_with_email(email).first()
+        if user is None:
+            harden_missing_user(password)
+            return None
+        if check_user_password(user, password) and self.user_can_authenticate(user):
+            return user
+        return None
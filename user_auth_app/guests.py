@@ -0,0 +1,97 @@
+import uuid
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.token_blacklist.models import OutstandingToken
+
+from .models import GuestAccount
+from .tokens import CachedRefreshToken
+
+PURGE_BATCH_SIZE = 500
+
+# Claim that marks guest refresh tokens, so that refreshing only looks up
+# the guest account for guests.
+GUEST_CLAIM = 'guest'
+
+
+class GuestRefreshToken(CachedRefreshToken):
+    """
+    Refresh token for guests, which expires together with the guest account
+    instead of after the regular refresh token lifetime.
+
+    Rotation keeps the original expiry, and `verify_account` rejects the
+    token once the account has expired, even if it has not been purged yet.
+    """
+    lifetime = settings.GUEST_ACCOUNT_LIFETIME
+    no_copy_claims = CachedRefreshToken.no_copy_claims + (GUEST_CLAIM,)
+
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        token[GUEST_CLAIM] = True
+        return token
+
+    def rotate(self):
+        expires = self['exp']
+        super().rotate()
+        self['exp'] = min(self['exp'], expires)
+        return self
+
+    def verify_account(self):
+        """
+        Raises `TokenError` if the token's guest account has expired.
+        """
+        user_id = self.payload.get(api_settings.USER_ID_CLAIM)
+        if not GuestAccount.objects.filter(user_id=user_id, expires_at__gt=timezone.now()).exists():
+            raise TokenError(_("Guest account has expired"))
+
+
+@transaction.atomic
+def create_guest():
+    """
+    Creates a guest user with a unique username, an unusable password and
+    an expiry, and returns `(user, guest_id)`.
+    """
+    guest_id = uuid.uuid4().hex
+    user = User(username=f"guest_{guest_id}")
+    user.set_unusable_password()
+    user.save()
+    GuestAccount.objects.create(user=user, expires_at=timezone.now() + settings.GUEST_ACCOUNT_LIFETIME)
+    return user, guest_id
+
+
+@transaction.atomic
+def delete_guests(user_ids):
+    """
+    Deletes guest users together with their outstanding (and blacklisted)
+    tokens. The token rows would otherwise outlive the users, since
+    `OutstandingToken.user` is set to NULL when a user is deleted.
+    Returns the number of deleted users.
+    """
+    user_ids = list(user_ids)
+    OutstandingToken.objects.filter(user_id__in=user_ids).only('id').delete()
+    _, per_model = User.objects.filter(id__in=user_ids).delete()
+    return per_model.get(User._meta.label, 0)
+
+
+def purge_expired_guests(batch_size=PURGE_BATCH_SIZE, now=None):
+    """
+    Deletes guests whose account expired, in transactions of at most
+    `batch_size` users so that no single transaction holds locks for long.
+    Returns the number of deleted users.
+    """
+    now = now or timezone.now()
+    deleted = 0
+    while True:
+        user_ids = list(
+            GuestAccount.objects.filter(expires_at__lte=now).order_by('expires_at')
+            .values_list('user_id', flat=True)[:batch_size]
+        )
+        if not user_ids:
+            return deleted
+        deleted += delete_guests(user_ids)
@@ -0,0 +1,135 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth import hashers
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+
+def cost(hasher, parameter):
+    """
+    Reads a cost parameter of `hasher` from `PASSWORD_HASHER_COST`, so that
+    the cost can be tuned in the settings. Hashes made with a different cost
+    report `must_update()` and are upgraded at the next login.
+    """
+    return property(lambda self: settings.PASSWORD_HASHER_COST[hasher][parameter])
+
+
+class ScryptPasswordHasher(hashers.ScryptPasswordHasher):
+    work_factor = cost('scrypt', 'work_factor')
+    block_size = cost('scrypt', 'block_size')
+    parallelism = cost('scrypt', 'parallelism')
+
+
+class Argon2PasswordHasher(hashers.Argon2PasswordHasher):
+    time_cost = cost('argon2', 'time_cost')
+    memory_cost = cost('argon2', 'memory_cost')
+    parallelism = cost('argon2', 'parallelism')
+
+
+class PBKDF2PasswordHasher(hashers.PBKDF2PasswordHasher):
+    iterations = cost('pbkdf2', 'iterations')
+
+
+class PasswordHashingBusy(APIException):
+    """
+    Raised when the hashing pool's queue is full, e.g. during a login storm.
+    """
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = 'Too many logins at the moment, please try again shortly.'
+    default_code = 'password_hashing_busy'
+
+
+class HashingPool:
+    """
+    Bounded pool of threads that run the password hasher.
+
+    At most `workers` hashes are computed at a time, so a burst of logins
+    cannot take every CPU from the other requests; the hashers release the
+    GIL, so request threads keep running meanwhile. At most `queue_size`
+    further hashes wait for a worker; beyond that, `PasswordHashingBusy` is
+    raised instead of letting request threads pile up.
+    """
+
+    def __init__(self, workers, queue_size):
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='password-hashing')
+        self.slots = threading.BoundedSemaphore(workers + queue_size)
+
+    def run(self, func, *args):
+        if not self.slots.acquire(blocking=False):
+            raise PasswordHashingBusy()
+        try:
+            future = self.executor.submit(func, *args)
+        except BaseException:
+            self.slots.release()
+            raise
+        future.add_done_callback(lambda _: self.slots.release())
+        return future.result()
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False)
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_hashing_pool():
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = HashingPool(settings.PASSWORD_HASHING_WORKERS, settings.PASSWORD_HASHING_QUEUE_SIZE)
+    return _pool
+
+
+@receiver(setting_changed)
+def reset_hashing_pool(*, setting, **kwargs):
+    global _pool
+    if setting in ('PASSWORD_HASHING_WORKERS', 'PASSWORD_HASHING_QUEUE_SIZE') and _pool is not None:
+        with _pool_lock:
+            _pool.shutdown()
+            _pool = None
+
+
+def run_hasher(func, *args):
+    """
+    Runs `func` in the hashing pool, or inline if `PASSWORD_HASHING_WORKERS`
+    is 0.
+    """
+    if not settings.PASSWORD_HASHING_WORKERS:
+        return func(*args)
+    return get_hashing_pool().run(func, *args)
+
+
+def hash_password(raw_password):
+    """
+    Returns the hash of `raw_password` made with the preferred hasher.
+    """
+    return run_hasher(hashers.make_password, raw_password)
+
+
+def check_user_password(user, raw_password):
+    """
+    Like `User.check_password()`, with the hashing run in the pool.
+
+    A correct password whose hash was made with another hasher or cost is
+    rehashed with the preferred one and saved, so existing hashes are
+    upgraded transparently as users log in.
+    """
+    is_correct, must_update = run_hasher(hashers.verify_password, raw_password, user.password)
+    if is_correct and must_update:
+        user.password = hash_password(raw_password)
+        user.save(update_fields=['password'])
+    return is_correct
+
+
+def harden_missing_user(raw_password):
+    """
+    Hashes once for a login of a nonexistent user, to reduce the timing
+    difference to an existing one (#20760).
+    """
+    hash_password(raw_password)
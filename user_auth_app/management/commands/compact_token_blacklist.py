@@ -0,0 +1,43 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+
+COMPACT_BATCH_SIZE = 1000
+
+
+class Command(BaseCommand):
+    """
+    Deletes expired rows from the token_blacklist tables in batches. An
+    expired token is rejected on its `exp` claim alone, so neither its
+    outstanding nor its blacklist row is needed any more. Meant to run
+    periodically, e.g. daily from cron.
+
+    Unlike simplejwt's `flushexpiredtokens`, only the ids of the rows are
+    loaded and no transaction spans the whole table.
+    """
+    help = "Deletes expired outstanding and blacklisted tokens in batches."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=COMPACT_BATCH_SIZE,
+                            help="Number of outstanding tokens deleted per transaction.")
+
+    def handle(self, *args, **options):
+        now = timezone.now()
+        deleted_outstanding = deleted_blacklisted = 0
+        while True:
+            token_ids = list(
+                OutstandingToken.objects.filter(expires_at__lte=now).order_by('id')
+                .values_list('id', flat=True)[:options['batch_size']]
+            )
+            if not token_ids:
+                break
+            with transaction.atomic():
+                deleted, _ = BlacklistedToken.objects.filter(token_id__in=token_ids).delete()
+                deleted_blacklisted += deleted
+                deleted, _ = OutstandingToken.objects.filter(id__in=token_ids).only('id').delete()
+                deleted_outstanding += deleted
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Deleted {deleted_outstanding} expired outstanding and {deleted_blacklisted} blacklisted token(s)."
+        ))
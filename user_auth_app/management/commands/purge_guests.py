@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from ...guests import PURGE_BATCH_SIZE, purge_expired_guests
+
+
+class Command(BaseCommand):
+    """
+    Deletes expired guest accounts together with their outstanding and
+    blacklisted tokens. Meant to run periodically, e.g. hourly from cron.
+    """
+    help = "Deletes expired guest accounts and their tokens."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=PURGE_BATCH_SIZE,
+                            help="Number of guests deleted per transaction.")
+
+    def handle(self, *args, **options):
+        deleted = purge_expired_guests(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} expired guest(s)."))
@@ -0,0 +1,40 @@
+# Generated by Django 5.1.6 on 2026-10-18 18:24
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def flag_existing_guests(apps, schema_editor):
+    """
+    Flags the guest users created before guests had an expiry, so that the
+    ones older than the guest lifetime are purged on the next run.
+    """
+    User = apps.get_model(*settings.AUTH_USER_MODEL.split('.'))
+    GuestAccount = apps.get_model('user_auth_app', 'GuestAccount')
+    guests = User.objects.filter(username__startswith='guest_', password__startswith='!').values_list('id', 'date_joined')
+    GuestAccount.objects.bulk_create(
+        [GuestAccount(user_id=pk, expires_at=date_joined + settings.GUEST_ACCOUNT_LIFETIME)
+         for pk, date_joined in guests.iterator()],
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user_auth_app', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GuestAccount',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('expires_at', models.DateTimeField(db_index=True)),
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='guest_account', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.RunPython(flag_existing_guests, migrations.RunPython.noop),
+    ]
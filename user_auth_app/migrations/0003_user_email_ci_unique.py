@@ -0,0 +1,53 @@
+# Generated by Django 5.1.6 on 2026-10-18 18:40
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models.functions import Lower
+
+# Unique index on lower(email) over the user table, used by
+# `user_auth_app.backends.users_with_email`. Users without an email (guests)
+# are excluded, so any number of them can exist.
+EMAIL_CONSTRAINT = models.UniqueConstraint(
+    Lower('email'),
+    condition=~models.Q(email=''),
+    name='auth_user_email_ci_uniq',
+)
+
+
+def get_user_model(apps):
+    return apps.get_model(*settings.AUTH_USER_MODEL.split('.'))
+
+
+def add_email_constraint(apps, schema_editor):
+    """
+    Creates the unique email index. Existing case-insensitive duplicates
+    make the migration fail with a list of the affected accounts instead of
+    changing any of them, so they can be resolved by hand first.
+    """
+    User = get_user_model(apps)
+    duplicates = list(
+        User.objects.exclude(email='').annotate(email_lower=Lower('email')).values('email_lower')
+        .annotate(count=models.Count('id')).filter(count__gt=1).values_list('email_lower', flat=True)[:20]
+    )
+    if duplicates:
+        raise RuntimeError(
+            "Cannot make user emails unique, these emails are used by several accounts "
+            f"(ignoring case): {', '.join(duplicates)}. Change or clear the duplicates and migrate again."
+        )
+    schema_editor.add_constraint(User, EMAIL_CONSTRAINT)
+
+
+def remove_email_constraint(apps, schema_editor):
+    schema_editor.remove_constraint(get_user_model(apps), EMAIL_CONSTRAINT)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user_auth_app', '0002_guestaccount'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(add_email_constraint, remove_email_constraint),
+    ]
@@ -15,3 +15,16 @@ class UserProfile(models.Model):
 
     def __str__(self):
         return self.user.username
+
+
+class GuestAccount(models.Model):
+    """
+    Marks a user as a temporary guest. Guests are deleted together with
+    their tokens once `expires_at` has passed (see `manage.py purge_guests`).
+
+    """
+    user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='guest_account')
+    expires_at = models.DateTimeField(db_index=True)
+
+    def __str__(self):
+        return f"{self.user.username} (expires {self.expires_at:%Y-%m-%d %H:%M})"
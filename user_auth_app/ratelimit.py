@@ -0,0 +1,116 @@
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.utils.module_loading import import_string
+
+
+class BucketStore:
+    """
+    Storage of token buckets for `TokenBucketThrottle`.
+
+    A bucket holds up to `capacity` tokens and refills at `refill_rate`
+    tokens per second; each request takes one token. Set `RATE_LIMIT_STORE`
+    to the dotted path of a subclass to keep the buckets elsewhere.
+    """
+
+    def take(self, key, capacity, refill_rate):
+        """
+        Takes a token from the bucket `key` and returns 0, or returns the
+        seconds until a token is available if the bucket is empty.
+        """
+        raise NotImplementedError
+
+    @staticmethod
+    def refill(state, capacity, refill_rate, now):
+        """
+        Returns the token count at `now` of a bucket whose `state` starts
+        with its token count and the time it was counted (None for a full
+        bucket).
+        """
+        if state is None:
+            return capacity
+        tokens, updated = state[:2]
+        return min(capacity, tokens + (now - updated) * refill_rate)
+
+
+class LocalBucketStore(BucketStore):
+    """
+    Buckets in a dict of the current process, guarded by a lock. Each
+    worker process limits on its own, so a client may get up to the
+    number of workers times the rate.
+
+    The dict is kept in least recently used order. Each call drops the
+    least recently used buckets while they are full again (a missing bucket
+    counts as full) or the store holds more than `max_buckets`, so pruning
+    costs O(1) per call on average.
+    """
+    max_buckets = 100000
+
+    def __init__(self):
+        self.buckets = OrderedDict()
+        self.lock = threading.Lock()
+
+    def take(self, key, capacity, refill_rate):
+        now = time.monotonic()
+        with self.lock:
+            tokens = self.refill(self.buckets.get(key), capacity, refill_rate, now)
+            wait = 0 if tokens >= 1 else (1 - tokens) / refill_rate
+            if not wait:
+                tokens -= 1
+            # The third item is the time at which the bucket is full again.
+            self.buckets[key] = (tokens, now, now + (capacity - tokens) / refill_rate)
+            self.buckets.move_to_end(key)
+            while len(self.buckets) > self.max_buckets or next(iter(self.buckets.values()))[2] <= now:
+                self.buckets.popitem(last=False)
+            return wait
+
+
+class CacheBucketStore(BucketStore):
+    """
+    Buckets in the Django cache `RATE_LIMIT_CACHE`, shared by all workers
+    when that cache is (e.g. Redis or Memcached). The read and write of a
+    bucket are not atomic, so concurrent requests of one client in
+    different workers may each take the same token.
+    """
+
+    def __init__(self):
+        self.cache = caches[settings.RATE_LIMIT_CACHE]
+
+    def take(self, key, capacity, refill_rate):
+        now = time.time()
+        key = f'ratelimit:{key}'
+        tokens = self.refill(self.cache.get(key), capacity, refill_rate, now)
+        wait = 0 if tokens >= 1 else (1 - tokens) / refill_rate
+        if not wait:
+            tokens -= 1
+        # The entry expires once the bucket would be full again.
+        self.cache.set(key, (tokens, now), int((capacity - tokens) / refill_rate) + 1)
+        return wait
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_bucket_store():
+    """
+    Returns the process-wide instance of `RATE_LIMIT_STORE`.
+    """
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = import_string(settings.RATE_LIMIT_STORE)()
+    return _store
+
+
+@receiver(setting_changed)
+def reset_bucket_store(*, setting, **kwargs):
+    global _store
+    if setting in ('RATE_LIMIT_STORE', 'RATE_LIMIT_CACHE'):
+        _store = None
@@ -0,0 +1,31 @@
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
+
+from .authentication import invalidate_cached_users
+from .tokens import remember_blacklisted
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def user_changed(sender, instance, **kwargs):
+    """
+    Drops the user from the JWT user cache when it is saved (e.g. deactivated
+    or given a new password) or deleted. The entry is dropped again on
+    commit, in case a concurrent request cached the old row in between.
+    """
+    user_ids = [instance.pk]
+    invalidate_cached_users(user_ids)
+    transaction.on_commit(lambda: invalidate_cached_users(user_ids))
+
+
+@receiver(post_save, sender=BlacklistedToken)
+def token_blacklisted(sender, instance, created, **kwargs):
+    """
+    Overwrites a memoized "not blacklisted" result for a token that was
+    just blacklisted.
+    """
+    if created:
+        remember_blacklisted(instance.token.jti)
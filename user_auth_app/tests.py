@@ -1,3 +1,535 @@
-from django.test import TestCase
+import threading
+from datetime import timedelta
+from io import StringIO
+from unittest import mock, skipUnless
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib.auth import hashers as django_hashers
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import IntegrityError, connection, transaction
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
+
+from .api.serializers import EmailAuthTokenSerializer
+from .api.throttles import GuestLoginRateThrottle, TokenBucketThrottle
+from .backends import users_with_email
+from .guests import GUEST_CLAIM, purge_expired_guests
+from .hashers import get_hashing_pool
+from .models import GuestAccount
+from .ratelimit import CacheBucketStore, LocalBucketStore, reset_bucket_store
+from .tokens import REMEMBER_CLAIM, CachedRefreshToken, blacklist_tokens, get_blacklist_cache_key
+
+
+class GuestAccountTests(TestCase):
+    """
+    Tests the guest login/logout lifecycle, guest expiry and purging.
+    """
+
+    def setUp(self):
+        cache.clear()
+        # Guest logins take tokens from the process-wide bucket store.
+        reset_bucket_store(setting="RATE_LIMIT_STORE")
+        self.client = APIClient()
+
+    def login_guest(self):
+        response = self.client.post(reverse("guest-login"))
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_guest_login_creates_expiring_guest(self):
+        data = self.login_guest()
+        guest = User.objects.get(username=f"guest_{data['guest_id']}")
+        self.assertFalse(guest.has_usable_password())
+
+        expires_at = guest.guest_account.expires_at
+        self.assertAlmostEqual(expires_at, timezone.now() + timedelta(days=1), delta=timedelta(minutes=1))
+        refresh = RefreshToken(data["refreshToken"])
+        self.assertLessEqual(refresh["exp"], int(expires_at.timestamp()) + 1)
+        self.assertFalse(OutstandingToken.objects.exists())
+
+    def refresh_guest(self, refresh_token):
+        self.client.cookies["refreshToken"] = refresh_token
+        return self.client.post(reverse("refresh"))
+
+    def test_guest_refresh_does_not_outlive_the_account(self):
+        data = self.login_guest()
+        expires = RefreshToken(data["refreshToken"])["exp"]
+        later = timezone.now() + timedelta(hours=1)
+        with mock.patch("rest_framework_simplejwt.tokens.aware_utcnow", return_value=later):
+            response = self.refresh_guest(data["refreshToken"])
+        self.assertEqual(response.status_code, 200)
+        rotated = RefreshToken(response.cookies["refreshToken"].value, verify=False)
+        self.assertEqual(rotated["exp"], expires)
+        self.assertNotIn(GUEST_CLAIM, AccessToken(response.json()["accessToken"], verify=False).payload)
+
+        # Expired accounts are refused before they are purged.
+        data = self.login_guest()
+        GuestAccount.objects.update(expires_at=timezone.now() - timedelta(seconds=1))
+        self.assertEqual(self.refresh_guest(data["refreshToken"]).status_code, 401)
+
+    def test_guest_logout_deletes_guest_and_tokens(self):
+        data = self.login_guest()
+        response = self.client.post(reverse("guest-logout"), {"refreshToken": data["refreshToken"]}, format="json")
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(User.objects.exists())
+        self.assertFalse(OutstandingToken.objects.exists())
+
+    def test_guest_logout_rejects_regular_users(self):
+        user = User.objects.create_user(username="regular", password="secret")
+        refresh = RefreshToken.for_user(user)
+        response = self.client.post(reverse("guest-logout"), {"refreshToken": str(refresh)}, format="json")
+        self.assertEqual(response.status_code, 404)
+        self.assertTrue(User.objects.filter(id=user.id).exists())
+
+    def test_guest_creation_is_rate_limited_per_client(self):
+        with mock.patch.object(GuestLoginRateThrottle, "THROTTLE_RATES", {"guest_login": "3/min"}):
+            for _ in range(3):
+                self.login_guest()
+            response = self.client.post(reverse("guest-login"))
+            self.assertEqual(response.status_code, 429)
+            self.assertEqual(User.objects.count(), 3)
+
+            other = self.client.post(reverse("guest-login"), REMOTE_ADDR="10.0.0.2")
+            self.assertEqual(other.status_code, 200)
+
+    def test_purge_deletes_expired_guests_in_batches(self):
+        guests = [self.login_guest() for _ in range(5)]
+        regular = User.objects.create_user(username="regular", password="secret")
+        RefreshToken.for_user(regular)
+        expired = [User.objects.get(username=f"guest_{data['guest_id']}") for data in guests[:3]]
+        GuestAccount.objects.filter(user__in=expired).update(expires_at=timezone.now() - timedelta(minutes=1))
+        RefreshToken(guests[0]["refreshToken"]).blacklist()
+
+        with CaptureQueriesContext(connection) as queries:
+            deleted = purge_expired_guests(batch_size=2)
+        user_deletes = [query for query in queries if query["sql"].startswith('DELETE FROM "auth_user" ')]
+        self.assertEqual(len(user_deletes), 2)
+        self.assertEqual(deleted, 3)
+        self.assertEqual(GuestAccount.objects.count(), 2)
+        self.assertFalse(User.objects.filter(id__in=[user.id for user in expired]).exists())
+        self.assertFalse(OutstandingToken.objects.filter(user__isnull=True).exists())
+        self.assertFalse(BlacklistedToken.objects.exists())
+        self.assertTrue(OutstandingToken.objects.filter(user=regular).exists())
+
+    def test_purge_command(self):
+        self.login_guest()
+        GuestAccount.objects.update(expires_at=timezone.now())
+        stdout = StringIO()
+        call_command("purge_guests", "--batch-size", "10", stdout=stdout)
+        self.assertIn("Deleted 1 expired guest(s).", stdout.getvalue())
+        self.assertFalse(User.objects.exists())
+
+
+class EmailLookupTests(TestCase):
+    """
+    Tests the unique, case-insensitive email lookup used by the login and
+    registration paths.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="anna", email="Anna@Example.com", password="secret-pw-123")
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def test_login_resolves_user_with_one_query(self):
+        # user lookup; issuing the tokens writes nothing
+        with self.assertNumQueries(1):
+            response = self.client.post(reverse("login"), {"email": "anna@example.COM", "password": "secret-pw-123"},
+                                        format="json")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["user_id"], self.user.id)
+
+        for credentials in ({"email": "anna@example.com", "password": "wrong"},
+                            {"email": "nobody@example.com", "password": "secret-pw-123"}, {}):
+            with self.subTest(credentials=credentials):
+                response = self.client.post(reverse("login"), credentials, format="json")
+                self.assertEqual(response.status_code, 400)
+
+    def test_token_serializer_resolves_user_with_one_query(self):
+        serializer = EmailAuthTokenSerializer(data={"email": "ANNA@example.com", "password": "secret-pw-123"})
+        with self.assertNumQueries(1):
+            self.assertTrue(serializer.is_valid())
+        self.assertEqual(serializer.validated_data["user"], self.user)
+
+    def test_inactive_users_cannot_log_in(self):
+        User.objects.filter(id=self.user.id).update(is_active=False)
+        response = self.client.post(reverse("login"), {"email": "anna@example.com", "password": "secret-pw-123"},
+                                    format="json")
+        self.assertEqual(response.status_code, 400)
+
+    def test_registration_rejects_email_in_other_case(self):
+        response = self.client.post(reverse("registration"), {
+            "username": "other", "email": "ANNA@example.com", "password": "pw", "confirmed_password": "pw",
+        }, format="json")
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(User.objects.filter(username="other").exists())
+
+    def test_email_is_unique_ignoring_case_except_when_empty(self):
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            User.objects.create_user(username="copy", email="anna@EXAMPLE.com")
+        User.objects.create_user(username="guest_1", email="")
+        User.objects.create_user(username="guest_2", email="")
+
+    @skipUnless(connection.vendor == "sqlite", "SQLite query plan")
+    def test_lookup_uses_the_email_index(self):
+        sql, params = users_with_email("anna@example.com").query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(f"EXPLAIN QUERY PLAN {sql}", params)
+            plan = " ".join(str(row[-1]) for row in cursor.fetchall())
+        self.assertIn("auth_user_email_ci_uniq", plan)
+
+
+class JWTCacheTests(TestCase):
+    """
+    Tests the cached user resolution of `CachedJWTAuthentication` and the
+    memoized refresh token blacklist check.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="anna", email="anna@example.com", password="secret-pw-123")
+
+    def setUp(self):
+        cache.clear()
+        # Guest logins take tokens from the process-wide bucket store.
+        reset_bucket_store(setting="RATE_LIMIT_STORE")
+        self.client = APIClient()
+
+    def get_prios(self, access_token):
+        return self.client.get(reverse("prio-list"), HTTP_AUTHORIZATION=f"Bearer {access_token}")
+
+    def user_queries(self, access_token):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.get_prios(access_token)
+        self.assertEqual(response.status_code, 200)
+        return [query for query in queries if 'FROM "auth_user"' in query["sql"]]
+
+    def test_user_is_loaded_once(self):
+        access = str(AccessToken.for_user(self.user))
+        self.assertEqual(len(self.user_queries(access)), 1)
+        self.assertEqual(len(self.user_queries(access)), 0)
+        self.assertEqual(len(self.user_queries(str(AccessToken.for_user(self.user)))), 0)
+
+    @override_settings(JWT_USER_CACHE_TIMEOUT=0)
+    def test_cache_can_be_disabled(self):
+        access = str(AccessToken.for_user(self.user))
+        self.assertEqual(len(self.user_queries(access)), 1)
+        self.assertEqual(len(self.user_queries(access)), 1)
+
+    def test_saved_and_deleted_users_are_dropped(self):
+        access = str(AccessToken.for_user(self.user))
+        self.get_prios(access)
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(self.get_prios(access).status_code, 401)
+
+        self.user.is_active = True
+        self.user.save()
+        self.assertEqual(self.get_prios(access).status_code, 200)
+        self.user.delete()
+        self.assertEqual(self.get_prios(access).status_code, 401)
+
+    def test_guest_logout_drops_cached_guest(self):
+        tokens = self.client.post(reverse("guest-login")).json()
+        self.assertEqual(self.get_prios(tokens["accessToken"]).status_code, 200)
+        self.client.post(reverse("guest-logout"), {"refreshToken": tokens["refreshToken"]}, format="json")
+        self.assertEqual(self.get_prios(tokens["accessToken"]).status_code, 401)
+
+    def test_blacklist_check_is_memoized(self):
+        refresh = str(CachedRefreshToken.for_user(self.user))
+        with self.assertNumQueries(1):
+            CachedRefreshToken(refresh)
+            CachedRefreshToken(refresh)
+
+        CachedRefreshToken(refresh).blacklist()
+        with self.assertNumQueries(0):
+            with self.assertRaises(TokenError):
+                CachedRefreshToken(refresh)
+
+        cache.clear()
+        with self.assertNumQueries(1):
+            with self.assertRaises(TokenError):
+                CachedRefreshToken(refresh)
+        with self.assertNumQueries(0):
+            with self.assertRaises(TokenError):
+                CachedRefreshToken(refresh)
+
+
+class RefreshRotationTests(TestCase):
+    """
+    Tests refresh token rotation in `refresh_view`, batched blacklisting and
+    the token_blacklist compaction command.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="anna", email="anna@example.com", password="secret-pw-123")
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+
+    def login(self, remember=False):
+        response = self.client.post(reverse("login"), {"email": "anna@example.com", "password": "secret-pw-123",
+                                                       "remember": remember}, format="json")
+        return response.cookies["refreshToken"]
+
+    def refresh(self, token):
+        self.client.cookies["refreshToken"] = token
+        return self.client.post(reverse("refresh"))
+
+    def test_refresh_rotates_and_blacklists_the_old_token(self):
+        old = self.login().value
+        # blacklist check, user, then in a savepoint: outstanding insert, locking select, blacklist insert
+        with self.assertNumQueries(7):
+            response = self.refresh(old)
+        self.assertEqual(response.status_code, 200)
+        new = response.cookies["refreshToken"].value
+        self.assertNotEqual(new, old)
+        self.assertEqual(AccessToken(response.json()["accessToken"])["user_id"], self.user.id)
+        self.assertTrue(BlacklistedToken.objects.filter(token__jti=RefreshToken(old, verify=False)["jti"]).exists())
+
+        self.assertEqual(self.refresh(old).status_code, 401)
+        # The user is cached now; the rotated token's blacklist check is not.
+        with self.assertNumQueries(6):
+            self.assertEqual(self.refresh(new).status_code, 200)
+
+    def test_replayed_token_is_rejected_even_if_not_cached_as_blacklisted(self):
+        old = self.login().value
+        self.assertEqual(self.refresh(old).status_code, 200)
+        cache.set(get_blacklist_cache_key(RefreshToken(old, verify=False)["jti"]), False)
+        self.assertEqual(self.refresh(old).status_code, 401)
+
+    def test_rotation_keeps_the_remember_me_choice(self):
+        cookie = self.login(remember=True)
+        self.assertEqual(cookie["max-age"], 60 * 60 * 24 * 30)
+        rotated = self.refresh(cookie.value).cookies["refreshToken"]
+        self.assertEqual(rotated["max-age"], 60 * 60 * 24 * 30)
+        self.assertNotIn(REMEMBER_CLAIM, AccessToken(self.refresh(rotated.value).json()["accessToken"]).payload)
+
+        short = self.refresh(self.login().value).cookies["refreshToken"]
+        self.assertEqual(short["max-age"], 60 * 60 * 24)
+
+    def test_tokens_of_deleted_users_are_not_refreshed(self):
+        token = self.login().value
+        self.user.delete()
+        self.assertEqual(self.refresh(token).status_code, 401)
+        self.assertEqual(self.client.post(reverse("refresh"), HTTP_COOKIE="").status_code, 401)
+
+    def test_rotation_can_be_disabled(self):
+        token = self.login().value
+        with mock.patch("user_auth_app.api.views.api_settings.ROTATE_REFRESH_TOKENS", False):
+            response = self.refresh(token)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn("refreshToken", response.cookies)
+        self.assertFalse(OutstandingToken.objects.exists())
+
+    def test_blacklist_tokens_batches_writes(self):
+        tokens = [CachedRefreshToken.for_user(self.user) for _ in range(5)]
+        tokens[0].blacklist()
+        # savepoint, outstanding insert, locking select, blacklist insert, release
+        with self.assertNumQueries(5):
+            already_blacklisted = blacklist_tokens(tokens)
+        self.assertEqual(already_blacklisted, {tokens[0]["jti"]})
+        self.assertEqual(BlacklistedToken.objects.count(), 5)
+        self.assertEqual(set(OutstandingToken.objects.values_list("user_id", flat=True)), {self.user.id})
+
+    def test_compaction_deletes_expired_rows_only(self):
+        tokens = [CachedRefreshToken.for_user(self.user) for _ in range(5)]
+        blacklist_tokens(tokens)
+        OutstandingToken.objects.filter(jti__in=[token["jti"] for token in tokens[:3]]).update(
+            expires_at=timezone.now() - timedelta(seconds=1)
+        )
+        stdout = StringIO()
+        call_command("compact_token_blacklist", "--batch-size", "2", stdout=stdout)
+        self.assertIn("Deleted 3 expired outstanding and 3 blacklisted token(s).", stdout.getvalue())
+        self.assertEqual(OutstandingToken.objects.count(), 2)
+        self.assertEqual(BlacklistedToken.objects.count(), 2)
+
+
+class PasswordHashingTests(TestCase):
+    """
+    Tests the configurable hasher, the transparent rehash on login and the
+    bounded hashing pool.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+
+    def login(self, password="secret-pw-123"):
+        return self.client.post(reverse("login"), {"email": "anna@example.com", "password": password}, format="json")
+
+    def create_user(self, algorithm="pbkdf2_sha256"):
+        return User.objects.create(username="anna", email="anna@example.com",
+                                   password=make_password("secret-pw-123", hasher=algorithm))
+
+    def test_registration_hashes_with_the_preferred_hasher(self):
+        response = self.client.post(reverse("registration"), {
+            "username": "anna", "email": "Anna@EXAMPLE.com", "password": "pw", "confirmed_password": "pw",
+        }, format="json")
+        self.assertEqual(response.status_code, 201)
+        user = User.objects.get(username="anna")
+        self.assertEqual(user.email, "Anna@example.com")
+        self.assertTrue(user.password.startswith("scrypt$"))
+        self.assertTrue(user.check_password("pw"))
+
+    def test_login_upgrades_hashes_of_other_hashers(self):
+        user = self.create_user()
+        self.assertEqual(self.login().status_code, 200)
+        user.refresh_from_db()
+        self.assertTrue(user.password.startswith("scrypt$"))
+
+        # user lookup only: the upgraded hash is not rewritten
+        with self.assertNumQueries(1):
+            self.assertEqual(self.login().status_code, 200)
+
+    def test_login_upgrades_hashes_made_with_another_cost(self):
+        user = self.create_user("scrypt")
+        cost = {**settings.PASSWORD_HASHER_COST, "scrypt": {"work_factor": 2 ** 12, "block_size": 8, "parallelism": 1}}
+        with override_settings(PASSWORD_HASHER_COST=cost):
+            self.assertEqual(self.login().status_code, 200)
+        user.refresh_from_db()
+        self.assertTrue(user.password.startswith("scrypt$4096$"))
+
+    def test_wrong_password_keeps_the_old_hash(self):
+        user = self.create_user()
+        self.assertEqual(self.login("wrong").status_code, 400)
+        user.refresh_from_db()
+        self.assertTrue(user.password.startswith("pbkdf2_sha256$"))
+
+    @override_settings(PASSWORD_HASHING_WORKERS=1)
+    def test_hashing_runs_in_the_pool(self):
+        self.create_user("scrypt")
+        threads = []
+        original = django_hashers.verify_password
+
+        def verify_password(*args):
+            threads.append(threading.current_thread().name)
+            return original(*args)
+
+        with mock.patch.object(django_hashers, "verify_password", verify_password):
+            self.assertEqual(self.login().status_code, 200)
+        self.assertEqual(len(threads), 1)
+        self.assertTrue(threads[0].startswith("password-hashing"))
+
+    @override_settings(PASSWORD_HASHING_WORKERS=1, PASSWORD_HASHING_QUEUE_SIZE=0)
+    def test_full_pool_rejects_logins(self):
+        self.create_user("scrypt")
+        started, release = threading.Event(), threading.Event()
+
+        def block():
+            started.set()
+            release.wait(5)
+
+        blocker = threading.Thread(target=get_hashing_pool().run, args=(block,))
+        blocker.start()
+        try:
+            started.wait(5)
+            response = self.login()
+        finally:
+            release.set()
+            blocker.join()
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(self.login().status_code, 200)
+
+
+@override_settings(RATE_LIMIT_STORE="user_auth_app.ratelimit.LocalBucketStore")
+class RateLimitTests(TestCase):
+    """
+    Tests the token bucket rate limits of the auth and write endpoints, with
+    a fresh in-process bucket store per test.
+    """
+    rates = {"login": "3/min", "registration": "2/hour", "write": "2/min", "bulk_write": "1/min"}
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="anna", email="anna@example.com")
+        cls.other = User.objects.create_user(username="ben", email="ben@example.com")
+
+    def setUp(self):
+        self.enterContext(mock.patch.object(TokenBucketThrottle, "THROTTLE_RATES", self.rates))
+        self.client = APIClient()
+
+    def login(self, **extra):
+        return self.client.post(reverse("login"), {"email": "anna@example.com", "password": "wrong"},
+                                format="json", **extra)
+
+    def test_logins_are_limited_per_ip_without_database_work(self):
+        for _ in range(3):
+            self.assertEqual(self.login().status_code, 400)
+        with self.assertNumQueries(0):
+            response = self.login()
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response["Retry-After"], "20")
+        self.assertEqual(self.login(REMOTE_ADDR="10.0.0.2").status_code, 400)
+
+    def test_bucket_refills_over_time(self):
+        with mock.patch("user_auth_app.ratelimit.time.monotonic", return_value=1000.0) as monotonic:
+            for _ in range(3):
+                self.login()
+            self.assertEqual(self.login().status_code, 429)
+            monotonic.return_value += 20
+            self.assertEqual(self.login().status_code, 400)
+            self.assertEqual(self.login().status_code, 429)
+
+    def test_registrations_are_limited(self):
+        for index in range(2):
+            response = self.client.post(reverse("registration"), {
+                "username": f"user{index}", "email": f"user{index}@example.com",
+                "password": "pw", "confirmed_password": "pw",
+            }, format="json")
+            self.assertEqual(response.status_code, 201)
+        self.assertEqual(self.client.post(reverse("registration"), {}, format="json").status_code, 429)
+
+    def test_writes_are_limited_per_user_and_reads_are_not(self):
+        self.client.force_authenticate(self.user)
+        for _ in range(2):
+            self.assertEqual(self.client.post(reverse("task-list"), {}, format="json").status_code, 400)
+        with self.assertNumQueries(0):
+            response = self.client.post(reverse("task-list"), {}, format="json")
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(self.client.delete(reverse("task-detail", args=[1])).status_code, 429)
+        self.assertEqual(self.client.get(reverse("prio-list")).status_code, 200)
+        # Bulk endpoints have their own rate.
+        self.assertEqual(self.client.post(reverse("task-bulk"), [], format="json").status_code, 200)
+        self.assertEqual(self.client.post(reverse("task-bulk"), [], format="json").status_code, 429)
+
+        self.client.force_authenticate(self.other)
+        self.assertEqual(self.client.post(reverse("task-list"), {}, format="json").status_code, 400)
+
+    def test_local_store_drops_full_buckets(self):
+        store = LocalBucketStore()
+        store.max_buckets = 2
+        with mock.patch("user_auth_app.ratelimit.time.monotonic", return_value=1000.0) as monotonic:
+            store.take("a", 1, 1)
+            store.take("b", 1, 1)
+            monotonic.return_value += 5
+            store.take("c", 1, 1)
+        self.assertEqual(list(store.buckets), ["c"])
+
+    def test_local_store_evicts_least_recently_used_buckets(self):
+        store = LocalBucketStore()
+        store.max_buckets = 2
+        with mock.patch("user_auth_app.ratelimit.time.monotonic", return_value=1000.0):
+            for key in ("a", "b", "a", "c"):
+                store.take(key, 5, 1)
+        self.assertEqual(list(store.buckets), ["a", "c"])
+
+    def test_cache_store_shares_buckets(self):
+        cache.clear()
+        first, second = CacheBucketStore(), CacheBucketStore()
+        self.assertEqual(first.take("client", 2, 1), 0)
+        self.assertEqual(second.take("client", 2, 1), 0)
+        self.assertGreater(first.take("client", 2, 1), 0)
@@ -0,0 +1,124 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+from rest_framework_simplejwt.tokens import BlacklistMixin, RefreshToken
+from rest_framework_simplejwt.utils import datetime_from_epoch
+
+# Claim of the login's "remember me" choice, kept across rotations.
+REMEMBER_CLAIM = 'remember'
+
+
+def get_blacklist_cache_key(jti):
+    return f'jwt_blacklisted:{jti}'
+
+
+def remember_blacklisted(jti):
+    """
+    Records a blacklisted token in the cache. Blacklisting is permanent, so
+    the entry is kept for as long as a refresh token can be valid.
+    """
+    cache.set(get_blacklist_cache_key(jti), True, int(api_settings.REFRESH_TOKEN_LIFETIME.total_seconds()))
+
+
+@transaction.atomic
+def blacklist_tokens(tokens):
+    """
+    Blacklists refresh tokens of existing users with one insert per
+    token_blacklist table and one locking query for the outstanding token
+    ids, however many tokens are given. Returns the ids (`jti`) of the
+    tokens that had already been blacklisted.
+
+    Tokens are issued without an `OutstandingToken` row, so the row is
+    created here if it is missing.
+    """
+    if not tokens:
+        return set()
+    outstanding = [
+        OutstandingToken(
+            user_id=token.payload.get(api_settings.USER_ID_CLAIM),
+            jti=token[api_settings.JTI_CLAIM],
+            token=str(token),
+            created_at=token.current_time,
+            expires_at=datetime_from_epoch(token['exp']),
+        )
+        for token in tokens
+    ]
+    jtis = [row.jti for row in outstanding]
+    OutstandingToken.objects.bulk_create(outstanding, ignore_conflicts=True)
+    # The row locks make concurrent rotations of the same token wait here
+    # and then see it blacklisted.
+    rows = OutstandingToken.objects.select_for_update(of=('self',)).filter(jti__in=jtis).order_by().values_list(
+        'id', 'jti', 'blacklistedtoken__id'
+    )
+    already_blacklisted = set()
+    to_blacklist = []
+    for pk, jti, blacklisted_id in rows:
+        if blacklisted_id is None:
+            to_blacklist.append(BlacklistedToken(token_id=pk))
+        else:
+            already_blacklisted.add(jti)
+    BlacklistedToken.objects.bulk_create(to_blacklist, ignore_conflicts=True)
+    # bulk_create() sends no post_save signal for `token_blacklisted`.
+    for jti in jtis:
+        remember_blacklisted(jti)
+    return already_blacklisted
+
+
+class CachedRefreshToken(RefreshToken):
+    """
+    Refresh token whose blacklist check is memoized in the cache.
+
+    Blacklisted tokens are remembered until they would have expired;
+    tokens found not blacklisted are remembered for
+    `JWT_BLACKLIST_CACHE_TIMEOUT` seconds, and the entry is overwritten when
+    the token is blacklisted (see `user_auth_app.signals`).
+
+    Issuing a token writes nothing to the database; the outstanding token
+    row is only created when the token is blacklisted (`blacklist_tokens`).
+    """
+    no_copy_claims = RefreshToken.no_copy_claims + (REMEMBER_CLAIM,)
+
+    @classmethod
+    def for_user(cls, user):
+        # Skips BlacklistMixin.for_user, which inserts an OutstandingToken per token.
+        return super(BlacklistMixin, cls).for_user(user)
+
+    def blacklist(self):
+        blacklist_tokens([self])
+
+    def rotate(self):
+        """
+        Turns this token into its successor with a new id, issue time and
+        expiry (keeping its other claims) and returns it.
+
+        If `BLACKLIST_AFTER_ROTATION` is set, the old token is blacklisted
+        first, and `TokenError` is raised if it already was, e.g. because
+        it was rotated concurrently or is being replayed.
+        """
+        if api_settings.BLACKLIST_AFTER_ROTATION and blacklist_tokens([self]):
+            raise TokenError(_("Token is blacklisted"))
+        self.set_jti()
+        self.set_exp()
+        self.set_iat()
+        return self
+
+    def check_blacklist(self):
+        timeout = settings.JWT_BLACKLIST_CACHE_TIMEOUT
+        if not timeout:
+            return super().check_blacklist()
+
+        jti = self.payload[api_settings.JTI_CLAIM]
+        key = get_blacklist_cache_key(jti)
+        blacklisted = cache.get(key)
+        if blacklisted is None:
+            blacklisted = BlacklistedToken.objects.filter(token__jti=jti).exists()
+            if blacklisted:
+                remember_blacklisted(jti)
+            else:
+                cache.set(key, False, timeout)
+        if blacklisted:
+            raise TokenError(_("Token is blacklisted"))